@@ -37,6 +37,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "locator.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -81,6 +82,71 @@ DATABASES = {
     }
 }
 
+# Shared cache for import progress counters; point CACHE_URL at a cache all
+# gunicorn workers can see (e.g. dbcache:// or redis) to poll across workers.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Background jobs (see `manage.py run_jobs`)
+JOB_WORKER_CONCURRENCY = env.int('JOB_WORKER_CONCURRENCY', default=2)
+# A running job's worker refreshes its lease every JOB_HEARTBEAT_INTERVAL
+# seconds; jobs whose lease is older than JOB_LEASE_TIMEOUT are requeued
+JOB_HEARTBEAT_INTERVAL = env.int('JOB_HEARTBEAT_INTERVAL', default=30)
+JOB_LEASE_TIMEOUT = env.int('JOB_LEASE_TIMEOUT', default=5 * 60)
+
+# PDF text extraction pool of each process; 1 extracts in the calling
+# process. Every gunicorn worker has its own pool, so by default the cores
+# are split between the WEB_WORKERS (gunicorn.conf.py exports it), while a
+# single process such as the job worker gets all of them.
+cpu_count = os.cpu_count() or 1
+PDF_EXTRACTION_WORKERS = env.int(
+    'PDF_EXTRACTION_WORKERS',
+    default=max(1, cpu_count // env.int('WEB_WORKERS', default=1)),
+)
+PDF_PAGES_PER_TASK = env.int('PDF_PAGES_PER_TASK', default=25)
+
+# Parsed PDF results keyed by file hash; an empty PDF_CACHE_DIR disables it
+PDF_CACHE_DIR = env.str('PDF_CACHE_DIR', default=os.path.join(BASE_DIR, 'cache', 'pdf'))
+PDF_CACHE_MAX_BYTES = env.int('PDF_CACHE_MAX_BYTES', default=256 * 1024 * 1024)
+
+# Orders per page on /orders/
+ORDER_LIST_PAGE_SIZE = env.int('ORDER_LIST_PAGE_SIZE', default=100)
+# Store/status filter options are cached until orders change; this bounds
+# how long a change made outside the ORM (e.g. raw SQL) can go unnoticed
+ORDER_FACETS_TIMEOUT = env.int('ORDER_FACETS_TIMEOUT', default=60 * 60)
+# Most orders one /orders/status/ request may move
+ORDER_TRANSITION_MAX_ORDERS = env.int('ORDER_TRANSITION_MAX_ORDERS', default=1000)
+
+# Warehouse layout for route=optimal pick lists, in place-to-place steps;
+# picking starts and ends at the front of PICK_ROUTE_DEPOT_LINE
+PICK_ROUTE_LINE_DISTANCE = env.float('PICK_ROUTE_LINE_DISTANCE', default=3.0)
+PICK_ROUTE_PLACE_DISTANCE = env.float('PICK_ROUTE_PLACE_DISTANCE', default=1.0)
+PICK_ROUTE_DEPOT_LINE = env.int('PICK_ROUTE_DEPOT_LINE', default=1)
+# How long the aisle length derived from the item places is cached
+PICK_ROUTE_LAYOUT_TIMEOUT = env.int('PICK_ROUTE_LAYOUT_TIMEOUT', default=60 * 60)
+# 2-opt refinement of the heuristic route; 0 passes turns it off
+PICK_ROUTE_TWO_OPT_PASSES = env.int('PICK_ROUTE_TWO_OPT_PASSES', default=8)
+PICK_ROUTE_TWO_OPT_WINDOW = env.int('PICK_ROUTE_TWO_OPT_WINDOW', default=20)
+
+# Most numbers an item typeahead request returns
+ITEM_TYPEAHEAD_LIMIT = env.int('ITEM_TYPEAHEAD_LIMIT', default=50)
+# Browser cache lifetime of a versioned item manifest URL
+ITEM_MANIFEST_MAX_AGE = env.int('ITEM_MANIFEST_MAX_AGE', default=365 * 24 * 60 * 60)
+# Most item codes one /item-locations/ request may resolve
+ITEM_LOCATIONS_MAX_CODES = env.int('ITEM_LOCATIONS_MAX_CODES', default=1000)
+
+# Per-request timing, query and size metrics, served on /metrics; scrapers
+# must send "Authorization: Bearer <METRICS_TOKEN>", and without a token
+# the endpoint refuses every request
+METRICS_ENABLED = env.bool('METRICS_ENABLED', default=True)
+METRICS_TOKEN = env.str('METRICS_TOKEN', default='')
+# Every web and job process writes its metrics to METRICS_DIR every
+# METRICS_FLUSH_INTERVAL seconds and /metrics sums them; an empty
+# METRICS_DIR serves only the metrics of the process answering the scrape
+METRICS_DIR = env.str('METRICS_DIR', default=os.path.join(BASE_DIR, 'cache', 'metrics'))
+METRICS_FLUSH_INTERVAL = env.int('METRICS_FLUSH_INTERVAL', default=5)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
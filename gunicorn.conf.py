@@ -0,0 +1,31 @@
+# gunicorn picks this file up from the working directory; every setting
+# can be overridden from the environment.
+import multiprocessing
+import os
+
+# "wsgi" serves with threaded sync workers. "asgi" serves core.asgi through
+# uvicorn workers, so idle handheld polls wait on the event loop instead of
+# each holding a worker slot.
+profile = os.environ.get("WEB_PROFILE", "wsgi")
+
+bind = os.environ.get("WEB_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+# The workers inherit this, so the settings split the PDF extraction cores
+# between them
+os.environ["WEB_WORKERS"] = str(workers)
+timeout = int(os.environ.get("WEB_TIMEOUT", 120))
+graceful_timeout = 30
+# Recycle workers now and then, so a leak in a parser cannot grow forever
+max_requests = int(os.environ.get("WEB_MAX_REQUESTS", 2000))
+max_requests_jitter = max_requests // 10
+accesslog = "-"
+
+if profile == "asgi":
+    wsgi_app = "core.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+elif profile == "wsgi":
+    wsgi_app = "core.wsgi:application"
+    worker_class = "gthread"
+    threads = int(os.environ.get("WEB_THREADS", 4))
+else:
+    raise RuntimeError(f"Unknown WEB_PROFILE {profile!r}, expected 'wsgi' or 'asgi'")
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Item, Order, OrderItem
+from .models import Item, Job, Order, OrderItem
 
 
 class ItemAdmin(admin.ModelAdmin):
@@ -27,6 +27,10 @@ class OrderItemInline(admin.TabularInline):
 class OrderAdmin(admin.ModelAdmin):
     inlines = [OrderItemInline]
 
+    def get_queryset(self, request):
+        # Load every listed order's lines and items in two queries
+        return super().get_queryset(request).prefetch_related("orderitem_set__item")
+
     def items_with_quantities(self, obj):
         items = obj.orderitem_set.all()
         return ", ".join([f"{item.item.model_prefix}{item.item.number} ({item.quantity})" for item in items])
@@ -64,4 +68,12 @@ class OrderItemAdmin(admin.ModelAdmin):
     item_display.short_description = 'Item'
 
 
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "progress", "total", "created_at", "finished_at")
+    list_filter = ("status", "kind")
+    readonly_fields = ("result", "error", "artifact_name", "started_at", "finished_at")
+    exclude = ("artifact",)
+    ordering = ("-created_at",)
+
 
+admin.site.register(Job, JobAdmin)
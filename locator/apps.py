@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class LocatorConfig(AppConfig):
     name = "locator"
+
+    def ready(self):
+        from . import signals  # noqa: F401
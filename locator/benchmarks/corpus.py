@@ -0,0 +1,249 @@
+import csv
+import io
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+from .pdf import write_pdf
+
+LINES_PER_PAGE = 60
+
+FIRST_NAMES = ["Anna", "Lukas", "Marie", "Jonas", "Sophie", "Léa", "Pieter", "Émile", "Sanne", "Jürgen"]
+LAST_NAMES = ["Müller", "Schmidt", "Dubois", "de Vries", "Jansen", "Weber", "Lefèvre", "Bakker", "Fischer"]
+CARRIERS = ["DHL", "DPD", "GLS", "Hermes", "UPS"]
+PRODUCTS = ["Tischleuchte", "Stehleuchte", "Wandspiegel", "Couchtisch", "Badschrank", "Waschtisch"]
+FILLER = [
+    "Vielen Dank für Ihren Einkauf. Bitte bewahren Sie diesen Beleg auf.",
+    "Rücksendungen sind innerhalb von 30 Tagen kostenlos möglich.",
+    "Retours gratuits sous 30 jours, veuillez conserver ce document.",
+    "Gratis retourneren binnen 30 dagen, bewaar dit document.",
+    "Seite wird fortgesetzt",
+]
+
+HOME24_LABELS = {
+    "de": {
+        "separator": "Lieferschein",
+        "number": "Bestellnummer: {}",
+        "date": "Bestelldatum: {:%d.%m.%Y}",
+        "buyer": "Name des Kunden: {}",
+        "delivery": "Versandmethode: {}",
+        "product": "Produktname: {}",
+        "sku": "Shop-Referenz: {}",
+        "quantity": "Anzahl: {}",
+    },
+    "fr": {
+        "separator": "Bon de livraison",
+        "number": "Numéro de commande : {}",
+        "date": "Date de commande : {:%d/%m/%Y}",
+        "buyer": "Nom de l'acheteur : {}",
+        "delivery": "Mode de livraison : {}",
+        "product": "Nom du produit: {}",
+        "sku": "Référence vendeur : {}",
+        "quantity": "Qté : {}",
+    },
+    "nl": {
+        "separator": "Leveringsbon",
+        "number": "Bestelnummer: {}",
+        "date": "Besteldatum: {:%d-%m-%Y}",
+        "buyer": "Klantnaam: {}",
+        "delivery": "Verzendmethode: {}",
+        "product": "Productnaam: {}",
+        "sku": "Referentie shop: {}",
+        "quantity": "Aant. : {}",
+    },
+}
+
+
+def random_order(rnd, number, max_items=4):
+    return {
+        "number": number,
+        "date": datetime(2024, 1, 1) + timedelta(days=rnd.randrange(365), minutes=rnd.randrange(1440)),
+        "buyer": f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}",
+        "delivery": rnd.choice(CARRIERS),
+        "items": [
+            (f"AMP{rnd.choice('ABCEFGHKW')}{rnd.randrange(10000, 99999)}", rnd.randint(1, 5), rnd.choice(PRODUCTS))
+            for _ in range(rnd.randint(1, max_items))
+        ],
+    }
+
+
+def _filler(rnd, max_lines):
+    return [rnd.choice(FILLER) for _ in range(rnd.randint(0, max_lines))]
+
+
+def amazon_lines(order, rnd):
+    lines = [
+        "Liefern an:",
+        order["buyer"],
+        f"Musterstraße {rnd.randint(1, 200)}",
+        f"{rnd.randint(10000, 99999)} Berlin",
+        f"Bestellnummer: {order['number']}",
+        "Bestelldatum Käufer Versandart",
+        f"Datum {order['date']:%d.%m.%Y} {order['buyer']} {order['delivery']}",
+        *_filler(rnd, 40),
+        "Menge Produktdetails Stückpreis Zwischensumme",
+    ]
+    for sku, quantity, product in order["items"]:
+        lines += [f"{quantity} {product} 49,90 €", f"SKU: {sku}", f"ASIN: B0{rnd.randrange(10**7, 10**8)}"]
+    lines.append(f"EUR {rnd.randint(50, 900)},00")
+    return lines
+
+
+def home24_lines(order, rnd, language):
+    labels = HOME24_LABELS[language]
+    lines = [
+        labels["separator"],
+        labels["number"].format(order["number"]),
+        labels["date"].format(order["date"]),
+        labels["buyer"].format(order["buyer"]),
+        labels["delivery"].format(order["delivery"]),
+        *_filler(rnd, 40),
+    ]
+    for sku, quantity, product in order["items"]:
+        lines += [
+            labels["product"].format(product),
+            labels["sku"].format(sku),
+            labels["quantity"].format(quantity),
+        ]
+    return lines
+
+
+def mano_lines(order, rnd):
+    lines = [
+        "Vielen Dank für Ihre Bestellung beim Verkäufer AM.PM Europe GmbH",
+        order["number"],
+        "Bestelldatum Lieferzeit Träger",
+        f"{order['date']:%d.%m.%y, %H:%M} {rnd.randint(2, 9)} Tage {order['delivery']}",
+        "Kunden-Details",
+        f"+49{rnd.randrange(10**9, 10**10)} {order['buyer']} {order['buyer']}",
+        "Lieferanschrift",
+        f"Musterstraße {rnd.randint(1, 200)}",
+        "Referenz SKU Menge",
+    ]
+    lines += [f"{sku} {quantity}" for sku, quantity, _ in order["items"]]
+    lines += ["VAT Excl VAT", *_filler(rnd, 40)]
+    return lines
+
+
+def ampm_lines(order, rnd):
+    # The AMPM invoice layout carries a single article
+    sku, quantity, product = order["items"][0]
+    return [
+        f"BESTELLNUMMER: #{order['number']}",
+        f"BESTELLDATUM: {order['date']:%d.%m.%Y %H:%M}",
+        "VERSANDDETAILS",
+        f"{order['buyer']} {order['buyer']}",
+        f"Musterstraße {rnd.randint(1, 200)}",
+        *_filler(rnd, 80),
+        "TITEL ARTIKELNUMMER MENGE MWST PREIS",
+        product,
+        f"{sku[:3]}-{sku[3:]}.{rnd.randint(1, 9)}",
+        f"{quantity} 19% {rnd.randint(20, 900)},00",
+    ]
+
+
+def paginate(lines, lines_per_page=LINES_PER_PAGE):
+    return [lines[start:start + lines_per_page] for start in range(0, len(lines), lines_per_page)]
+
+
+def delivery_notes(marketplace, orders, seed=0, orders_per_file=50):
+    """Synthetic delivery-note PDFs as ``(filename, pdf bytes, pages, expected rows)``.
+
+    Orders follow each other without page breaks, so long orders run over
+    onto the next page. Home24 notes rotate through German, French and
+    Dutch. AMPM invoices hold one order per file.
+    """
+    rnd = random.Random(f"{marketplace}-{seed}")
+    if marketplace == "ampm":
+        orders_per_file = 1
+    files = []
+    for start in range(0, orders, orders_per_file):
+        lines = []
+        rows = 0
+        for number in range(start, min(start + orders_per_file, orders)):
+            order = random_order(rnd, f"{seed}{number:06d}")
+            if marketplace == "amazon":
+                order["number"] = f"302-{rnd.randrange(10**6, 10**7)}-{number:07d}"
+                lines += amazon_lines(order, rnd)
+            elif marketplace == "home24":
+                lines += home24_lines(order, rnd, ["de", "fr", "nl"][number % 3])
+            elif marketplace == "mano":
+                order["number"] = f"M{order['number']}"
+                lines += mano_lines(order, rnd)
+            elif marketplace == "ampm":
+                order["items"] = order["items"][:1]
+                lines += ampm_lines(order, rnd)
+            else:
+                raise ValueError(f"Unknown marketplace: {marketplace}")
+            rows += len(order["items"])
+        pages = paginate(lines)
+        files.append((f"{marketplace}_{start // orders_per_file:04d}.pdf", write_pdf(pages), len(pages), rows))
+    return files
+
+
+def ebay_csv(orders, seed=0):
+    """An eBay order report: a title line, then ``;``-separated rows, one per item."""
+    rnd = random.Random(f"ebay-{seed}")
+    months = ["Jan", "Feb", "Mär", "Apr", "Mai", "Jun", "Jul", "Aug", "Sep", "Okt", "Nov", "Dez"]
+    output = io.StringIO()
+    output.write("Bestellungen;;;;;\n")
+    writer = csv.writer(output, delimiter=";", quotechar='"', quoting=csv.QUOTE_ALL, lineterminator="\n")
+    writer.writerow(["Verkauft am", "Bestellnummer", "Name des Käufers", "Bestandseinheit", "Anzahl", "Versand"])
+    rows = 0
+    for number in range(orders):
+        order = random_order(rnd, f"{rnd.randint(10, 99)}-{number:05d}-{rnd.randint(10000, 99999)}")
+        sold_at = f"{order['date']:%d}-{months[order['date'].month - 1]}-{order['date']:%y}"
+        for sku, quantity, _ in order["items"]:
+            writer.writerow([sold_at, order["number"], order["buyer"], sku, quantity, order["delivery"]])
+            rows += 1
+    return output.getvalue(), rows
+
+
+def shopify_csv(orders, seed=0):
+    """A Shopify order export, one row per line item."""
+    rnd = random.Random(f"shopify-{seed}")
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(["Name", "Email", "Created at", "Billing Name", "Lineitem quantity", "Lineitem name", "Lineitem sku"])
+    rows = 0
+    for number in range(orders):
+        order = random_order(rnd, f"#{1000 + number}")
+        for sku, quantity, product in order["items"]:
+            writer.writerow([
+                order["number"], "kunde@example.com", f"{order['date']:%Y-%m-%d %H:%M:%S} +0100",
+                order["buyer"], quantity, product, sku,
+            ])
+            rows += 1
+    return output.getvalue(), rows
+
+
+PDF_MARKETPLACES = ["amazon", "home24", "mano", "ampm"]
+CSV_MARKETPLACES = {"ebay": ebay_csv, "shopify": shopify_csv}
+
+
+def generate_corpus(directory, orders=500, seed=0, orders_per_file=50, marketplaces=None):
+    """Write a corpus for every marketplace to ``directory``.
+
+    A ``manifest.json`` next to the files lists each file with its page
+    count and the number of rows the parser is expected to produce.
+    """
+    marketplaces = marketplaces or PDF_MARKETPLACES + list(CSV_MARKETPLACES)
+    os.makedirs(directory, exist_ok=True)
+    manifest = {"orders": orders, "seed": seed, "files": {}}
+    for marketplace in marketplaces:
+        if marketplace in CSV_MARKETPLACES:
+            content, rows = CSV_MARKETPLACES[marketplace](orders, seed)
+            name = f"{marketplace}.csv"
+            with open(os.path.join(directory, name), "w", encoding="utf-8-sig", newline="") as f:
+                f.write(content)
+            manifest["files"][marketplace] = [{"name": name, "pages": None, "rows": rows}]
+            continue
+        entries = manifest["files"][marketplace] = []
+        for name, pdf, pages, rows in delivery_notes(marketplace, orders, seed, orders_per_file):
+            with open(os.path.join(directory, name), "wb") as f:
+                f.write(pdf)
+            entries.append({"name": name, "pages": pages, "rows": rows})
+    with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
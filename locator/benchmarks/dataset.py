@@ -0,0 +1,176 @@
+import io
+import itertools
+import random
+from datetime import date, timedelta
+
+from collector.models import UsefulInfo
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image
+
+from ..facets import invalidate_order_facets
+from ..models import Item, Order, OrderItem
+from ..picklist import rebuild_pick_list
+from ..versions import ITEMS, ORDERS, bump_data_version
+
+STORES = ["Amazon", "Ebay", "Home24", "Mano", "Shopify", "AMPM"]
+# Roughly how orders are spread over the statuses in the warehouse
+STATUS_WEIGHTS = {"INP": 20, "COM": 70, "ONH": 5, "DEL": 3, "CAN": 2}
+LINES = 40
+PLACES_PER_LINE = 120
+# Up to this many items share a place on the shelf
+ITEMS_PER_PLACE = 4
+FIRST_ORDER_DATE = date(2024, 1, 1)
+
+
+def _copy(model, columns, rows):
+    """Load ``rows`` into the model's table with COPY, much faster than INSERT."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(r"\N" if value is None else str(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {model._meta.db_table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+
+def _next_ids(model, count):
+    """Reserve ``count`` primary keys, so rows can be copied with their ids."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+            [model._meta.db_table, count],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def seed_items(per_prefix, seed=0, batch_size=5000):
+    """Create ``per_prefix`` items for every model prefix.
+
+    Like on the shelves, items of a prefix are stored in number order,
+    a few to a place, from a random aisle onwards. Numbers continue after
+    the highest one of each prefix, so seeding can be repeated to grow
+    the data set.
+    """
+    rnd = random.Random(f"items-{seed}")
+    existing = {}
+    for prefix, number in Item.objects.values_list("model_prefix", "number"):
+        if number.isdigit():
+            existing[prefix] = max(existing.get(prefix, 0), int(number) + 1)
+    items = []
+    for prefix, _ in Item.MODEL_CHOICES:
+        slot = rnd.randrange(LINES * PLACES_PER_LINE)
+        capacity, shared = rnd.randint(1, ITEMS_PER_PLACE), 0
+        for offset in range(per_prefix):
+            if shared == capacity:
+                slot += 1
+                capacity, shared = rnd.randint(1, ITEMS_PER_PLACE), 0
+            shared += 1
+            line, place = divmod(slot % (LINES * PLACES_PER_LINE), PLACES_PER_LINE)
+            items.append(Item(
+                model_prefix=prefix,
+                number=f"{existing.get(prefix, 0) + offset:05d}",
+                line=line + 1,
+                place=place + 1,
+                # Most items have a few units in stock, a handful have a lot
+                quantity=int(rnd.expovariate(1 / 30)),
+            ))
+    with transaction.atomic():
+        Item.objects.bulk_create(items, batch_size=batch_size)
+        bump_data_version(ITEMS)
+    return len(items)
+
+
+def seed_orders(count, max_lines=4, seed=0, days=365, batch_size=50000, progress=None):
+    """Create ``count`` orders over all stores with 1 to ``max_lines`` items each.
+
+    Orders are spread over ``days`` days from FIRST_ORDER_DATE and a few
+    items are on most of them, like best sellers. Rows are loaded with
+    COPY in transactions of ``batch_size`` orders, so no signals are sent;
+    the pick list, facets and data version are refreshed at the end.
+    """
+    rnd = random.Random(f"orders-{seed}")
+    item_ids = list(Item.objects.order_by("id").values_list("id", flat=True))
+    if not item_ids:
+        raise ValueError("Seed items before orders")
+    rnd.shuffle(item_ids)
+    popularity = list(itertools.accumulate(1 / rank for rank in range(1, len(item_ids) + 1)))
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    # Order numbers are zero padded, so the last one sorts highest
+    last = (
+        Order.objects.filter(order_number__startswith=f"S{seed}-")
+        .order_by("-order_number").values_list("order_number", flat=True).first()
+    )
+    start = int(last.split("-")[1]) + 1 if last else 0
+    now = timezone.now().isoformat()
+    created = 0
+    while created < count:
+        size = min(batch_size, count - created)
+        orders, lines = [], []
+        with transaction.atomic():
+            for pk in _next_ids(Order, size):
+                status = rnd.choices(statuses, weights)[0]
+                orders.append((
+                    pk,
+                    rnd.choice(STORES),
+                    FIRST_ORDER_DATE + timedelta(days=rnd.randrange(days)),
+                    f"S{seed}-{start + created + len(orders):09d}",
+                    f"Customer {rnd.randrange(100000)}",
+                    status,
+                    "Waiting for stock" if status == "ONH" else None,
+                    now,
+                    now,
+                    1,
+                ))
+                picked = rnd.choices(item_ids, cum_weights=popularity, k=rnd.randint(1, max_lines))
+                lines.extend((pk, item_id, rnd.randint(1, 5)) for item_id in dict.fromkeys(picked))
+            _copy(Order, (
+                "id", "store_name", "date", "order_number", "customer_name",
+                "status", "notes", "created_at", "updated_at", "version",
+            ), orders)
+            _copy(OrderItem, ("id", "order_id", "item_id", "quantity"), (
+                (pk, *line) for pk, line in zip(_next_ids(OrderItem, len(lines)), lines)
+            ))
+        created += size
+        if progress:
+            progress("orders", created, count)
+    with transaction.atomic():
+        rebuild_pick_list()
+        invalidate_order_facets()
+        bump_data_version(ORDERS)
+    return created
+
+
+def seed_useful_info(count, images=20, seed=0, batch_size=5000):
+    """Create ``count`` UsefulInfo entries sharing ``images`` generated pictures."""
+    rnd = random.Random(f"info-{seed}")
+    names = []
+    for number in range(min(images, count)):
+        buffer = io.BytesIO()
+        colour = tuple(rnd.randrange(256) for _ in range(3))
+        Image.new("RGB", (640, 480), colour).save(buffer, "JPEG")
+        names.append(default_storage.save(f"images/seed-{seed}-{number}.jpg", ContentFile(buffer.getvalue())))
+    UsefulInfo.objects.bulk_create(
+        [
+            UsefulInfo(
+                title=f"Tip {seed}-{number}",
+                description=f"How to handle {rnd.choice(Item.MODEL_CHOICES)[0]} items in aisle {rnd.randint(1, LINES)}.",
+                image=names[number % len(names)] if names else None,
+            )
+            for number in range(count)
+        ],
+        batch_size=batch_size,
+    )
+    return count
+
+
+def seed_dataset(items_per_prefix, orders, max_lines=4, seed=0, infos=0, progress=None):
+    """Items for every prefix plus orders from several stores; returns the counts."""
+    return {
+        "items": seed_items(items_per_prefix, seed),
+        "orders": seed_orders(orders, max_lines, seed, progress=progress),
+        "infos": seed_useful_info(infos, seed=seed) if infos else 0,
+    }
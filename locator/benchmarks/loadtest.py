@@ -0,0 +1,297 @@
+import io
+import math
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from http.cookiejar import CookieJar
+
+import pandas as pd
+
+from ..models import Item, Order
+from .corpus import delivery_notes
+
+# How often each floor workflow is started, relative to the others
+WORKFLOW_WEIGHTS = {"scan": 30, "lookup": 30, "poll": 25, "status": 10, "upload": 5}
+PERCENTILES = (50, 95, 99)
+# Items both moved by scans and restocked by uploads, to surface lost updates
+HOT_ITEMS = 20
+STATUS_BURST = 5
+UPLOAD_ORDERS = 20
+PDF_ORDERS = 50
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of sorted ``values``."""
+    if not values:
+        return None
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+
+class Stats:
+    """Latencies and errors per endpoint, shared by all client threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.restocks = 0
+
+    def record(self, name, seconds, ok):
+        with self.lock:
+            self.latencies[name].append(seconds)
+            if not ok:
+                self.errors[name] += 1
+
+    def summary(self, elapsed):
+        endpoints = {}
+        for name, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            endpoints[name] = {
+                "requests": len(latencies),
+                "errors": self.errors[name],
+                "rps": round(len(latencies) / elapsed, 1),
+                **{f"p{p}_ms": round(percentile(latencies, p) * 1000, 1) for p in PERCENTILES},
+                "max_ms": round(latencies[-1] * 1000, 1),
+            }
+        return endpoints
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # Time the POST itself, not the page it redirects to
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Client:
+    """One floor device: its own cookies, CSRF token and cached ETags."""
+
+    def __init__(self, base_url, stats, timeout=60):
+        self.base_url = base_url.rstrip("/")
+        self.stats = stats
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies), _NoRedirect)
+        self.etags = {}
+
+    def request(self, name, path, data=None, headers=None, params=None):
+        url = f"{self.base_url}{path}"
+        if params:
+            url = f"{url}?{urllib.parse.urlencode(params)}"
+        request = urllib.request.Request(url, data=data, headers=headers or {})
+        started = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                status, body, response_headers = response.status, response.read(), response.headers
+        except urllib.error.HTTPError as e:
+            status, body, response_headers = e.code, e.read(), e.headers
+        except OSError:
+            self.stats.record(name, time.perf_counter() - started, False)
+            raise
+        self.stats.record(name, time.perf_counter() - started, status < 400)
+        return status, body, response_headers
+
+    def get(self, name, path, **params):
+        return self.request(name, path, params=params)
+
+    def poll(self, name, path, **params):
+        """GET that revalidates with the ETag of the previous response, like the pages do."""
+        key = (path, tuple(sorted(params.items())))
+        headers = {"If-None-Match": self.etags[key]} if key in self.etags else {}
+        status, body, response_headers = self.request(name, path, headers=headers, params=params)
+        if response_headers.get("ETag"):
+            self.etags[key] = response_headers["ETag"]
+        return status, body
+
+    def post(self, name, path, fields=None, files=None):
+        headers = {}
+        token = next((cookie.value for cookie in self.cookies if cookie.name == "csrftoken"), None)
+        if token:
+            headers["X-CSRFToken"] = token
+        if files:
+            body, headers["Content-Type"] = _multipart(fields or {}, files)
+        else:
+            body = urllib.parse.urlencode(fields or {}).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        return self.request(name, path, data=body, headers=headers)
+
+
+def _multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for key, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for key, filename, content in files:
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"; filename="{filename}"\r\n'
+            f"Content-Type: application/octet-stream\r\n\r\n".encode() + content + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def _xlsx(df):
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+@dataclass
+class Fixtures:
+    """Data the workflows pick from, read from the database the server uses."""
+
+    items: list
+    hot_items: list
+    order_ids: list
+    restock_file: bytes
+    pdf: tuple
+    stores: list
+
+    @classmethod
+    def load(cls, seed=0, sample=1000):
+        rnd = random.Random(f"loadtest-{seed}")
+        items = list(Item.objects.order_by("?").values_list("model_prefix", "number")[:sample])
+        order_ids = list(Order.objects.filter(status__in=["INP", "COM"]).order_by("?").values_list("id", flat=True)[:sample])
+        if not items or not order_ids:
+            raise ValueError("The database has no items or orders; run seed_scale first")
+        hot_items = rnd.sample(items, min(HOT_ITEMS, len(items)))
+        name, pdf, _, _ = delivery_notes("amazon", PDF_ORDERS, seed, PDF_ORDERS)[0]
+        return cls(
+            items=items,
+            hot_items=hot_items,
+            order_ids=order_ids,
+            restock_file=_xlsx(pd.DataFrame({
+                "item": [f"{prefix}{number}" for prefix, number in hot_items],
+                "quantity": [1] * len(hot_items),
+            })),
+            pdf=(name, pdf),
+            stores=list(Order.objects.order_by().values_list("store_name", flat=True).distinct()),
+        )
+
+    def hot_quantities(self):
+        quantities = {}
+        for prefix, number, quantity in Item.objects.filter(
+            model_prefix__in={prefix for prefix, _ in self.hot_items},
+            number__in={number for _, number in self.hot_items},
+        ).values_list("model_prefix", "number", "quantity"):
+            quantities[(prefix, number)] = quantity
+        return {code: quantities.get(code) or 0 for code in self.hot_items}
+
+
+def scan(client, fixtures, rnd):
+    """A picker scans an item and shelves it at a new place."""
+    client.get("set_item GET", "/")
+    # Half of the scans hit the items being restocked at the same time
+    prefix, number = rnd.choice(fixtures.hot_items if rnd.random() < 0.5 else fixtures.items)
+    client.post("set_item POST", "/", {
+        "model_prefix": prefix, "number": number, "line": rnd.randint(1, 40), "place": rnd.randint(1, 120),
+    })
+
+
+def lookup(client, fixtures, rnd):
+    """Pick a model prefix, then type an item number."""
+    prefix, number = rnd.choice(fixtures.items)
+    client.get("select-model", "/select-model/")
+    client.poll("fetch-model-numbers", "/fetch-model-numbers/", model_prefix=prefix)
+    client.get("item-typeahead", "/item-typeahead/", model_prefix=prefix, q=number[:2])
+
+
+def poll(client, fixtures, rnd):
+    """The pick-list screen refreshing itself."""
+    client.poll("collect-items", "/collect-items/", status="INP", store=rnd.choice(fixtures.stores + [""]))
+
+
+def status(client, fixtures, rnd):
+    """A packer completes, or reopens, a few orders in a row."""
+    for order_id in rnd.sample(fixtures.order_ids, min(STATUS_BURST, len(fixtures.order_ids))):
+        client.post("update-order-status", "/update-order-status/", {
+            "order_id": order_id, "status": rnd.choice(["COM", "INP"]),
+        })
+
+
+def upload(client, fixtures, rnd):
+    """The office uploads an order export, a restock sheet or delivery notes."""
+    kind = rnd.choice(["orders", "restock", "pdf"])
+    if kind == "orders":
+        client.get("upload_orders GET", "/upload/")
+        batch = uuid.UUID(int=rnd.getrandbits(128)).hex[:10]
+        codes = [f"{prefix}{number}" for prefix, number in rnd.sample(fixtures.items, min(3, len(fixtures.items)))]
+        orders = _xlsx(pd.DataFrame({
+            "store_name": [rnd.choice(fixtures.stores)] * UPLOAD_ORDERS,
+            "date": [time.strftime("%d.%m.%Y")] * UPLOAD_ORDERS,
+            "order_number": [f"LT{batch}{number:04d}" for number in range(UPLOAD_ORDERS)],
+            "customer_name": ["Load Test"] * UPLOAD_ORDERS,
+            "item": [",".join(codes)] * UPLOAD_ORDERS,
+            "quantity": [",".join(["1"] * len(codes))] * UPLOAD_ORDERS,
+        }))
+        client.post("upload_orders POST", "/upload/", files=[("file", "orders.xlsx", orders)])
+    elif kind == "restock":
+        client.get("upload_items GET", "/upload-items/")
+        status, _, _ = client.post(
+            "upload_items POST", "/upload-items/", {"update": "1"},
+            files=[("file", "restock.xlsx", fixtures.restock_file)],
+        )
+        if status == 200:
+            with client.stats.lock:
+                client.stats.restocks += 1
+    else:
+        name, pdf = fixtures.pdf
+        client.post("upload_pdfs POST", "/upload_pdfs/", files=[("pdf_files", name, pdf)])
+
+
+WORKFLOWS = {"scan": scan, "lookup": lookup, "poll": poll, "status": status, "upload": upload}
+
+
+def run_load_test(base_url, users=10, duration=30, weights=None, seed=0, think=0.0, timeout=60):
+    """Replay the floor workflows from ``users`` threads for ``duration`` seconds.
+
+    Returns the latency percentiles and throughput per endpoint, plus the
+    number of restock units lost to concurrent writes of the hot items.
+    """
+    weights = {**WORKFLOW_WEIGHTS, **(weights or {})}
+    names = [name for name, weight in weights.items() if weight > 0]
+    fixtures = Fixtures.load(seed)
+    stats = Stats()
+    failures = []
+    before = fixtures.hot_quantities()
+
+    def user(number):
+        rnd = random.Random(f"loadtest-{seed}-{number}")
+        client = Client(base_url, stats, timeout)
+        while time.monotonic() < deadline:
+            workflow = rnd.choices(names, [weights[name] for name in names])[0]
+            try:
+                WORKFLOWS[workflow](client, fixtures, rnd)
+            except OSError as e:
+                with stats.lock:
+                    failures.append(f"{workflow}: {e}")
+            if think:
+                time.sleep(rnd.expovariate(1 / think))
+
+    started = time.monotonic()
+    deadline = started + duration
+    threads = [threading.Thread(target=user, args=(number,), daemon=True) for number in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    after = fixtures.hot_quantities()
+    lost = sum(before[code] + stats.restocks - after[code] for code in fixtures.hot_items)
+    return {
+        "base_url": base_url,
+        "users": users,
+        "seconds": round(elapsed, 1),
+        "requests": sum(len(latencies) for latencies in stats.latencies.values()),
+        "endpoints": stats.summary(elapsed),
+        "lost_restock_units": lost,
+        "failures": failures[:20],
+    }
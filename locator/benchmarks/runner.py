@@ -0,0 +1,134 @@
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from ..convert_csv_to_excel import process_ebay_csv, process_shopify_csv
+from .corpus import CSV_MARKETPLACES, PDF_MARKETPLACES
+
+CSV_PROCESSORS = {"ebay": process_ebay_csv, "shopify": process_shopify_csv}
+
+# Higher is better for throughput, lower is better for memory
+THROUGHPUT_METRICS = ("pages_per_s", "rows_per_s")
+MEMORY_METRICS = ("peak_rss_mb",)
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_pdf(marketplace, paths):
+    from ..utils import pdf_report
+
+    df = pdf_report(marketplace, paths)
+    return 0 if df is None else len(df)
+
+
+def _run_csv(marketplace, paths):
+    rows = 0
+    for path in paths:
+        with open(path, encoding="utf-8-sig") as f:
+            rows += len(CSV_PROCESSORS[marketplace](f.read()))
+    return rows
+
+
+def _measure(marketplace, paths, repeat, workers, conn):
+    # Runs in a forked process so every parser starts from the same memory
+    # footprint and its peak RSS is its own
+    settings.PDF_CACHE_DIR = ""
+    settings.PDF_EXTRACTION_WORKERS = workers
+    run = _run_csv if marketplace in CSV_MARKETPLACES else _run_pdf
+    try:
+        start_rss = _peak_rss_mb()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = run(marketplace, paths)
+            timings.append(time.perf_counter() - started)
+        conn.send({"rows": rows, "seconds": min(timings), "start_rss_mb": start_rss, "peak_rss_mb": _peak_rss_mb()})
+    except Exception as e:
+        conn.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_benchmark(directory, marketplace, files, repeat=1, workers=1):
+    paths = [os.path.join(directory, entry["name"]) for entry in files]
+    parent, child = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.get_context("fork").Process(
+        target=_measure, args=(marketplace, paths, repeat, workers, child)
+    )
+    process.start()
+    child.close()
+    result = parent.recv()
+    process.join()
+    if "error" in result:
+        return result
+
+    pages = sum(entry["pages"] or 0 for entry in files)
+    expected_rows = sum(entry["rows"] for entry in files)
+    seconds = result["seconds"]
+    return {
+        "files": len(files),
+        "pages": pages or None,
+        "rows": result["rows"],
+        "expected_rows": expected_rows,
+        "seconds": round(seconds, 4),
+        "pages_per_s": round(pages / seconds, 1) if pages else None,
+        "rows_per_s": round(result["rows"] / seconds, 1),
+        "peak_rss_mb": round(result["peak_rss_mb"], 1),
+        "rss_growth_mb": round(result["peak_rss_mb"] - result["start_rss_mb"], 1),
+    }
+
+
+def run_benchmarks(directory, marketplaces=None, repeat=1, workers=1):
+    """Benchmark every marketplace parser on the corpus in ``directory``."""
+    with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    marketplaces = marketplaces or [
+        name for name in PDF_MARKETPLACES + list(CSV_MARKETPLACES) if name in manifest["files"]
+    ]
+    # Forked children must not share the parent's database connection
+    connections.close_all()
+    return {
+        "meta": {
+            "orders": manifest["orders"],
+            "seed": manifest["seed"],
+            "repeat": repeat,
+            "workers": workers,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "results": {
+            marketplace: run_benchmark(directory, marketplace, manifest["files"][marketplace], repeat, workers)
+            for marketplace in marketplaces
+        },
+    }
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Regressions of ``results`` against ``baseline`` beyond ``tolerance``.
+
+    Returns ``(marketplace, metric, baseline value, current value, change)``
+    tuples, where change is the relative change in the bad direction.
+    """
+    regressions = []
+    for marketplace, current in results["results"].items():
+        previous = baseline.get("results", {}).get(marketplace)
+        if not previous or "error" in current or "error" in previous:
+            continue
+        for metric in THROUGHPUT_METRICS + MEMORY_METRICS:
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (old - new) / old if metric in THROUGHPUT_METRICS else (new - old) / old
+            if change > tolerance:
+                regressions.append((marketplace, metric, old, new, change))
+    return regressions
@@ -1,12 +1,15 @@
 import csv
 import datetime
 import io
+import logging
 
 import pandas as pd
 from django.core.files.storage import FileSystemStorage
 from django.http import HttpResponse
 from django.shortcuts import render
 
+logger = logging.getLogger(__name__)
+
 # Mapping of German month names to numbers
 month_mapping = {
     "Jan": "01", "Feb": "02", "Mär": "03", "Apr": "04", "Mai": "05", "Jun": "06",
@@ -35,10 +38,10 @@ def process_ebay_csv(file_content):
     reader = csv.DictReader(relevant_lines, delimiter=';', quotechar='"')
 
     headers = reader.fieldnames
-    print("Headers:", headers)
+    logger.debug(f"Headers: {headers}")
 
     normalized_headers = {header.strip().lower(): header.strip() for header in headers if header.strip()}
-    print("Normalized Headers:", normalized_headers)
+    logger.debug(f"Normalized Headers: {normalized_headers}")
 
     required_headers = ['verkauft am', 'bestellnummer', 'name des käufers', 'bestandseinheit', 'anzahl']
     for header in required_headers:
@@ -71,10 +74,10 @@ def process_shopify_csv(file_content):
     reader = csv.DictReader(lines)
 
     headers = reader.fieldnames
-    print("Headers:", headers)
+    logger.debug(f"Headers: {headers}")
 
     normalized_headers = {header.strip().lower(): header.strip() for header in headers if header.strip()}
-    print("Normalized Headers:", normalized_headers)
+    logger.debug(f"Normalized Headers: {normalized_headers}")
 
     required_headers = ['created at', 'name', 'billing name', 'lineitem sku', 'lineitem quantity']
     for header in required_headers:
@@ -108,20 +111,16 @@ def upload_and_download(request):
     if request.method == 'POST' and request.FILES.get('csv_file'):
         csv_file = request.FILES.get('csv_file')
         fs = FileSystemStorage()
-        filename = fs.save(csv_file.name, csv_file)
-        uploaded_file_url = fs.url(filename)
-
-        with fs.open(filename) as csvfile:
-            file_content = csvfile.read().decode('utf-8-sig')
-
-            if 'process_ebay' in request.POST:
-                data = process_ebay_csv(file_content)
-                store_name = 'ebay'
-            elif 'process_shopify' in request.POST:
-                data = process_shopify_csv(file_content)
-                store_name = 'shopify'
-            else:
-                raise ValueError("Invalid form submission")
+        file_content = csv_file.read().decode('utf-8-sig')
+
+        if 'process_ebay' in request.POST:
+            data = process_ebay_csv(file_content)
+            store_name = 'ebay'
+        elif 'process_shopify' in request.POST:
+            data = process_shopify_csv(file_content)
+            store_name = 'shopify'
+        else:
+            raise ValueError("Invalid form submission")
 
         df = pd.DataFrame(data)
         excel_buffer = io.BytesIO()
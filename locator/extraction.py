@@ -0,0 +1,217 @@
+import io
+import logging
+import mmap
+import multiprocessing
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pdfplumber
+import PyPDF2
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+@contextmanager
+def open_pdf(source):
+    """Open a PDF given as bytes, a path, an uploaded file or any binary file.
+
+    Files on disk, including the temporary file Django spools large uploads
+    to, are memory-mapped instead of being copied into memory.
+    """
+    path = source if isinstance(source, str) else None
+    if hasattr(source, "temporary_file_path"):
+        path = source.temporary_file_path()
+    if isinstance(source, bytes):
+        yield io.BytesIO(source)
+    elif path is not None:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield f
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+    else:
+        source.seek(0)
+        yield source
+
+
+def iter_pages(source, engine, start=0, stop=None):
+    """Yield the text of the pages of one PDF, one page at a time.
+
+    pdfplumber pages are closed as soon as their text is read, so their
+    parsed layout objects do not pile up over a long document.
+    """
+    with open_pdf(source) as stream:
+        if engine == "pypdf2":
+            reader = PyPDF2.PdfReader(stream)
+            for page in reader.pages[start:stop]:
+                yield page.extract_text()
+        elif engine == "pdfplumber":
+            pages = None if stop is None else list(range(start + 1, stop + 1))
+            with pdfplumber.open(stream, pages=pages) as document:
+                for page in document.pages:
+                    text = page.extract_text()
+                    page.close()
+                    yield text
+        else:
+            raise ValueError(f"Unknown PDF engine: {engine}")
+
+
+def _read_pages(source, engine, start=0, stop=None):
+    # Runs inside the pool workers, so it must not touch Django
+    return list(iter_pages(source, engine, start, stop))
+
+
+def _portable(source):
+    # Paths and bytes can be sent to another process, open files cannot.
+    # Uploads Django already spooled to disk are passed by path.
+    if isinstance(source, (str, bytes)):
+        return source
+    if hasattr(source, "temporary_file_path"):
+        return source.temporary_file_path()
+    source.seek(0)
+    return source.read()
+
+
+def _page_count(source):
+    # Runs inside the pool workers; PyPDF2 only reads the page tree here
+    with open_pdf(source) as stream:
+        return len(PyPDF2.PdfReader(stream).pages)
+
+
+def _page_ranges(page_count):
+    pages_per_task = settings.PDF_PAGES_PER_TASK
+    if page_count is None or page_count <= pages_per_task:
+        return [(0, None)]
+    return [
+        (start, min(start + pages_per_task, page_count))
+        for start in range(0, page_count, pages_per_task)
+    ]
+
+
+def get_executor():
+    global _executor
+    if settings.PDF_EXTRACTION_WORKERS <= 1:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            try:
+                # Spawned workers only import this module, they never inherit
+                # the parent's database connections.
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.PDF_EXTRACTION_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            except (OSError, NotImplementedError) as e:
+                logger.warning(f"PDF extraction pool unavailable, extracting in-process: {e}")
+                return None
+        return _executor
+
+
+def _discard_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def iter_pdf_pages(sources, engine):
+    """Yield an iterator over the page texts of every PDF in ``sources``, in order.
+
+    Each iterator must be consumed before the next one is taken. Page ranges
+    of PDF_PAGES_PER_TASK pages are extracted in parallel on a process pool
+    of PDF_EXTRACTION_WORKERS processes, with at most two ranges per worker
+    in flight, so only a few ranges are held in memory at a time. Without a
+    pool the pages are extracted in-process, one at a time.
+    """
+    executor = get_executor()
+    if executor is None:
+        for source in sources:
+            yield iter_pages(source, engine)
+        return
+
+    sources = [_portable(source) for source in sources]
+    try:
+        # Pages are counted on the pool too, not in the request process
+        counts = [executor.submit(_page_count, source) for source in sources]
+    except (BrokenProcessPool, RuntimeError) as e:
+        logger.warning(f"PDF extraction pool failed, extracting in-process: {e}")
+        _discard_executor()
+        counts = [None] * len(sources)
+        executor = None
+
+    def page_count(index):
+        if counts[index] is None:
+            return None
+        try:
+            return counts[index].result()
+        except BrokenProcessPool:
+            return None
+        except Exception as e:
+            # Left for the extraction to raise, like any unreadable PDF
+            logger.warning(f"Could not count the pages of PDF {index + 1}: {e}")
+            return None
+
+    tasks = (
+        (index, start, stop)
+        for index in range(len(sources))
+        for start, stop in _page_ranges(page_count(index))
+    )
+    pending = deque()
+    window = 2 * settings.PDF_EXTRACTION_WORKERS
+
+    def submit():
+        nonlocal executor
+        while len(pending) < window:
+            task = next(tasks, None)
+            if task is None:
+                return
+            future = None
+            if executor is not None:
+                try:
+                    future = executor.submit(_read_pages, sources[task[0]], engine, *task[1:])
+                except (BrokenProcessPool, RuntimeError) as e:
+                    logger.warning(f"PDF extraction pool failed, extracting in-process: {e}")
+                    _discard_executor()
+                    executor = None
+            pending.append((task, future))
+
+    def file_pages(index):
+        nonlocal executor
+        while True:
+            submit()
+            if not pending:
+                return
+            task, future = pending.popleft()
+            if task[0] < index:
+                # A range of an earlier file its consumer did not read
+                if future is not None:
+                    future.cancel()
+                continue
+            if task[0] > index:
+                pending.appendleft((task, future))
+                return
+            _, start, stop = task
+            try:
+                pages = future.result() if future is not None else None
+            except BrokenProcessPool as e:
+                if executor is not None:
+                    logger.warning(f"PDF extraction pool failed, extracting in-process: {e}")
+                    _discard_executor()
+                    executor = None
+                pages = None
+            if pages is None:
+                pages = _read_pages(sources[index], engine, start, stop)
+            yield from pages
+
+    for index in range(len(sources)):
+        yield file_pages(index)
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Order
+
+ORDER_FACETS_CACHE_KEY = "order-facets"
+
+
+def _compute_order_facets():
+    status_names = dict(Order.STATUS_CHOICES)
+    return {
+        "stores": [
+            (row["store_name"], row["count"])
+            for row in Order.objects.values("store_name").annotate(count=Count("id")).order_by("store_name")
+        ],
+        "statuses": [
+            (row["status"], status_names.get(row["status"], ""), row["count"])
+            for row in Order.objects.values("status").annotate(count=Count("id")).order_by("status")
+        ],
+    }
+
+
+def get_order_facets():
+    """Stores and statuses present in the orders, with order counts.
+
+    ``{"stores": [(name, count)], "statuses": [(code, description, count)]}``
+    served from the cache; it is rebuilt after orders change.
+    """
+    facets = cache.get(ORDER_FACETS_CACHE_KEY)
+    if facets is None:
+        facets = _compute_order_facets()
+        cache.set(ORDER_FACETS_CACHE_KEY, facets, settings.ORDER_FACETS_TIMEOUT)
+    return facets
+
+
+def invalidate_order_facets():
+    # Drop the facets once the change is visible to other connections, so
+    # they are not rebuilt from the data before the change
+    transaction.on_commit(lambda: cache.delete(ORDER_FACETS_CACHE_KEY))
@@ -0,0 +1,73 @@
+import threading
+from bisect import bisect_left
+from itertools import groupby
+
+from asgiref.sync import sync_to_async
+
+from .models import Item
+from .versions import ITEMS, aget_data_versions, get_data_versions
+
+
+class ItemIndex:
+    """Sorted item numbers per model prefix at one items data version."""
+
+    def __init__(self, version, numbers):
+        self.version = version
+        self.numbers = numbers
+
+    @classmethod
+    def load(cls, version):
+        codes = sorted(Item.objects.values_list("model_prefix", "number"))
+        return cls(
+            version,
+            {prefix: [number for _, number in group] for prefix, group in groupby(codes, key=lambda code: code[0])},
+        )
+
+    def prefix_numbers(self, model_prefix):
+        return self.numbers.get(model_prefix, [])
+
+    def search(self, model_prefix, query, limit):
+        """Up to ``limit`` numbers of ``model_prefix`` starting with ``query``."""
+        numbers = self.prefix_numbers(model_prefix)
+        start = bisect_left(numbers, query)
+        # Numbers starting with query sort between it and query + the last code point
+        end = bisect_left(numbers, query + "\U0010ffff", start)
+        return numbers[start:min(end, start + limit)]
+
+    def manifest(self):
+        return {"version": self.version, "numbers": self.numbers}
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def _index_at(version):
+    global _index
+    index = _index
+    if index is None or index.version != version:
+        with _lock:
+            if _index is None or _index.version != version:
+                _index = ItemIndex.load(version)
+            index = _index
+    return index
+
+
+def get_item_index():
+    """This process's index, reloaded when the items data version moved on.
+
+    Costs one version lookup per call; the items are only read again after
+    they changed.
+    """
+    # Read the version first: a change during the load makes the next call
+    # reload rather than keep a stale index
+    return _index_at(get_data_versions([ITEMS])[ITEMS][0])
+
+
+async def aget_item_index():
+    """Async get_item_index(); a reload runs in a thread, off the event loop."""
+    version = (await aget_data_versions([ITEMS]))[ITEMS][0]
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    return await sync_to_async(_index_at)(version)
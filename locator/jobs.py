@@ -0,0 +1,259 @@
+import logging
+import math
+import threading
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+import pandas as pd
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, connections, transaction
+from django.utils import timezone
+
+from .convert_csv_to_excel import process_ebay_csv, process_shopify_csv
+from .models import Job, JobFile
+from .parsers import PARSERS
+from .utils import (ImportProgress, aggregate_sku_quantities, dataframe_to_excel,
+                    handle_update_file, handle_uploaded_file, import_orders_file,
+                    pdf_report)
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {}
+
+
+def job_handler(kind):
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+
+class JobLost(Exception):
+    """The job was requeued, so this worker no longer owns it."""
+
+
+class JobProgress(ImportProgress):
+    """Progress counter that writes to the job row instead of the cache.
+
+    Every write also renews the lease, and stops the handler with JobLost
+    once the job has been handed to another worker. Checkpoints are kept on
+    the job too, so a requeued job resumes where the last worker stopped.
+    """
+
+    min_interval = 1.0
+
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+        self.applied = job.applied_rows
+        self.published_at = 0.0
+
+    def checkpoint(self, rows):
+        # Runs in the handler's transaction, which JobLost rolls back
+        updated = Job.objects.filter(pk=self.job.pk, claim=self.job.claim, status="RUN").update(
+            applied_rows=rows, heartbeat_at=timezone.now()
+        )
+        if not updated:
+            raise JobLost(f"Job {self.job.pk} was requeued")
+
+    def publish(self):
+        now = time.monotonic()
+        if not self.done and now - self.published_at < self.min_interval:
+            return
+        self.published_at = now
+        updated = Job.objects.filter(pk=self.job.pk, claim=self.job.claim, status="RUN").update(
+            progress=self.rows, total=self.total, heartbeat_at=timezone.now()
+        )
+        if not updated:
+            raise JobLost(f"Job {self.job.pk} was requeued")
+
+
+class Lease:
+    """Renews a claimed job's heartbeat from a thread while the job runs.
+
+    Handlers can spend minutes in one call without reporting progress, so
+    the heartbeat does not rely on them.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(settings.JOB_HEARTBEAT_INTERVAL):
+                if not renew_lease(self.job):
+                    logger.warning(f"Job {self.job.pk} ({self.job.kind}) was requeued while running")
+                    return
+        finally:
+            # This thread has its own database connection
+            connections.close_all()
+
+
+def renew_lease(job):
+    return Job.objects.filter(pk=job.pk, claim=job.claim, status="RUN").update(heartbeat_at=timezone.now()) == 1
+
+
+def submit_job(kind, files=(), **params):
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    with transaction.atomic():
+        job = Job.objects.create(kind=kind, params=params)
+        JobFile.objects.bulk_create(
+            [JobFile(job=job, name=file.name, content=file.read()) for file in files]
+        )
+    logger.info(f"Queued job {job.pk} ({kind}) with {len(files)} files")
+    return job
+
+
+def claim_job():
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status="QUE")
+            .order_by("created_at")
+            .defer("artifact")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = "RUN"
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.claim = uuid.uuid4()
+        job.save(update_fields=["status", "started_at", "heartbeat_at", "claim"])
+    return job
+
+
+def requeue_stale_jobs():
+    """Queue again the running jobs whose worker stopped renewing the lease."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_LEASE_TIMEOUT)
+    return Job.objects.filter(status="RUN", heartbeat_at__lt=cutoff).update(
+        status="QUE", started_at=None, heartbeat_at=None, claim=None
+    )
+
+
+def run_job(job):
+    files = [
+        ContentFile(bytes(content), name=name)
+        for name, content in job.files.values_list("name", "content")
+    ]
+    # Results are only recorded while this worker still owns the claim, so
+    # a job requeued from under it is not reported twice
+    owned = Job.objects.filter(pk=job.pk, claim=job.claim, status="RUN")
+    with Lease(job):
+        try:
+            result, artifact, artifact_name = JOB_HANDLERS[job.kind](job, files, JobProgress(job))
+        except JobLost:
+            logger.warning(f"Job {job.pk} ({job.kind}) was requeued, stopped running it")
+            return
+        except Exception as e:
+            logger.exception(f"Job {job.pk} ({job.kind}) failed")
+            owned.update(
+                status="ERR",
+                error=f"{e}\n\n{traceback.format_exc()}",
+                finished_at=timezone.now(),
+            )
+            return
+    if not owned.update(
+        status="DON",
+        result=_json_safe(result),
+        artifact=artifact,
+        artifact_name=artifact_name or "",
+        finished_at=timezone.now(),
+    ):
+        logger.warning(f"Job {job.pk} ({job.kind}) was requeued, discarded its result")
+        return
+    job.files.all().delete()
+    logger.info(f"Job {job.pk} ({job.kind}) finished")
+
+
+def work(poll_interval=1.0, once=False):
+    requeued_at = 0.0
+    while True:
+        close_old_connections()
+        if time.monotonic() - requeued_at > settings.JOB_HEARTBEAT_INTERVAL:
+            requeued_at = time.monotonic()
+            requeued = requeue_stale_jobs()
+            if requeued:
+                logger.warning(f"Requeued {requeued} jobs whose worker stopped")
+        job = claim_job()
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+    connections.close_all()
+
+
+def _json_safe(value):
+    # pandas hands back NaN for empty cells, which is not valid JSON
+    if isinstance(value, dict):
+        return {str(key): _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _xlsx_name(prefix):
+    return f"{prefix}_{timezone.now():%Y-%m-%d_%H%M%S}.xlsx"
+
+
+@job_handler("import_orders")
+def import_orders_job(job, files, progress):
+    return import_orders_file(files[0], progress=progress), None, None
+
+
+@job_handler("import_items")
+def import_items_job(job, files, progress):
+    if job.params.get("mode") == "update":
+        results = handle_update_file(files[0], progress=progress)
+    else:
+        results = handle_uploaded_file(files[0], progress=progress)
+    return {"results": results}, None, None
+
+
+def _pdf_job(pdf_parser):
+    def handler(job, files, progress):
+        df = pdf_report(pdf_parser.name, files, progress=progress)
+        if df is None:
+            raise ValueError("No orders were extracted from the uploaded PDFs.")
+        return {"rows": len(df)}, dataframe_to_excel(df), _xlsx_name(pdf_parser.filename_prefix)
+    return handler
+
+
+for pdf_parser in PARSERS.values():
+    JOB_HANDLERS[f"pdf_{pdf_parser.name}"] = _pdf_job(pdf_parser)
+
+
+@job_handler("aggregate_skus")
+def aggregate_skus_job(job, files, progress):
+    result = aggregate_sku_quantities(files)
+    return {"rows": len(result)}, dataframe_to_excel(result), _xlsx_name("aggregated_quantities")
+
+
+def _csv_job(process, store_name):
+    def handler(job, files, progress):
+        data = process(files[0].read().decode("utf-8-sig"))
+        return {"rows": len(data)}, dataframe_to_excel(pd.DataFrame(data)), _xlsx_name(f"orders_{store_name}")
+    return handler
+
+
+JOB_HANDLERS["csv_ebay"] = _csv_job(process_ebay_csv, "ebay")
+JOB_HANDLERS["csv_shopify"] = _csv_job(process_shopify_csv, "shopify")
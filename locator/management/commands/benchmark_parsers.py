@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from locator.benchmarks.corpus import CSV_MARKETPLACES, PDF_MARKETPLACES, generate_corpus
+from locator.benchmarks.runner import compare, run_benchmarks
+
+COLUMNS = ["files", "pages", "rows", "seconds", "pages_per_s", "rows_per_s", "peak_rss_mb", "rss_growth_mb"]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the PDF and CSV order parsers on a synthetic corpus."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--corpus",
+            help="Corpus directory made by generate_corpus. A fresh corpus is generated when omitted.",
+        )
+        parser.add_argument("--orders", type=int, default=500, help="Orders per marketplace for a fresh corpus.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--marketplace",
+            action="append",
+            choices=PDF_MARKETPLACES + list(CSV_MARKETPLACES),
+            help="Only benchmark this marketplace; can be repeated.",
+        )
+        parser.add_argument("--repeat", type=int, default=1, help="Runs per parser; the fastest is reported.")
+        parser.add_argument("--workers", type=int, default=1, help="PDF_EXTRACTION_WORKERS for the run.")
+        parser.add_argument("--baseline", help="Baseline JSON file to compare the results against.")
+        parser.add_argument("--save", help="Write the results to this JSON file, e.g. as a new baseline.")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Relative slowdown or memory growth over the baseline reported as a regression.",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error when a regression is found.",
+        )
+
+    def handle(self, *args, **options):
+        if options["corpus"]:
+            results = self.run(options["corpus"], options)
+        else:
+            with tempfile.TemporaryDirectory() as directory:
+                self.stdout.write(f"Generating {options['orders']} orders per marketplace...")
+                generate_corpus(directory, options["orders"], options["seed"], marketplaces=options["marketplace"])
+                results = self.run(directory, options)
+
+        if options["save"]:
+            os.makedirs(os.path.dirname(options["save"]) or ".", exist_ok=True)
+            with open(options["save"], "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['save']}")
+
+        if options["baseline"]:
+            if not os.path.exists(options["baseline"]):
+                raise CommandError(f"Baseline {options['baseline']} does not exist")
+            with open(options["baseline"], encoding="utf-8") as f:
+                baseline = json.load(f)
+            regressions = compare(results, baseline, options["tolerance"])
+            for marketplace, metric, old, new, change in regressions:
+                self.stdout.write(self.style.ERROR(
+                    f"{marketplace} {metric}: {old} -> {new} ({change:.0%} worse)"
+                ))
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
+            elif options["fail_on_regression"]:
+                raise CommandError(f"{len(regressions)} regressions against {options['baseline']}")
+
+    def run(self, directory, options):
+        results = run_benchmarks(directory, options["marketplace"], options["repeat"], options["workers"])
+        self.stdout.write("parser    " + "".join(f"{column:>14}" for column in COLUMNS))
+        for marketplace, result in results["results"].items():
+            if "error" in result:
+                self.stdout.write(self.style.ERROR(f"{marketplace:<10}{result['error']}"))
+                continue
+            self.stdout.write(f"{marketplace:<10}" + "".join(
+                f"{'-' if result[column] is None else result[column]:>14}" for column in COLUMNS
+            ))
+            if result["rows"] != result["expected_rows"]:
+                self.stdout.write(self.style.WARNING(
+                    f"{marketplace}: parsed {result['rows']} rows, the corpus has {result['expected_rows']}"
+                ))
+        return results
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from locator.benchmarks.corpus import CSV_MARKETPLACES, PDF_MARKETPLACES, generate_corpus
+
+
+class Command(BaseCommand):
+    help = "Write synthetic delivery-note PDFs and marketplace CSVs for testing and benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="Directory to write the files and manifest.json to.")
+        parser.add_argument("--orders", type=int, default=500, help="Orders per marketplace.")
+        parser.add_argument("--orders-per-file", type=int, default=50, help="Orders per PDF.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--marketplace",
+            action="append",
+            choices=PDF_MARKETPLACES + list(CSV_MARKETPLACES),
+            help="Only generate this marketplace; can be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        manifest = generate_corpus(
+            options["directory"],
+            orders=options["orders"],
+            seed=options["seed"],
+            orders_per_file=options["orders_per_file"],
+            marketplaces=options["marketplace"],
+        )
+        for marketplace, files in manifest["files"].items():
+            pages = sum(entry["pages"] or 0 for entry in files)
+            rows = sum(entry["rows"] for entry in files)
+            self.stdout.write(f"{marketplace}: {len(files)} files, {pages} pages, {rows} rows")
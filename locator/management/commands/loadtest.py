@@ -0,0 +1,68 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from locator.benchmarks.loadtest import PERCENTILES, WORKFLOW_WEIGHTS, run_load_test
+
+COLUMNS = ["requests", "errors", "rps", *(f"p{p}_ms" for p in PERCENTILES), "max_ms"]
+
+
+class Command(BaseCommand):
+    help = "Replay the warehouse floor workflows against a running server and report latency per endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server to load, using this database.")
+        parser.add_argument("--users", type=int, default=10, help="Concurrent floor devices.")
+        parser.add_argument("--duration", type=int, default=30, help="Seconds to run for.")
+        parser.add_argument("--think", type=float, default=0.0, help="Mean pause between workflows, in seconds.")
+        parser.add_argument("--timeout", type=int, default=60, help="Seconds before a request is given up.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--workflow",
+            action="append",
+            default=[],
+            metavar="NAME=WEIGHT",
+            help=f"Change how often a workflow runs, e.g. upload=0; one of {', '.join(WORKFLOW_WEIGHTS)}.",
+        )
+        parser.add_argument("--save", help="Write the results to this JSON file.")
+
+    def handle(self, *args, **options):
+        weights = {}
+        for value in options["workflow"]:
+            name, _, weight = value.partition("=")
+            if name not in WORKFLOW_WEIGHTS or not weight.isdigit():
+                raise CommandError(f"Expected NAME=WEIGHT with NAME one of {', '.join(WORKFLOW_WEIGHTS)}: {value}")
+            weights[name] = int(weight)
+
+        self.stdout.write(f"{options['users']} users against {options['url']} for {options['duration']}s...")
+        try:
+            results = run_load_test(
+                options["url"],
+                users=options["users"],
+                duration=options["duration"],
+                weights=weights,
+                seed=options["seed"],
+                think=options["think"],
+                timeout=options["timeout"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"{'endpoint':<24}" + "".join(f"{column:>10}" for column in COLUMNS))
+        for name, result in results["endpoints"].items():
+            line = f"{name:<24}" + "".join(f"{result[column]:>10}" for column in COLUMNS)
+            self.stdout.write(self.style.ERROR(line) if result["errors"] else line)
+        self.stdout.write(f"{results['requests']} requests in {results['seconds']}s")
+        for failure in results["failures"]:
+            self.stdout.write(self.style.ERROR(failure))
+        if results["lost_restock_units"]:
+            self.stdout.write(self.style.ERROR(
+                f"{results['lost_restock_units']} restocked units lost to concurrent item writes"
+            ))
+
+        if options["save"]:
+            os.makedirs(os.path.dirname(options["save"]) or ".", exist_ok=True)
+            with open(options["save"], "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['save']}")
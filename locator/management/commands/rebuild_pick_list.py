@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from locator.models import PickListEntry
+from locator.picklist import rebuild_pick_list
+
+
+class Command(BaseCommand):
+    help = "Recompute the pick list from the orders, e.g. after changing them with raw SQL."
+
+    def handle(self, *args, **options):
+        rebuild_pick_list()
+        self.stdout.write(f"{PickListEntry.objects.count()} pick list entries")
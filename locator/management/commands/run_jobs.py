@@ -0,0 +1,50 @@
+import multiprocessing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from locator.jobs import work
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (uploads and conversions)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.JOB_WORKER_CONCURRENCY,
+            help="Number of worker processes.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait before checking an empty queue again.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty instead of waiting for new jobs.",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(options["concurrency"], 1)
+        self.stdout.write(f"Starting {concurrency} job workers")
+        if concurrency == 1:
+            work(options["poll_interval"], options["once"])
+            return
+
+        # Forked workers must not share the parent's database connection
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(
+                target=work, args=(options["poll_interval"], options["once"])
+            )
+            for _ in range(concurrency)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
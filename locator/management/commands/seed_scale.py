@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from locator.benchmarks.dataset import seed_items, seed_orders, seed_useful_info
+
+
+class Command(BaseCommand):
+    help = "Fill the database with production-sized synthetic items, orders and useful info."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items-per-prefix", type=int, default=2000)
+        parser.add_argument("--orders", type=int, default=1_000_000)
+        parser.add_argument("--max-lines", type=int, default=4, help="Most items on one order.")
+        parser.add_argument("--days", type=int, default=365, help="Days the order dates are spread over.")
+        parser.add_argument("--infos", type=int, default=1000, help="UsefulInfo entries.")
+        parser.add_argument("--images", type=int, default=20, help="Distinct images the entries share.")
+        parser.add_argument("--batch-size", type=int, default=50000, help="Orders per COPY transaction.")
+        parser.add_argument("--seed", type=int, default=0, help="Same seed, same data; another seed adds more.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        def progress(kind, done, total):
+            elapsed = time.monotonic() - started
+            self.stdout.write(f"{kind}: {done}/{total} ({done / elapsed:.0f}/s)")
+
+        seed = options["seed"]
+        items = seed_items(options["items_per_prefix"], seed)
+        self.stdout.write(f"items: {items} in {time.monotonic() - started:.1f}s")
+        started = time.monotonic()
+        orders = seed_orders(
+            options["orders"],
+            options["max_lines"],
+            seed,
+            days=options["days"],
+            batch_size=options["batch_size"],
+            progress=progress,
+        )
+        self.stdout.write(f"orders: {orders} in {time.monotonic() - started:.1f}s")
+        if options["infos"]:
+            started = time.monotonic()
+            infos = seed_useful_info(options["infos"], options["images"], seed)
+            self.stdout.write(f"useful info: {infos} in {time.monotonic() - started:.1f}s")
+        with connection.cursor() as cursor:
+            # Fresh statistics, so query plans match a production-sized table
+            cursor.execute("ANALYZE")
+        self.stdout.write(self.style.SUCCESS("Done"))
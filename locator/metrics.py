@@ -0,0 +1,424 @@
+import atexit
+import bisect
+import fcntl
+import functools
+import json
+import logging
+import os
+import resource
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+JOB_BUCKETS = (1, 5, 15, 60, 300, 900, 3600)
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """A Prometheus histogram kept in this process, one series per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * len(self.buckets), 0, 0]
+            counts = series[0]
+            for index in range(bisect.bisect_left(self.buckets, value), len(self.buckets)):
+                counts[index] += 1
+            series[1] += value
+            series[2] += 1
+        _changed()
+
+    def snapshot(self):
+        with self._lock:
+            return {key: [list(counts), total, count] for key, (counts, total, count) in self.series.items()}
+
+    @staticmethod
+    def merge(series, other):
+        for key, (counts, total, count) in other.items():
+            mine = series.setdefault(key, [[0] * len(counts), 0, 0])
+            mine[0] = [a + b for a, b in zip(mine[0], counts)]
+            mine[1] += total
+            mine[2] += count
+
+    def samples(self, states=None):
+        series = self.snapshot() if states is None else _merged(self, states)
+        for key, (counts, total, count) in sorted(series.items()):
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield f"{self.name}_bucket", key + (("le", _number(bound)),), bucket_count
+            yield f"{self.name}_bucket", key + (("le", "+Inf"),), count
+            yield f"{self.name}_sum", key, total
+            yield f"{self.name}_count", key, count
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self.series[key] = self.series.get(key, 0) + amount
+        _changed()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.series)
+
+    @staticmethod
+    def merge(series, other):
+        for key, value in other.items():
+            series[key] = series.get(key, 0) + value
+
+    def samples(self, states=None):
+        series = self.snapshot() if states is None else _merged(self, states)
+        for key, value in sorted(series.items()):
+            yield f"{self.name}_total", key, value
+
+
+REQUEST_LATENCY = Histogram(
+    "locator_http_request_duration_seconds", "Time spent handling requests, by URL name.", LATENCY_BUCKETS
+)
+REQUESTS = Counter("locator_http_requests", "Requests handled, by URL name, method and status code.")
+REQUEST_QUERIES = Histogram(
+    "locator_http_request_db_queries", "Database queries per request, by URL name.", QUERY_BUCKETS
+)
+REQUEST_DB_TIME = Histogram(
+    "locator_http_request_db_duration_seconds", "Time spent in the database per request, by URL name.",
+    LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram("locator_http_response_size_bytes", "Response body size, by URL name.", SIZE_BUCKETS)
+REQUEST_PEAK_MEMORY = Histogram(
+    "locator_http_request_peak_rss_growth_bytes",
+    "How much a request raised the process's peak resident memory, by URL name.",
+    (0,) + SIZE_BUCKETS + (67108864, 268435456),
+)
+IMPORT_DURATION = Histogram(
+    "locator_import_duration_seconds", "Time spent in importers and reports, by importer.", LATENCY_BUCKETS
+)
+PDF_CACHE_LOOKUPS = Counter("locator_pdf_cache_lookups", "Parsed PDF cache lookups, by result (hit or miss).")
+
+REGISTRY = [
+    REQUESTS, REQUEST_LATENCY, REQUEST_QUERIES, REQUEST_DB_TIME, RESPONSE_SIZE, REQUEST_PEAK_MEMORY,
+    IMPORT_DURATION, PDF_CACHE_LOOKUPS,
+]
+
+
+def peak_rss_bytes():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _dump(series):
+    return [[[list(label) for label in key], value] for key, value in series.items()]
+
+
+def _load(series):
+    return {tuple(tuple(label) for label in key): value for key, value in series}
+
+
+def _merged(metric, states):
+    series = {}
+    for state in states:
+        metric.merge(series, _load(state["metrics"].get(metric.name, [])))
+    return series
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MetricsFiles:
+    """The metrics of every process, shared through one JSON file per process.
+
+    gunicorn workers and job workers each keep their own counters, so every
+    process writes its state to ``directory`` at most every ``interval``
+    seconds and a scrape sums the files. Files of processes that exited on
+    this host are folded into an archive, so totals do not drop when a
+    worker is recycled and the directory does not grow with every worker.
+    """
+
+    archive_name = "exited.json"
+
+    def __init__(self, directory, interval):
+        self.directory = directory
+        self.interval = interval
+        self.host = socket.gethostname()
+        self.pid = os.getpid()
+        os.makedirs(directory, exist_ok=True)
+        # Unique even when a pid is reused after a restart
+        self.path = os.path.join(directory, f"{self.host}_{self.pid}_{uuid.uuid4().hex[:8]}.json")
+        self.dirty = threading.Event()
+        threading.Thread(target=self._flush_when_dirty, daemon=True).start()
+        atexit.register(self.flush)
+
+    def _flush_when_dirty(self):
+        while True:
+            self.dirty.wait()
+            time.sleep(self.interval)
+            self.flush()
+
+    def flush(self):
+        self.dirty.clear()
+        try:
+            _write_json(self.path, {
+                "host": self.host,
+                "pid": self.pid,
+                "peak_rss": peak_rss_bytes(),
+                "metrics": {metric.name: _dump(metric.snapshot()) for metric in REGISTRY if hasattr(metric, "merge")},
+            })
+        except OSError as e:
+            logger.warning(f"Could not write the metrics of process {self.pid}: {e}")
+
+    def _process_files(self):
+        with os.scandir(self.directory) as it:
+            names = [entry.name for entry in it if entry.name.endswith(".json") and entry.name != self.archive_name]
+        for name in names:
+            host, pid, _ = name[:-len(".json")].rsplit("_", 2)
+            yield os.path.join(self.directory, name), host, int(pid)
+
+    def _fold_exited(self):
+        exited = [path for path, host, pid in self._process_files() if host == self.host and not _running(pid)]
+        if not exited:
+            return
+        archive_path = os.path.join(self.directory, self.archive_name)
+        with open(os.path.join(self.directory, "fold.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            archive = _read_json(archive_path) or {"metrics": {}}
+            states = [archive]
+            for path in exited:
+                # Gone when another scrape folded it first
+                state = _read_json(path)
+                if state is not None:
+                    states.append(state)
+            if len(states) > 1:
+                _write_json(archive_path, {"metrics": {
+                    metric.name: _dump(_merged(metric, states)) for metric in REGISTRY if hasattr(metric, "merge")
+                }})
+            for path in exited:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def read(self):
+        """The states of all processes, this one up to date, and of the exited ones."""
+        self.flush()
+        self._fold_exited()
+        states = [_read_json(path) for path, _, _ in self._process_files()]
+        states.append(_read_json(os.path.join(self.directory, self.archive_name)))
+        return [state for state in states if state is not None]
+
+
+_files = None
+_files_lock = threading.Lock()
+
+
+def get_metrics_files():
+    """This process's MetricsFiles, or None when METRICS_DIR is empty."""
+    global _files
+    if not settings.METRICS_DIR:
+        return None
+    def stale():
+        # A forked child must not write to its parent's file
+        return _files is None or _files.pid != os.getpid() or _files.directory != settings.METRICS_DIR
+
+    if stale():
+        with _files_lock:
+            if stale():
+                if _files is not None:
+                    atexit.unregister(_files.flush)
+                _files = MetricsFiles(settings.METRICS_DIR, settings.METRICS_FLUSH_INTERVAL)
+    return _files
+
+
+def _changed():
+    files = get_metrics_files()
+    if files is not None:
+        files.dirty.set()
+
+
+class QueryStats:
+    """``connection.execute_wrapper`` that counts queries and their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+@contextmanager
+def timed(histogram, **labels):
+    """Record how long the block takes in ``histogram``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - started, **labels)
+
+
+def timed_import(importer):
+    """Decorator recording the duration of an importer in IMPORT_DURATION."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(IMPORT_DURATION, importer=importer):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class CollectedMetric:
+    """A metric computed when it is scraped.
+
+    ``collect`` is called with the process states read from METRICS_DIR, or
+    None when the metrics are not shared between processes.
+    """
+
+    def __init__(self, name, documentation, kind, collect):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.collect = collect
+
+    def samples(self, states=None):
+        return self.collect(states)
+
+
+# Jobs run in the worker processes, so their timings are read from the job
+# table rather than kept in this process
+def _job_duration_samples(states):
+    from .models import Job
+
+    duration = ExpressionWrapper(F("finished_at") - F("started_at"), output_field=DurationField())
+    buckets = {
+        f"le_{index}": Count("id", filter=Q(duration__lte=timedelta(seconds=bound)))
+        for index, bound in enumerate(JOB_BUCKETS)
+    }
+    rows = (
+        Job.objects.filter(started_at__isnull=False, finished_at__isnull=False)
+        .annotate(duration=duration)
+        .values("kind", "status")
+        .annotate(count=Count("id"), total=Sum("duration"), **buckets)
+        .order_by("kind", "status")
+    )
+    name = JOB_DURATION.name
+    for row in rows:
+        key = (("kind", row["kind"]), ("status", row["status"]))
+        for index, bound in enumerate(JOB_BUCKETS):
+            yield f"{name}_bucket", key + (("le", _number(bound)),), row[f"le_{index}"]
+        yield f"{name}_bucket", key + (("le", "+Inf"),), row["count"]
+        yield f"{name}_sum", key, row["total"].total_seconds() if row["total"] else 0.0
+        yield f"{name}_count", key, row["count"]
+
+
+def _job_count_samples(states):
+    from .models import Job
+
+    for row in Job.objects.values("kind", "status").annotate(count=Count("id")).order_by("kind", "status"):
+        yield JOBS.name, (("kind", row["kind"]), ("status", row["status"])), row["count"]
+
+
+def _peak_rss_samples(states):
+    if states is None:
+        yield PEAK_RSS.name, (), peak_rss_bytes()
+        return
+    for state in states:
+        if "pid" in state:
+            yield PEAK_RSS.name, (("process", f"{state['host']}:{state['pid']}"),), state["peak_rss"]
+
+
+JOB_DURATION = CollectedMetric(
+    "locator_job_duration_seconds", "Time from start to finish of background jobs.", "histogram",
+    _job_duration_samples,
+)
+JOBS = CollectedMetric("locator_jobs", "Background jobs by kind and status.", "gauge", _job_count_samples)
+PEAK_RSS = CollectedMetric(
+    "locator_process_peak_rss_bytes", "Peak resident memory of each running process.", "gauge", _peak_rss_samples
+)
+REGISTRY += [JOB_DURATION, JOBS, PEAK_RSS]
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format, summed over all processes."""
+    files = get_metrics_files()
+    states = files.read() if files is not None else None
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(
+            f"{name}{_label_text(labels)} {_number(value)}" for name, labels, value in metric.samples(states)
+        )
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,74 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+
+from .metrics import (REQUEST_DB_TIME, REQUEST_LATENCY, REQUEST_PEAK_MEMORY, REQUEST_QUERIES, REQUESTS,
+                      RESPONSE_SIZE, QueryStats, peak_rss_bytes)
+
+
+def _add_wrapper(wrapper):
+    connection.execute_wrappers.append(wrapper)
+
+
+def _remove_wrapper(wrapper):
+    connection.execute_wrappers.remove(wrapper)
+
+
+class MetricsMiddleware:
+    """Record latency, database queries, response size and memory per URL name."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        queries = QueryStats()
+        start_rss = peak_rss_bytes()
+        started = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        self.record(request, response, queries, time.perf_counter() - started, start_rss)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        # The ORM runs the queries of a request on its own thread with its
+        # own connection, so the wrapper has to be installed there
+        queries = QueryStats()
+        await sync_to_async(_add_wrapper)(queries)
+        start_rss = peak_rss_bytes()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            elapsed = time.perf_counter() - started
+            await sync_to_async(_remove_wrapper)(queries)
+        self.record(request, response, queries, elapsed, start_rss)
+        return response
+
+    def record(self, request, response, queries, elapsed, start_rss):
+        match = request.resolver_match
+        # Label by URL name rather than path so ids do not explode the series
+        view = (match.view_name or match._func_path) if match else "unresolved"
+        REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        REQUEST_LATENCY.observe(elapsed, view=view)
+        REQUEST_QUERIES.observe(queries.count, view=view)
+        REQUEST_DB_TIME.observe(queries.seconds, view=view)
+        REQUEST_PEAK_MEMORY.observe(peak_rss_bytes() - start_rss, view=view)
+        if not response.streaming:
+            RESPONSE_SIZE.observe(len(response.content), view=view)
+        elif response.has_header("Content-Length"):
+            RESPONSE_SIZE.observe(int(response["Content-Length"]), view=view)
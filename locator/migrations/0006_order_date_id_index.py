@@ -0,0 +1,20 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:35
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The index is built concurrently so the order table stays writable
+    atomic = False
+
+    dependencies = [
+        ("locator", "0005_job"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="order",
+            index=models.Index(fields=["date", "id"], name="locator_order_date_id_idx"),
+        ),
+    ]
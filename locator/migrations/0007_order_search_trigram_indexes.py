@@ -0,0 +1,52 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:36
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import DatabaseError, migrations
+
+
+class CreateTrigramExtension(TrigramExtension):
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        try:
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        except DatabaseError as e:
+            raise RuntimeError(
+                "Could not create the pg_trgm extension. It ships with the Postgres contrib "
+                "package, and creating it needs a superuser (from Postgres 13, the CREATE privilege "
+                "on the database is enough). Run CREATE EXTENSION pg_trgm; in this database as such "
+                f"a user, then migrate again.\n{e}"
+            ) from e
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently so the order table stays writable
+    atomic = False
+
+    dependencies = [
+        ("locator", "0006_order_date_id_index"),
+    ]
+
+    operations = [
+        CreateTrigramExtension(),
+        AddIndexConcurrently(
+            model_name="order",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("order_number"),
+                    name="gin_trgm_ops",
+                ),
+                name="order_number_trgm_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="order",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("customer_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="order_customer_trgm_idx",
+            ),
+        ),
+    ]
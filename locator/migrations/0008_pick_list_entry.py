@@ -0,0 +1,81 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_pick_list(apps, schema_editor):
+    OrderItem = apps.get_model("locator", "OrderItem")
+    PickListEntry = apps.get_model("locator", "PickListEntry")
+    PickListEntry.objects.bulk_create(
+        [
+            PickListEntry(
+                store_name=row["order__store_name"],
+                status=row["order__status"],
+                item_id=row["item_id"],
+                quantity=row["quantity"],
+                lines=row["lines"],
+            )
+            for row in OrderItem.objects.values("order__store_name", "order__status", "item_id")
+            .annotate(quantity=Sum("quantity"), lines=Count("id"))
+            .order_by()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("locator", "0007_order_search_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PickListEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("store_name", models.CharField(max_length=255)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("DEL", "Delivered"),
+                            ("INP", "In Progress"),
+                            ("ONH", "On Hold"),
+                            ("CAN", "Cancelled"),
+                            ("COM", "Completed"),
+                        ],
+                        max_length=3,
+                    ),
+                ),
+                ("quantity", models.IntegerField(default=0)),
+                ("lines", models.IntegerField(default=0)),
+                (
+                    "item",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="locator.item",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="picklistentry",
+            constraint=models.UniqueConstraint(
+                fields=("store_name", "status", "item"), name="unique_pick_list_entry"
+            ),
+        ),
+        migrations.RunPython(populate_pick_list, migrations.RunPython.noop),
+    ]
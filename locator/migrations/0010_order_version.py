@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("locator", "0009_data_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:10
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently so the tables stay writable
+    atomic = False
+
+    dependencies = [
+        ("locator", "0010_order_version"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="item",
+            index=models.Index(fields=["line", "place"], name="item_line_place_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="order",
+            index=models.Index(fields=["status", "store_name", "-date"], name="order_status_store_date_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="order",
+            index=models.Index(
+                condition=models.Q(("status", "INP")), fields=["date", "id"], name="order_inp_date_id_idx"
+            ),
+        ),
+    ]
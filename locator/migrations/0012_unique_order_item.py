@@ -0,0 +1,44 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:12
+
+from django.db import migrations, models
+
+# Fold repeated lines of an item on one order into the first of them
+MERGE_DUPLICATE_LINES = """
+WITH merged AS (
+    SELECT order_id, item_id, MIN(id) AS keep_id, SUM(quantity) AS quantity
+    FROM locator_orderitem
+    GROUP BY order_id, item_id
+    HAVING COUNT(*) > 1
+), kept AS (
+    UPDATE locator_orderitem line SET quantity = merged.quantity
+    FROM merged WHERE line.id = merged.keep_id
+)
+DELETE FROM locator_orderitem line
+USING merged
+WHERE line.order_id = merged.order_id AND line.item_id = merged.item_id AND line.id <> merged.keep_id
+"""
+
+# The pick list counts lines, so it is recomputed after the merge
+REBUILD_PICK_LIST = """
+DELETE FROM locator_picklistentry;
+INSERT INTO locator_picklistentry (store_name, status, item_id, quantity, lines)
+SELECT o.store_name, o.status, line.item_id, SUM(line.quantity), COUNT(*)
+FROM locator_orderitem line JOIN locator_order o ON o.id = line.order_id
+GROUP BY o.store_name, o.status, line.item_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("locator", "0011_order_item_lookup_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(MERGE_DUPLICATE_LINES, migrations.RunSQL.noop),
+        migrations.RunSQL(REBUILD_PICK_LIST, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name="orderitem",
+            constraint=models.UniqueConstraint(fields=("order", "item"), name="unique_order_item"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("locator", "0012_unique_order_item"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="claim",
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="heartbeat_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("locator", "0013_job_lease"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="applied_rows",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
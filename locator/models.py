@@ -1,4 +1,7 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import models, transaction
+from django.db.models.functions import Upper
+from django.utils import timezone
 
 
 class Item(models.Model):
@@ -41,6 +44,10 @@ class Item(models.Model):
     class Meta:
         ordering = ["line", "place"]
         unique_together = ('number', 'model_prefix')
+        indexes = [
+            # Serves the default ordering without a sort
+            models.Index(fields=["line", "place"], name="item_line_place_idx"),
+        ]
 
     def __str__(self):
         return f"{self.model_prefix}{self.number}"
@@ -64,6 +71,32 @@ class Order(models.Model):
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Bumped on every write, so status transitions can detect concurrent edits
+    version = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the order list seeks on (date, id)
+            models.Index(fields=["date", "id"], name="locator_order_date_id_idx"),
+            # Store/status filters of the order list and admin, newest first
+            models.Index(fields=["status", "store_name", "-date"], name="order_status_store_date_idx"),
+            # Most pages show the orders still in progress, a small share of
+            # the table once orders get completed
+            models.Index(fields=["date", "id"], condition=models.Q(status="INP"), name="order_inp_date_id_idx"),
+            # icontains compiles to UPPER(column) LIKE UPPER(%s), so the
+            # trigram indexes are built on the upper-cased columns
+            GinIndex(OpClass(Upper("order_number"), name="gin_trgm_ops"), name="order_number_trgm_idx"),
+            GinIndex(OpClass(Upper("customer_name"), name="gin_trgm_ops"), name="order_customer_trgm_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+        # The pick list receivers lock the order from pre_save to post_save
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Order {self.order_number} from {self.store_name} - {self.get_status_display()}"
@@ -79,5 +112,93 @@ class OrderItem(models.Model):
     item = models.ForeignKey(Item, on_delete=models.CASCADE)
     quantity = models.IntegerField()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["order", "item"], name="unique_order_item"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # The pick list receivers lock the order from pre_save to post_save
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Order: {self.order.order_number}, Item: {self.item}, Quantity: {self.quantity}"
+
+
+class PickListEntry(models.Model):
+    """Quantity of an item on the orders of one store and status.
+
+    Kept up to date from order and order item changes, see locator.picklist.
+    """
+
+    store_name = models.CharField(max_length=255)
+    status = models.CharField(max_length=3, choices=Order.STATUS_CHOICES)
+    # Rows of deleted items are removed by a post_delete receiver on Item,
+    # so cascades cannot trip over the order item receivers re-adding them
+    item = models.ForeignKey(Item, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+")
+    quantity = models.IntegerField(default=0)
+    lines = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["store_name", "status", "item"], name="unique_pick_list_entry")
+        ]
+
+    def __str__(self):
+        return f"{self.item_id} x{self.quantity} ({self.store_name}, {self.status})"
+
+
+class DataVersion(models.Model):
+    """Counter bumped whenever a dataset changes, see locator.versions."""
+
+    name = models.CharField(max_length=20, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class Job(models.Model):
+    STATUS_CHOICES = [
+        ("QUE", "Queued"),
+        ("RUN", "Running"),
+        ("DON", "Done"),
+        ("ERR", "Failed"),
+    ]
+
+    kind = models.CharField(max_length=50)
+    status = models.CharField(max_length=3, choices=STATUS_CHOICES, default="QUE")
+    params = models.JSONField(default=dict, blank=True)
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    artifact = models.BinaryField(null=True, blank=True)
+    artifact_name = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Set by the worker that claimed the job; only that worker may report
+    # progress or a result, and only while it keeps the heartbeat fresh
+    claim = models.UUIDField(null=True, blank=True, editable=False)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    # Rows the handler has committed so far; a requeued job skips them
+    # instead of applying them a second time
+    applied_rows = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"Job {self.pk} ({self.kind}) - {self.get_status_display()}"
+
+
+class JobFile(models.Model):
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="files")
+    name = models.CharField(max_length=255)
+    content = models.BinaryField()
+
+    def __str__(self):
+        return f"{self.name} for job {self.job_id}"
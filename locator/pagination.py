@@ -0,0 +1,87 @@
+from dataclasses import dataclass
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    next_cursor: str = None
+    previous_cursor: str = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator:
+    """Seek pagination on ``(date, id)``, newest first.
+
+    Pages are fetched with ``WHERE date <= %s AND (date < %s OR id < %s)``
+    instead of an OFFSET, so with an index on ``(date, id)`` every page
+    costs the same however deep it is. Cursors are ``<date>_<id>`` of the
+    last (``after``) or first (``before``) row of the neighbouring page.
+    """
+
+    def __init__(self, queryset, page_size, date_field="date"):
+        self.queryset = queryset
+        self.page_size = page_size
+        self.date_field = date_field
+
+    def cursor(self, obj):
+        return f"{getattr(obj, self.date_field).isoformat()}_{obj.pk}"
+
+    def parse_cursor(self, cursor):
+        """``(date, pk)`` of a cursor, or None when it is malformed."""
+        try:
+            value, pk = cursor.rsplit("_", 1)
+            field = self.queryset.model._meta.get_field(self.date_field)
+            return field.to_python(value), int(pk)
+        except (ValueError, ValidationError):
+            return None
+
+    def _seek(self, key, older):
+        date, pk = key
+        if older:
+            return Q(**{f"{self.date_field}__lte": date}) & (
+                Q(**{f"{self.date_field}__lt": date}) | Q(pk__lt=pk)
+            )
+        return Q(**{f"{self.date_field}__gte": date}) & (
+            Q(**{f"{self.date_field}__gt": date}) | Q(pk__gt=pk)
+        )
+
+    def page(self, after=None, before=None):
+        after = self.parse_cursor(after) if after else None
+        before = self.parse_cursor(before) if before and not after else None
+        newest_first = (f"-{self.date_field}", "-pk")
+
+        if before is not None:
+            # Walk backwards from the cursor, then restore the display order
+            rows = list(
+                self.queryset.filter(self._seek(before, older=False))
+                .order_by(self.date_field, "pk")[:self.page_size + 1]
+            )
+            has_previous = len(rows) > self.page_size
+            rows = rows[:self.page_size][::-1]
+            has_next = True
+        else:
+            queryset = self.queryset
+            if after is not None:
+                queryset = queryset.filter(self._seek(after, older=True))
+            rows = list(queryset.order_by(*newest_first)[:self.page_size + 1])
+            has_next = len(rows) > self.page_size
+            rows = rows[:self.page_size]
+            has_previous = after is not None
+
+        if not rows:
+            return KeysetPage([])
+        return KeysetPage(
+            rows,
+            next_cursor=self.cursor(rows[-1]) if has_next else None,
+            previous_cursor=self.cursor(rows[0]) if has_previous else None,
+        )
@@ -0,0 +1,10 @@
+from .base import (MARKETPLACE_COLUMNS, PARSERS, FieldScanner, MarketplaceParser,
+                   get_parser, iter_lines, pdfplumber_chunks, register, split_orders)
+
+# Importing the marketplace modules registers their parsers
+from . import amazon, ampm, home24, mano  # noqa: F401,E402
+
+__all__ = [
+    'MARKETPLACE_COLUMNS', 'PARSERS', 'FieldScanner', 'MarketplaceParser',
+    'get_parser', 'iter_lines', 'pdfplumber_chunks', 'register', 'split_orders',
+]
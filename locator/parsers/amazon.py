@@ -0,0 +1,82 @@
+import re
+
+from .base import MarketplaceParser, register
+
+ORDER_SEPARATOR_RE = re.compile(re.escape('Liefern an:'))
+ITEM_LINE_RE = re.compile(r'^(\d+)\s*(\S*)\s*(.*)$')
+
+
+@register
+class AmazonParser(MarketplaceParser):
+    name = 'amazon'
+    version = 2
+    engine = 'pypdf2'
+    columns = ['Order number', 'Order date', 'Buyer name', 'SKU', 'Quantity', 'Delivery service']
+    filename_prefix = 'orders'
+    order_separator = ORDER_SEPARATOR_RE
+    allow_empty = True
+
+    def text_chunks(self, pages, name=None):
+        return pages
+
+    def parse_order(self, order_text):
+        lines = order_text.strip().split('\n')
+        order_number = ''
+        order_date = ''
+        buyer_name = ''
+        delivery_service = ''
+        items = []
+        in_item_section = False
+        i = 0
+        while i < len(lines):
+            line = lines[i].strip()
+            # Extract buyer name (first non-empty line)
+            if buyer_name == '' and line != '':
+                buyer_name = line
+            # Extract order number
+            if line.startswith('Bestellnummer:'):
+                order_number = line.replace('Bestellnummer:', '').strip()
+            elif 'Bestelldatum' in line and 'Käufer' in line and 'Versandart' in line:
+                # Next line contains the data
+                if i + 1 < len(lines):
+                    parts = lines[i + 1].strip().split()
+                    if len(parts) >= 4:
+                        order_date = parts[1]
+                        delivery_service = parts[-1]
+                        buyer_name = ' '.join(parts[2:-1])
+                    i += 1  # Skip data line
+            elif line.startswith('Menge Produktdetails'):
+                in_item_section = True
+            elif in_item_section:
+                if line.startswith('EUR '):
+                    in_item_section = False
+                elif line:
+                    match = ITEM_LINE_RE.match(line)
+                    if match:
+                        item_quantity = match.group(1)
+                        possible_sku = match.group(2)
+                        # Look for a 'SKU:' line after this line
+                        item_sku = possible_sku
+                        for j in range(i + 1, len(lines)):
+                            sku_line = lines[j].strip()
+                            if sku_line.startswith('SKU:'):
+                                item_sku = sku_line.replace('SKU:', '').strip()
+                                i = j  # Move index to SKU line
+                                break
+                            elif sku_line.startswith('Artikelnr.:'):
+                                # No 'SKU:' line for this item
+                                break
+                        items.append({'quantity': item_quantity, 'sku': item_sku})
+            i += 1
+
+        return [
+            {
+                'Order number': order_number,
+                'Order date': order_date,
+                'Buyer name': buyer_name,
+                'SKU': item['sku'],
+                'Quantity': item['quantity'],
+                'Delivery service': delivery_service,
+            }
+            for item in items
+        ]
@@ -0,0 +1,84 @@
+import re
+
+from .base import MarketplaceParser, iter_lines, pdfplumber_chunks, register
+
+ORDER_NUMBER_RE = re.compile(r'BESTELLNUMMER\s*:\s*(#?\S+)')
+ORDER_DATE_RE = re.compile(r'BESTELLDATUM\s*:\s*([\d\.]+\s*[\d:]+)')
+SKU_LINE_RE = re.compile(r'^[A-Z0-9.-]{5,}$')
+# Quantity is the number right before the VAT percentage
+QUANTITY_RE = re.compile(r'\b(\d+)\b\s*\d+%.*')
+
+
+@register
+class AmpmParser(MarketplaceParser):
+    """AMPM shop invoices: one order per PDF, read line by line."""
+
+    name = 'ampm'
+    version = 2
+    filename_prefix = 'ampm_orders'
+
+    def text_chunks(self, pages, name=None):
+        return pdfplumber_chunks(pages, name, empty_page='[Page {page_num} has no extractable text]\n')
+
+    def iter_rows(self, chunks):
+        order_number = ''
+        order_date = ''
+        buyer_name = ''
+        sku = ''
+        quantity = ''
+        buyer_line_next = False
+        # Item headers still waiting for their SKU line
+        awaiting_sku = False
+        # [sku, lines left to look for its quantity in]
+        pending_item = None
+        for line in iter_lines(chunks):
+            line = line.strip()
+            if buyer_line_next:
+                # The line after VERSANDDETAILS contains the buyer's name repeated
+                buyer_name_parts = line.split()
+                if len(buyer_name_parts) >= 2:
+                    buyer_name = ' '.join(buyer_name_parts[:2])
+                else:
+                    buyer_name = line
+                buyer_line_next = False
+            if pending_item is not None:
+                # Quantity is on the SKU line or one of the next four lines
+                match = QUANTITY_RE.search(line)
+                if match:
+                    sku, quantity = pending_item[0], match.group(1)
+                    pending_item = None
+                else:
+                    pending_item[1] -= 1
+                    if not pending_item[1]:
+                        sku, quantity = pending_item[0], ''
+                        pending_item = None
+            if awaiting_sku and SKU_LINE_RE.match(line):
+                awaiting_sku = False
+                match = QUANTITY_RE.search(line)
+                if match:
+                    sku, quantity = line, match.group(1)
+                else:
+                    pending_item = [line, 4]
+
+            if 'BESTELLNUMMER' in line:
+                match = ORDER_NUMBER_RE.search(line)
+                if match:
+                    order_number = match.group(1).strip()
+            elif 'BESTELLDATUM' in line:
+                match = ORDER_DATE_RE.search(line)
+                if match:
+                    order_date = match.group(1).strip()
+            elif 'VERSANDDETAILS' in line:
+                buyer_line_next = True
+            elif 'TITEL' in line and 'ARTIKELNUMMER' in line:
+                awaiting_sku = True
+        if pending_item is not None:
+            sku, quantity = pending_item[0], ''
+        yield {
+            'Order number': order_number,
+            'Order date': order_date,
+            "Buyer's name": buyer_name,
+            'SKU': sku,
+            'Quantity': quantity,
+            'Delivery service': 'Unknown',
+        }
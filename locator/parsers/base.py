@@ -0,0 +1,174 @@
+import logging
+import re
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PARSERS = {}
+
+# Longest text a separator match can span across a chunk boundary
+SEPARATOR_LOOKBACK = 256
+
+MARKETPLACE_COLUMNS = ['Order number', 'Order date', "Buyer's name", 'SKU', 'Quantity', 'Delivery service']
+
+
+def register(cls):
+    PARSERS[cls.name] = cls()
+    return cls
+
+
+def get_parser(name):
+    try:
+        return PARSERS[name]
+    except KeyError:
+        raise KeyError(f"No parser registered for '{name}'") from None
+
+
+def pdfplumber_chunks(pages, name=None, empty_page=None):
+    """Page texts as joined by pdfplumber users: one newline after each page."""
+    for page_num, page_text in enumerate(pages, start=1):
+        if page_text:
+            yield page_text + '\n'
+        elif empty_page is not None:
+            yield empty_page.format(page_num=page_num)
+        else:
+            logger.debug(f"No text found on page {page_num} of {name}")
+
+
+def iter_lines(chunks):
+    """Yield the lines of a stream of text chunks, as if the chunks were joined first."""
+    carry = ''
+    for chunk in chunks:
+        lines = (carry + chunk).split('\n')
+        carry = lines.pop()
+        yield from lines
+    yield carry
+
+
+def split_orders(chunks, separator, keep_preamble=False):
+    """Yield the text of each order in a stream of text chunks.
+
+    Behaves like ``separator.split(''.join(chunks))[1:]`` without building
+    the whole text: an order is yielded as soon as the next separator is
+    seen, and only the text from the last separator on is carried over to
+    the next chunk. With ``keep_preamble`` the text before the first
+    separator is yielded too, unless it is blank.
+    """
+    carry = ''
+    in_preamble = True
+    for chunk in chunks:
+        # Only text near the end of the carry can start a separator that
+        # was cut off by the previous chunk boundary
+        resume = max(0, len(carry) - SEPARATOR_LOOKBACK)
+        if not in_preamble:
+            resume = max(resume, separator.match(carry).end())
+        carry += chunk
+        matches = list(separator.finditer(carry, resume))
+        if not matches:
+            if in_preamble and not keep_preamble:
+                carry = carry[-SEPARATOR_LOOKBACK:]
+            continue
+        if in_preamble:
+            if keep_preamble and carry[:matches[0].start()].strip():
+                yield carry[:matches[0].start()]
+            in_preamble = False
+        else:
+            # The separator of the order carried over from earlier chunks
+            matches.insert(0, separator.match(carry))
+        for match, next_match in zip(matches, matches[1:]):
+            yield carry[match.end():next_match.start()]
+        carry = carry[matches[-1].start():]
+
+    if in_preamble:
+        if keep_preamble and carry.strip():
+            yield carry
+        return
+    yield carry[separator.match(carry).end():]
+
+
+class FieldScanner:
+    """Find several labelled fields in a single pass over the text.
+
+    ``fields`` maps a field name to a list of ``(label, value)`` regex pairs
+    in order of preference, e.g. one pair per language. The labels are
+    joined into one alternation and the text is scanned once; each value
+    regex is matched where its label ends. For each field the first
+    occurrence of the most preferred pair wins, the same result as trying
+    the pairs one by one with ``re.search``.
+    """
+
+    def __init__(self, fields, flags=re.I):
+        self.groups = {}
+        labels = []
+        for field, pairs in fields.items():
+            for preference, (label, value) in enumerate(pairs):
+                group = f"f{len(self.groups)}"
+                self.groups[group] = (field, preference, re.compile(value, flags))
+                labels.append(f"(?P<{group}>{label})")
+        pattern = '|'.join(labels)
+        first_chars = {label[0] for pairs in fields.values() for label, _ in pairs}
+        if all(char.isalpha() for char in first_chars):
+            # Let the engine skip positions no label can start at
+            chars = ''.join(sorted(first_chars | {char.swapcase() for char in first_chars}))
+            pattern = f"(?=[{chars}])(?:{pattern})"
+        self.regex = re.compile(pattern, flags)
+
+    def scan(self, text):
+        found = {}
+        for match in self.regex.finditer(text):
+            field, preference, value_re = self.groups[match.lastgroup]
+            if field in found and found[field][0] <= preference:
+                continue
+            value = value_re.match(text, match.end())
+            if value is not None:
+                found[field] = (preference, value.group())
+        return {field: value.strip() for field, (_, value) in found.items()}
+
+
+class MarketplaceParser:
+    """Turns the pages of one PDF into order rows.
+
+    Subclasses set ``order_separator`` and implement ``parse_order`` for a
+    single order's text. Pages are consumed as a stream and each order is
+    parsed as soon as it is complete, so only one order's text is held in
+    memory at a time.
+    """
+
+    name = None
+    version = 1
+    engine = 'pdfplumber'
+    columns = MARKETPLACE_COLUMNS
+    filename_prefix = None
+    order_separator = None
+    # Parse the text before the first separator as an order too
+    keep_preamble = False
+    # Return an (empty) sheet instead of None when nothing was extracted
+    allow_empty = False
+
+    def text_chunks(self, pages, name=None):
+        return pdfplumber_chunks(pages, name)
+
+    def iter_orders(self, chunks):
+        return split_orders(chunks, self.order_separator, self.keep_preamble)
+
+    def parse_order(self, order_text):
+        raise NotImplementedError
+
+    def iter_rows(self, chunks):
+        for order_text in self.iter_orders(chunks):
+            yield from self.parse_order(order_text)
+
+    def parse(self, text):
+        return list(self.iter_rows([text]))
+
+    def parse_document(self, pages, name=None):
+        rows = list(self.iter_rows(self.text_chunks(pages, name)))
+        if not rows:
+            logger.info(f"No orders found in {name}")
+        return rows
+
+    def to_dataframe(self, rows):
+        if not rows and not self.allow_empty:
+            return None
+        return pd.DataFrame(rows).reindex(columns=self.columns)
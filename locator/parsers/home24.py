@@ -0,0 +1,81 @@
+import logging
+import re
+
+from .base import FieldScanner, MarketplaceParser, register
+
+logger = logging.getLogger(__name__)
+
+# German, French and Dutch delivery notes
+ORDER_SEPARATOR_RE = re.compile(r'Lieferschein|Bon de livraison|Leveringsbon', re.I)
+PRODUCT_START_RE = re.compile(r'^[^\S\n]*(?:Produktname:|Nom du produit:|Productnaam:)', re.M)
+
+ORDER_FIELDS = FieldScanner({
+    'Order number': [
+        (r'Bestellnummer:\s*', r'[A-Za-z0-9-]+'),
+        (r'Numéro de commande\s*:\s*', r'[A-Za-z0-9-]+'),
+        (r'Bestelnummer:\s*', r'[A-Za-z0-9-]+'),
+    ],
+    'Order date': [
+        (r'Bestelldatum:\s*', r'[\d./-]+'),
+        (r'Date de commande\s*:\s*', r'[\d./-]+'),
+        (r'Besteldatum:\s*', r'[\d./-]+'),
+    ],
+    "Buyer's name": [
+        (r'Name des Kunden:\s*', r'.*'),
+        (r'Nom de l\'acheteur\s*:\s*', r'.*'),
+        (r'Klantnaam:\s*', r'.*'),
+    ],
+    'Delivery service': [
+        (r'Versandmethode:\s*', r'.*'),
+        (r'Mode de livraison\s*:\s*', r'.*'),
+        (r'Verzendmethode:\s*', r'.*'),
+    ],
+})
+
+PRODUCT_FIELDS = FieldScanner({
+    'SKU': [
+        (r'Shop-Referenz:\s*', r'.*'),
+        (r'Référence vendeur\s*:\s*', r'.*'),
+        (r'Referentie shop:\s*', r'.*'),
+    ],
+    'Quantity': [
+        (r'Anzahl\s*:\s*', r'\d+'),
+        (r'Menge\s*:\s*', r'\d+'),
+        (r'Qté\s*:\s*', r'\d+'),
+        (r'Aant\.\s*:\s*', r'\d+'),
+    ],
+})
+
+
+@register
+class Home24Parser(MarketplaceParser):
+    name = 'home24'
+    version = 2
+    filename_prefix = 'home24_orders'
+    order_separator = ORDER_SEPARATOR_RE
+
+    def parse_order(self, order_text):
+        fields = ORDER_FIELDS.scan(order_text)
+        if not fields.get('Order number'):
+            return []  # Skip if no order number found
+        order = {
+            field: fields[field]
+            for field in self.columns
+            if fields.get(field)
+        }
+
+        starts = [match.start() for match in PRODUCT_START_RE.finditer(order_text)]
+        if not starts:
+            logger.debug(f"No products found for order {order['Order number']}")
+            return [dict(order, SKU='', Quantity='')]
+
+        # One row per product block
+        rows = []
+        for start, end in zip(starts, starts[1:] + [len(order_text)]):
+            product = PRODUCT_FIELDS.scan(order_text[start:end])
+            rows.append(dict(
+                order,
+                SKU=product.get('SKU', ''),
+                Quantity=product.get('Quantity') or '1',  # Default quantity to 1 if not found
+            ))
+        return rows
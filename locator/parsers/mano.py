@@ -0,0 +1,86 @@
+import logging
+import re
+
+from .base import MarketplaceParser, register
+
+logger = logging.getLogger(__name__)
+
+ORDER_SEPARATOR_RE = re.compile(r'Vielen Dank für Ihre Bestellung beim Verkäufer AM\.PM Europe GmbH\s*')
+DATE_DELIVERY_RE = re.compile(
+    r'Bestelldatum Lieferzeit Träger\s*(\d{2}\.\d{2}\.\d{2}, \d{2}:\d{2})\s*(\d+\s*Tage)?\s*([\w\(\)]+)'
+)
+PHONE_NAME_RE = re.compile(r'\+[\d]+\s+(.+)')
+NAME_PHONE_RE = re.compile(r'(.+?)\s+\+[\d]+')
+PHONE_ONLY_RE = re.compile(r'\+[\d]+$')
+ITEMS_RE = re.compile(r'Referenz SKU Menge\s*([\s\S]+?)VAT Excl VAT')
+SKU_QUANTITY_RE = re.compile(r'\b([A-Z0-9]+)\b\s+(\d+)\b')
+# Lines in the customer block that are labels rather than the buyer's name
+CUSTOMER_LABELS = (
+    'Unternehmen', 'Lieferanschrift', 'Mehrwertsteuersatz', 'Haftung für Rechnungen',
+    'Ausstehende', 'Hausnr.', 'Straße +', 'nungsstellung',
+)
+
+
+@register
+class ManoParser(MarketplaceParser):
+    name = 'mano'
+    version = 2
+    filename_prefix = 'mano_orders'
+    order_separator = ORDER_SEPARATOR_RE
+    # Pages can start straight with an order, without a separator before it
+    keep_preamble = True
+
+    def parse_order(self, order_text):
+        lines = [line.strip() for line in order_text.strip().split('\n')]
+        order_number = lines[0]
+
+        date_delivery_match = DATE_DELIVERY_RE.search(' '.join(lines))
+        if date_delivery_match:
+            order_date = date_delivery_match.group(1)
+            delivery_service = date_delivery_match.group(3) or ''
+        else:
+            order_date = ''
+            delivery_service = ''
+
+        buyer_name = self.buyer_name(lines)
+
+        item_match = ITEMS_RE.search(order_text)
+        if not item_match:
+            logger.debug(f"No items found in order {order_number}")
+            return []
+        return [
+            {
+                'Order number': order_number,
+                'Order date': order_date,
+                "Buyer's name": buyer_name,
+                'SKU': sku,
+                'Quantity': quantity,
+                'Delivery service': delivery_service,
+            }
+            for sku, quantity in SKU_QUANTITY_RE.findall(item_match.group(1))
+        ]
+
+    def buyer_name(self, lines):
+        for idx, line in enumerate(lines):
+            if 'Kunden-Details' in line:
+                break
+        else:
+            return ''
+
+        for line in lines[idx + 1:]:
+            # Skip lines that are labels or empty
+            if not line or any(label in line for label in CUSTOMER_LABELS):
+                continue
+            # Phone number followed by the name, possibly with repeated words
+            match = PHONE_NAME_RE.match(line)
+            if match:
+                return ' '.join(dict.fromkeys(match.group(1).strip().split()))
+            # Name followed by a phone number
+            match = NAME_PHONE_RE.match(line)
+            if match:
+                return match.group(1).strip()
+            # Just a phone number
+            if PHONE_ONLY_RE.match(line):
+                continue
+            return line
+        return ''
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+from .extraction import open_pdf
+from .metrics import PDF_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def source_digest(source):
+    """SHA-256 of a PDF given as bytes, a path, an uploaded file or an open file."""
+    digest = hashlib.sha256()
+    with open_pdf(source) as stream:
+        stream.seek(0)
+        for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+            digest.update(chunk)
+        stream.seek(0)
+    return digest.hexdigest()
+
+
+class ParsedPdfCache:
+    """Parsed rows of PDFs stored as JSON files, evicted least recently used.
+
+    Entries are keyed by the file's SHA-256 plus the parser name and version,
+    so bumping a parser's version makes its old entries unreachable; they
+    age out through the size limit.
+
+    The directory is only scanned for eviction when the bytes written since
+    the last scan pass the limit, or every ``rescan_interval`` seconds to
+    catch up with what other processes wrote.
+    """
+
+    rescan_interval = 5 * 60
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        self._scanned_at = 0.0
+        self._size_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(digest, parser, version):
+        return f"{parser}-v{version}-{digest}"
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                rows = json.load(f)
+            # Bump the modification time so eviction sees the entry as recently used
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            PDF_CACHE_LOOKUPS.inc(result="miss")
+            logger.debug(f"Parsed PDF cache miss: {key}")
+            return None
+        self.hits += 1
+        PDF_CACHE_LOOKUPS.inc(result="hit")
+        logger.debug(f"Parsed PDF cache hit: {key}")
+        return rows
+
+    def set(self, key, rows):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(rows, f)
+                size = f.tell()
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            logger.exception(f"Could not store parsed PDF {key}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        with self._size_lock:
+            if self._size is not None:
+                self._size += size
+            due = (
+                self._size is None
+                or self._size > self.max_bytes
+                or time.monotonic() - self._scanned_at > self.rescan_interval
+            )
+        if due:
+            self.evict()
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            target = total
+        else:
+            # Leave some room, so a full cache is not scanned again on the next write
+            target = self.max_bytes * 9 // 10
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        with self._size_lock:
+            self._size = total
+            self._scanned_at = time.monotonic()
+
+    def clear(self):
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        with self._size_lock:
+            self._size = 0
+            self._scanned_at = time.monotonic()
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
+
+
+def get_pdf_cache():
+    """The process-wide cache, or None when PDF_CACHE_DIR is empty."""
+    global _cache
+    if not settings.PDF_CACHE_DIR:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ParsedPdfCache(settings.PDF_CACHE_DIR, settings.PDF_CACHE_MAX_BYTES)
+        return _cache
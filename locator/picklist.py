@@ -0,0 +1,109 @@
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from psycopg2.extras import execute_values
+
+from .models import OrderItem, PickListEntry
+
+UPSERT_SQL = (
+    "INSERT INTO {table} (store_name, status, item_id, quantity, lines) VALUES %s "
+    "ON CONFLICT (store_name, status, item_id) DO UPDATE SET "
+    "quantity = {table}.quantity + EXCLUDED.quantity, lines = {table}.lines + EXCLUDED.lines"
+)
+
+
+class PickListDelta:
+    """Changes to the pick list, collected and then written in one statement."""
+
+    def __init__(self):
+        self.quantities = Counter()
+        self.lines = Counter()
+
+    def add(self, store_name, status, item_id, quantity, lines=1):
+        key = (store_name, status, item_id)
+        self.quantities[key] += quantity
+        self.lines[key] += lines
+
+    def remove(self, store_name, status, item_id, quantity, lines=1):
+        self.add(store_name, status, item_id, -quantity, -lines)
+
+    def apply(self):
+        rows = [
+            (*key, self.quantities[key], self.lines[key])
+            for key in self.lines.keys() | self.quantities.keys()
+            if self.quantities[key] or self.lines[key]
+        ]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            execute_values(
+                cursor, UPSERT_SQL.format(table=PickListEntry._meta.db_table), sorted(rows), page_size=len(rows)
+            )
+
+
+def _order_lines(order_ids):
+    return (
+        OrderItem.objects.filter(order__in=order_ids)
+        .values("order_id", "item_id")
+        .annotate(quantity=Sum("quantity"), lines=Count("id"))
+        .order_by()
+    )
+
+
+def add_order_items(order_items):
+    """Count newly created order items; their ``order`` must be set."""
+    delta = PickListDelta()
+    for order_item in order_items:
+        order = order_item.order
+        delta.add(order.store_name, order.status, order_item.item_id, order_item.quantity)
+    delta.apply()
+
+
+def move_orders(changes):
+    """Move the items of orders whose store or status changed.
+
+    ``changes`` maps order ids to ``((old store, old status), (new store, new status))``.
+    """
+    delta = PickListDelta()
+    for line in _order_lines(list(changes)):
+        (old_store, old_status), (new_store, new_status) = changes[line["order_id"]]
+        delta.remove(old_store, old_status, line["item_id"], line["quantity"], line["lines"])
+        delta.add(new_store, new_status, line["item_id"], line["quantity"], line["lines"])
+    delta.apply()
+
+
+@transaction.atomic
+def rebuild_pick_list():
+    """Recompute the whole pick list from the orders, e.g. after raw SQL changes."""
+    PickListEntry.objects.all().delete()
+    PickListEntry.objects.bulk_create(
+        [
+            PickListEntry(
+                store_name=row["order__store_name"],
+                status=row["order__status"],
+                item_id=row["item_id"],
+                quantity=row["quantity"],
+                lines=row["lines"],
+            )
+            for row in OrderItem.objects.values("order__store_name", "order__status", "item_id")
+            .annotate(quantity=Sum("quantity"), lines=Count("id"))
+            .order_by()
+        ],
+        batch_size=1000,
+    )
+
+
+def pick_list(store_name=None, status=None):
+    """Items to pick with their total quantity, like collect_items' live query."""
+    entries = PickListEntry.objects.filter(lines__gt=0)
+    if store_name:
+        entries = entries.filter(store_name=store_name)
+    if status:
+        entries = entries.filter(status=status)
+    return (
+        entries.values("item__model_prefix", "item__number", "item__line", "item__place")
+        .annotate(total_quantity=Sum("quantity"))
+        .order_by("item__line", "item__place")
+    )
+
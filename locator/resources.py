@@ -1,4 +1,5 @@
 import logging
+from collections import defaultdict
 
 from import_export import fields, resources
 from import_export.results import RowResult
@@ -28,15 +29,28 @@ class OrderResource(resources.ModelResource):
         report_skipped = True
         exclude = ("id",)
 
+    def before_import(self, dataset, **kwargs):
+        # Look up the items of all rows at once instead of one query per row
+        numbers = {str(number).strip() for number in dataset["item"]} if "item" in dataset.headers else set()
+        self.items_by_number = defaultdict(list)
+        for item in Item.objects.filter(number__in=numbers).order_by("model_prefix"):
+            self.items_by_number[item.number].append(item)
+        return super().before_import(dataset, **kwargs)
+
     def before_import_row(self, row, **kwargs):
-        try:
-            item_number = row["item"].strip()  # Обеспечиваем удаление лишних пробелов
-            item = Item.objects.get(number=item_number)
-            row["item"] = item
-        except Item.DoesNotExist:
+        item_number = row["item"].strip()  # Обеспечиваем удаление лишних пробелов
+        items = self.items_by_number.get(item_number, [])
+        if not items:
             logger.error(f"Item with number '{item_number}' not found")
             row["item"] = None
             raise ValueError(f"Item with number '{item_number}' not found")
+        if len(items) > 1:
+            # The file has no prefix column to tell them apart
+            prefixes = ", ".join(item.model_prefix for item in items)
+            logger.error(f"Item number '{item_number}' is used by several prefixes: {prefixes}")
+            row["item"] = None
+            raise ValueError(f"Item number '{item_number}' is used by several prefixes: {prefixes}")
+        row["item"] = items[0]
 
     def after_save_instance(self, instance, using_transactions, dry_run):
         if not dry_run:
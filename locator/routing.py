@@ -0,0 +1,168 @@
+from dataclasses import dataclass
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+
+from .models import Item
+
+WAREHOUSE_LAYOUT_CACHE_KEY = "warehouse-layout"
+
+
+@dataclass(frozen=True)
+class WarehouseLayout:
+    """Parallel aisles (lines) joined by a cross aisle at each end.
+
+    Places are numbered from the front cross aisle (place 0) to the back one
+    (``aisle_length``). Walking along an aisle costs ``place_distance`` per
+    place, moving over to the next line ``line_distance``. Picking starts
+    and ends at the front of ``depot_line``.
+    """
+
+    aisle_length: int
+    line_distance: float = 1.0
+    place_distance: float = 1.0
+    depot_line: int = 1
+
+    def distances(self, lines, places):
+        """Walking distance between every pair of ``(line, place)`` locations."""
+        lines = np.asarray(lines, dtype=float)
+        places = np.asarray(places, dtype=float)
+        same_line = lines[:, None] == lines[None, :]
+        along = np.abs(places[:, None] - places[None, :])
+        # Changing lines means walking out to the nearer cross aisle
+        via_front = places[:, None] + places[None, :]
+        via_back = 2 * self.aisle_length - via_front
+        across = np.abs(lines[:, None] - lines[None, :]) * self.line_distance
+        return np.where(
+            same_line, along * self.place_distance,
+            np.minimum(via_front, via_back) * self.place_distance + across,
+        )
+
+
+def _compute_layout():
+    longest = Item.objects.aggregate(place=Max("place"))["place"] or 0
+    return WarehouseLayout(
+        aisle_length=longest + 1,
+        line_distance=settings.PICK_ROUTE_LINE_DISTANCE,
+        place_distance=settings.PICK_ROUTE_PLACE_DISTANCE,
+        depot_line=settings.PICK_ROUTE_DEPOT_LINE,
+    )
+
+
+def get_warehouse_layout():
+    return cache.get_or_set(WAREHOUSE_LAYOUT_CACHE_KEY, _compute_layout, settings.PICK_ROUTE_LAYOUT_TIMEOUT)
+
+
+def s_shape(locations):
+    """Walk every line with picks end to end, alternating direction."""
+    by_line = {}
+    for index, (line, place) in enumerate(locations):
+        by_line.setdefault(line, []).append((place, index))
+    route = []
+    for turn, line in enumerate(sorted(by_line)):
+        route += [index for _, index in sorted(by_line[line], reverse=turn % 2 == 1)]
+    return route
+
+
+def largest_gap(locations, aisle_length):
+    """Go up the first and down the last line, and only into the others as
+    far as their largest gap between picks, from the front or the back."""
+    by_line = {}
+    for index, (line, place) in enumerate(locations):
+        by_line.setdefault(line, []).append((place, index))
+    lines = sorted(by_line)
+    if len(lines) == 1:
+        return [index for _, index in sorted(by_line[lines[0]])]
+
+    front, back = {}, {}
+    for line in lines[1:-1]:
+        picks = sorted(by_line[line])
+        stops = [0] + [place for place, _ in picks] + [aisle_length]
+        gaps = [stops[i + 1] - stops[i] for i in range(len(stops) - 1)]
+        # Picks before the largest gap come from the front, the rest from the back
+        split = gaps.index(max(gaps))
+        front[line], back[line] = picks[:split], picks[split:]
+
+    route = [index for _, index in sorted(by_line[lines[0]])]
+    for line in lines[1:-1]:
+        route += [index for _, index in reversed(back[line])]
+    route += [index for _, index in sorted(by_line[lines[-1]], reverse=True)]
+    for line in reversed(lines[1:-1]):
+        route += [index for _, index in front[line]]
+    return route
+
+
+def route_length(route, distances):
+    """Length of the tour depot -> route -> depot; the depot is node 0."""
+    tour = np.concatenate(([0], np.asarray(route) + 1, [0]))
+    return float(distances[tour[:-1], tour[1:]].sum())
+
+
+def two_opt(route, distances, passes, window):
+    """Reverse segments of up to ``window`` stops wherever that shortens the tour.
+
+    Every pass scores all candidate reversals at once and applies the best
+    ones that do not touch each other, so a few passes go a long way.
+    """
+    tour = np.concatenate(([0], np.asarray(route, dtype=int) + 1, [0]))
+    n = len(tour)
+    # Reversing tour[i:j] replaces edges (a, b), (c, d) by (a, c), (b, d)
+    i, j = np.triu_indices(n, k=2)
+    keep = (i >= 1) & (j - i <= window)
+    i, j = i[keep], j[keep]
+    for _ in range(passes):
+        a, b, c, d = tour[i - 1], tour[i], tour[j - 1], tour[j]
+        gain = distances[a, b] + distances[c, d] - distances[a, c] - distances[b, d]
+        improving = np.flatnonzero(gain > 1e-9)
+        if not len(improving):
+            break
+        taken = np.zeros(n, dtype=bool)
+        # Stable sort so ties always resolve the same way
+        for move in improving[np.argsort(-gain[improving], kind="stable")]:
+            start, stop = i[move], j[move]
+            if taken[start - 1:stop + 1].any():
+                continue
+            taken[start - 1:stop + 1] = True
+            tour[start:stop] = tour[start:stop][::-1].copy()
+    return [int(node) - 1 for node in tour[1:-1]]
+
+
+def optimize_route(items, layout=None, refine=None):
+    """Reorder pick list items (dicts with ``line`` and ``place``) into a short walk.
+
+    Items at the same location are picked together. Items without a
+    location keep their order at the end of the walk.
+    """
+    layout = layout or get_warehouse_layout()
+    refine = settings.PICK_ROUTE_TWO_OPT_PASSES if refine is None else refine
+    located = {}
+    unlocated = []
+    for item in items:
+        if item.get("line") is None or item.get("place") is None:
+            unlocated.append(item)
+        else:
+            located.setdefault((item["line"], item["place"]), []).append(item)
+    if not located:
+        return unlocated
+
+    locations = list(located)
+    aisle_length = max(layout.aisle_length, max(place for _, place in locations) + 1)
+    if aisle_length != layout.aisle_length:
+        layout = WarehouseLayout(aisle_length, layout.line_distance, layout.place_distance, layout.depot_line)
+    distances = layout.distances(
+        [layout.depot_line] + [line for line, _ in locations],
+        [0] + [place for _, place in locations],
+    )
+
+    candidates = [
+        sorted(range(len(locations)), key=locations.__getitem__),
+        s_shape(locations),
+        largest_gap(locations, aisle_length),
+    ]
+    route = min(candidates, key=lambda candidate: route_length(candidate, distances))
+    if refine:
+        route = two_opt(route, distances, refine, settings.PICK_ROUTE_TWO_OPT_WINDOW)
+    return [item for index in route for item in located[locations[index]]] + unlocated
+
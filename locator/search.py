@@ -0,0 +1,24 @@
+from django.db.models import Exists, Q
+
+from .models import Order
+
+# Columns the order search box matches; each has a trigram index (see Order.Meta)
+SEARCH_FIELDS = ("order_number", "customer_name")
+
+
+def order_search_filter(query, prefix=""):
+    """Q matching the orders a search box query refers to.
+
+    A query that is a complete order number only matches that order.
+    Anything else is a case-insensitive substring match on the order number
+    and customer name, which Postgres answers from the pg_trgm GIN indexes
+    instead of scanning the table. The exact-number check is a subquery of
+    the same statement, answered once from the unique index. ``prefix`` is
+    the path to the order, e.g. ``"order__"`` for order items.
+    """
+    query = query.strip()
+    contains = Q()
+    for field in SEARCH_FIELDS:
+        contains |= Q(**{f"{prefix}{field}__icontains": query})
+    is_order_number = Exists(Order.objects.filter(order_number=query))
+    return Q(**{f"{prefix}order_number": query}) | (~is_order_number & contains)
@@ -0,0 +1,92 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .facets import invalidate_order_facets
+from .models import Item, Order, OrderItem, PickListEntry
+from .picklist import PickListDelta, move_orders
+from .versions import ITEMS, ORDERS, bump_data_version
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def order_changed(sender, **kwargs):
+    invalidate_order_facets()
+    bump_data_version(ORDERS)
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def order_item_changed(sender, **kwargs):
+    bump_data_version(ORDERS)
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+def item_changed(sender, **kwargs):
+    bump_data_version(ITEMS)
+
+
+def _order_key(order_id):
+    # Locked, so a concurrent transition cannot move the order's lines
+    # between reading its key and updating the pick list
+    return Order.objects.select_for_update().filter(pk=order_id).values_list("store_name", "status").first()
+
+
+@receiver(pre_save, sender=Order)
+def remember_order_key(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._pick_list_key = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not {"store_name", "status"} & set(update_fields):
+        return
+    instance._pick_list_key = _order_key(instance.pk)
+
+
+@receiver(post_save, sender=Order)
+def move_order_items(sender, instance, created, **kwargs):
+    old_key = getattr(instance, "_pick_list_key", None)
+    new_key = (instance.store_name, instance.status)
+    if old_key is not None and old_key != new_key:
+        move_orders({instance.pk: (old_key, new_key)})
+
+
+@receiver(pre_save, sender=OrderItem)
+def remember_order_item(sender, instance, raw=False, **kwargs):
+    instance._pick_list_row = None
+    if not raw and not instance._state.adding and instance.pk is not None:
+        instance._pick_list_row = (
+            # Locks the order row too, like _order_key
+            OrderItem.objects.select_for_update()
+            .filter(pk=instance.pk)
+            .values_list("order__store_name", "order__status", "item_id", "quantity")
+            .first()
+        )
+
+
+@receiver(post_save, sender=OrderItem)
+def order_item_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    delta = PickListDelta()
+    old_row = getattr(instance, "_pick_list_row", None)
+    if old_row is not None:
+        delta.remove(*old_row)
+    elif not created:
+        return
+    delta.add(*_order_key(instance.order_id), instance.item_id, instance.quantity)
+    delta.apply()
+
+
+@receiver(post_delete, sender=OrderItem)
+def order_item_deleted(sender, instance, **kwargs):
+    # Cascades delete order items before their order, so it is still there
+    key = _order_key(instance.order_id)
+    if key is not None:
+        delta = PickListDelta()
+        delta.remove(*key, instance.item_id, instance.quantity)
+        delta.apply()
+
+
+@receiver(post_delete, sender=Item)
+def item_deleted(sender, instance, **kwargs):
+    PickListEntry.objects.filter(item_id=instance.pk).delete()
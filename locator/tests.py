@@ -1,3 +1,1354 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+import tablib
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import Count, Sum
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .benchmarks.dataset import seed_dataset
+from .benchmarks.pdf import write_pdf
+from .extraction import _discard_executor, get_executor, iter_pages, iter_pdf_pages
+from .facets import ORDER_FACETS_CACHE_KEY, get_order_facets
+from .jobs import JOB_HANDLERS, JobProgress, claim_job, requeue_stale_jobs, run_job, submit_job
+from .metrics import REQUESTS, render_metrics
+from .models import Item, Job, Order, OrderItem, PickListEntry
+from .pagination import KeysetPaginator
+from .parsers import get_parser
+from .pdf_cache import ParsedPdfCache, get_pdf_cache
+from .resources import OrderResource
+from .routing import WarehouseLayout, optimize_route, two_opt
+from .search import order_search_filter
+from .transitions import transition_orders
+from .utils import (ImportProgress, handle_update_file, handle_uploaded_file, parse_pdfs,
+                    process_excel_data)
+
+
+class IndexUsageTests(TestCase):
+    """The planner picks the indexes added for the hot query shapes.
+
+    Sequential scans are switched off so the plans do not depend on the
+    size of the test data; what is checked is that an index matches the
+    query shape, not that it wins on a handful of rows.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        stores = ["Amazon", "Ebay", "Home24"]
+        statuses = ["INP", "COM", "COM", "COM", "ONH"]
+        cls.items = Item.objects.bulk_create(
+            Item(model_prefix="FBA", number=str(number), line=number % 40, place=number % 97)
+            for number in range(2000)
+        )
+        orders = Order.objects.bulk_create(
+            Order(
+                store_name=stores[number % 3],
+                date=datetime.date(2024, 1, 1) + datetime.timedelta(days=number % 365),
+                order_number=f"IDX{number:06d}",
+                customer_name=f"Customer {number}",
+                status=statuses[number % 5],
+            )
+            for number in range(5000)
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, item=cls.items[(order.pk * 7 + offset) % 2000], quantity=1)
+            for order in orders
+            for offset in range(2)
+        )
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE locator_item, locator_order, locator_orderitem")
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
+        return plan
+
+    def test_status_store_filter_newest_first(self):
+        self.assertUsesIndex(
+            Order.objects.filter(status="COM", store_name="Ebay").order_by("-date"),
+            "order_status_store_date_idx",
+        )
+
+    def test_in_progress_order_list_page(self):
+        self.assertUsesIndex(
+            Order.objects.filter(status="INP").order_by("-date", "-id")[:100],
+            "order_inp_date_id_idx",
+        )
+
+    def test_in_progress_order_list_page_for_store(self):
+        # The composite index serves the store filter; only date ties need sorting
+        self.assertUsesIndex(
+            Order.objects.filter(status="INP", store_name="Home24").order_by("-date", "-id")[:100],
+            "order_status_store_date_idx",
+        )
+
+    def test_item_default_ordering(self):
+        plan = self.assertUsesIndex(Item.objects.all()[:100], "item_line_place_idx")
+        self.assertNotIn("Sort", plan)
+
+    def test_order_item_lookup(self):
+        order_item = OrderItem.objects.first()
+        self.assertUsesIndex(
+            OrderItem.objects.filter(order_id=order_item.order_id, item_id=order_item.item_id),
+            "unique_order_item",
+        )
+
+    def test_order_item_is_unique(self):
+        order_item = OrderItem.objects.first()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            OrderItem.objects.create(order_id=order_item.order_id, item_id=order_item.item_id, quantity=1)
+
+
+@override_settings(METRICS_TOKEN="budget")
+class QueryBudgetTests(TestCase):
+    """Every page and endpoint stays within a fixed query budget.
+
+    Each case is measured on a small data set and again after the data set
+    has grown, and must run the same number of queries both times, within
+    its budget and time ceiling. A query count that grows with the data is
+    an N+1 waiting to happen on the warehouse floor.
+    """
+
+    SMALL = {"items_per_prefix": 10, "orders": 200}
+    GROWTH = {"items_per_prefix": 40, "orders": 1000}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        cls.job = Job.objects.create(
+            kind="import_orders", status="DON", artifact=b"xlsx", artifact_name="report.xlsx"
+        )
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            seed_dataset(**self.SMALL)
+        self.client.force_login(self.admin)
+
+    def cases(self):
+        """``(name, budget, seconds, request)``.
+
+        ``request`` is a callable, or a ``(prepare, request)`` pair whose
+        ``prepare`` result is passed to ``request`` and is not measured.
+        """
+
+        def reopened(count=1):
+            # Completed orders moved back to in progress, for the status changes
+            pks = list(Order.objects.filter(status="COM").order_by("?").values_list("pk", flat=True)[:count])
+            transition_orders("INP", dict.fromkeys(pks))
+            return pks
+
+        def codes(count):
+            return [str(item) for item in Item.objects.order_by("?")[:count]]
+
+        def get(url, **params):
+            return lambda: self.client.get(url, params)
+
+        def post_json(url, payload):
+            return lambda: self.client.post(url, json.dumps(payload()), content_type="application/json")
+
+        return [
+            ("set_item", 1, 1, get("/")),
+            ("select-model", 1, 1, get("/select-model/")),
+            ("fetch-model-numbers", 2, 1, get("/fetch-model-numbers/", model_prefix="FBA")),
+            ("item-typeahead", 2, 1, get("/item-typeahead/", model_prefix="FBA", q="0")),
+            ("item-manifest", 2, 1, get("/item-manifest/")),
+            ("item-locations", 2, 1, post_json("/item-locations/", lambda: {"codes": codes(100)})),
+            ("finalize-items", 2, 1, post_json(
+                "/finalize-items/", lambda: {"items": {code: 1 for code in codes(100)}}
+            )),
+            ("order_list", 4, 1, get("/orders/")),
+            ("order_list filtered", 4, 1, get("/orders/", status="INP", store="Ebay")),
+            ("order_list search", 4, 1, get("/orders/", search="Customer 1")),
+            ("collect_items", 2, 1, get("/collect-items/", status="INP")),
+            ("collect_items routed", 3, 1, get("/collect-items/", status="INP", route="optimal")),
+            ("collect_items search", 2, 1, get("/collect-items/", status="INP", search="Customer 1")),
+            ("update_order_status", 6, 1, (reopened, lambda pks: self.client.post(
+                "/update-order-status/", {"order_id": pks[0], "status": "COM"}
+            ))),
+            ("bulk_update_order_status", 6, 1, (lambda: reopened(50), lambda pks: self.client.post(
+                "/orders/status/", json.dumps({"status": "COM", "orders": pks}), content_type="application/json"
+            ))),
+            ("complete_order", 6, 1, (reopened, lambda pks: self.client.post(f"/complete-order/{pks[0]}/"))),
+            ("hold_order", 6, 1, (reopened, lambda pks: self.client.post(f"/hold-order/{pks[0]}/", {"note": "later"}))),
+            ("upload_orders", 0, 1, get("/upload/")),
+            ("upload_items", 0, 1, get("/upload-items/")),
+            ("import_progress", 0, 1, (
+                lambda: ImportProgress("budget").start(100), lambda _: self.client.get("/import-progress/budget/")
+            )),
+            ("upload_and_download", 0, 1, get("/upload-and-download/")),
+            ("upload_pdfs", 0, 1, get("/upload_pdfs/")),
+            ("aggregate_skus", 0, 1, get("/aggregate-skus/")),
+            ("upload_pdfs_home24", 0, 1, get("/upload_pdfs_home24/")),
+            ("upload_pdfs_mano", 0, 1, get("/upload_pdfs_mano/")),
+            ("upload_pdfs_new_functionality", 0, 1, get("/upload_pdfs_new_functionality/")),
+            ("job_status", 1, 1, lambda: self.client.get(f"/jobs/{self.job.pk}/")),
+            ("job_download", 1, 1, lambda: self.client.get(f"/jobs/{self.job.pk}/download/")),
+            ("create_job", 4, 1, lambda: self.client.post(
+                "/jobs/csv_ebay/", {"file": SimpleUploadedFile("orders.csv", b"x")}
+            )),
+            ("metrics", 2, 1, lambda: self.client.get("/metrics", headers={"authorization": "Bearer budget"})),
+            ("admin items", 5, 2, get("/admin/locator/item/")),
+            ("admin orders", 8, 2, get("/admin/locator/order/")),
+            ("admin orders filtered", 8, 2, get("/admin/locator/order/", status__exact="INP")),
+            ("admin jobs", 6, 2, get("/admin/locator/job/")),
+            ("process_excel_data", 8, 2, lambda: process_excel_data(self.order_rows(50))),
+        ]
+
+    def order_rows(self, count):
+        items = [str(item) for item in Item.objects.order_by("?")[:count]]
+        return pd.DataFrame({
+            "store_name": ["Ebay"] * count,
+            "date": ["01.02.2024"] * count,
+            "order_number": [f"QB{uuid.uuid4().hex[:16]}" for _ in range(count)],
+            "customer_name": ["Budget Test"] * count,
+            "item": [f"{items[index]},{items[(index + 1) % count]}" for index in range(count)],
+            "quantity": ["1,2"] * count,
+        })
+
+    def measure(self, request):
+        prepare, call = request if isinstance(request, tuple) else (lambda: None, lambda _: request())
+        # Warm up the caches and the item index first, then measure both a
+        # call that rebuilds the cached data and a call served from them
+        call(prepare())
+        counts = []
+        for clear in (True, False):
+            if clear:
+                cache.clear()
+            prepared = prepare()
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = call(prepared)
+                elapsed = time.perf_counter() - started
+            counts.append(len(queries))
+        return response, max(counts), elapsed
+
+    def test_query_budgets(self):
+        cases = self.cases()
+        small = {name: self.measure(request) for name, _, _, request in cases}
+        with self.captureOnCommitCallbacks(execute=True):
+            seed_dataset(**self.GROWTH, seed=1)
+        large = {name: self.measure(request) for name, _, _, request in cases}
+
+        for name, budget, seconds, _ in cases:
+            with self.subTest(name):
+                response, queries, elapsed = large[name]
+                if hasattr(response, "status_code"):
+                    self.assertLess(response.status_code, 400, response.content[:200])
+                self.assertEqual(queries, small[name][1], "query count grows with the data")
+                self.assertLessEqual(queries, budget)
+                self.assertLess(elapsed, seconds)
+
+
+class AsyncViewTests(TestCase):
+    """The async endpoints, driven through the async request path."""
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            seed_dataset(items_per_prefix=5, orders=50)
+        cls.order = Order.objects.filter(status="INP").first()
+
+    async def test_collect_items_poll(self):
+        response = await self.async_client.get("/collect-items/", {"status": "INP"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(json.loads(response.content)["items"])
+        response = await self.async_client.get(
+            "/collect-items/", {"status": "INP"}, headers={"if-none-match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_fetch_model_numbers(self):
+        response = await self.async_client.get("/fetch-model-numbers/", {"model_prefix": "FBA"})
+        self.assertEqual(json.loads(response.content)["numbers"], [f"{number:05d}" for number in range(5)])
+
+    async def test_finalize_items(self):
+        response = await self.async_client.post(
+            "/finalize-items/?route=optimal",
+            json.dumps({"items": {"FBA00001": 2, "FBA99999": 1}}),
+            content_type="application/json",
+        )
+        data = json.loads(response.content)
+        self.assertEqual([item["model"] for item in data["items"]], ["FBA00001"])
+        self.assertEqual(data["unknown"], ["FBA99999"])
+
+    async def test_update_order_status(self):
+        url = "/update-order-status/"
+        response = await self.async_client.post(url, {"order_id": self.order.pk, "status": "COM", "version": 1})
+        self.assertEqual(json.loads(response.content)["version"], 2)
+        response = await self.async_client.post(url, {"order_id": self.order.pk, "status": "INP", "version": 1})
+        self.assertEqual(json.loads(response.content)["reason"], "changed")
+
+
+class ProcessExcelDataTests(TestCase):
+    """The bulk order import reports every row as before."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Item.objects.create(model_prefix="FBA", number="1", line=1, place=1)
+        Item.objects.create(model_prefix="FBA", number="2", line=1, place=2)
+        Item.objects.create(model_prefix="CSB", number="3", line=2, place=1)
+        Order.objects.create(
+            store_name="Ebay", date=datetime.date(2024, 1, 1), order_number="OLD1", customer_name="Old"
+        )
+
+    def rows(self, *rows):
+        columns = ["store_name", "date", "order_number", "customer_name", "item", "quantity"]
+        return pd.DataFrame([dict(zip(columns, row)) for row in rows], columns=columns)
+
+    def test_result_structure(self):
+        results = process_excel_data(self.rows(
+            ("Ebay", "01.02.2024", "NEW1", "Anna", "FBA1,FBA2,FBA1", "1,2,3"),
+            ("Ebay", "01.02.2024", "OLD1", "Old", "FBA1", "1"),
+            ("Ebay", None, "NEW2", "Anna", "FBA1", "1"),
+            ("Ebay", "01.02.2024", "NEW3", "Anna", "FBA1,FBA2", "1"),
+            ("Ebay", "01.02.2024", "NEW4", "Anna", "FBA9", "1"),
+            ("Ebay", "01.02.2024", "NEW5", "Anna", "FBA1", "x"),
+        ))
+        self.assertEqual(results["new_orders"], ["NEW1"])
+        self.assertEqual(results["duplicate_orders"], ["OLD1"])
+        self.assertEqual(results["error_orders"], [
+            ("NEW2", "Row 4: Missing fields: ['date']"),
+            ("NEW3", "Row 5: Mismatch between items and quantities"),
+            ("NEW4", "Row 6: Item FBA9 does not exist"),
+            ("NEW5", "Row 7: invalid literal for int() with base 10: 'x'"),
+        ])
+        self.assertEqual(
+            [(detail["order_number"], detail["item"], detail["quantity"], detail["status"])
+             for detail in results["order_details"]],
+            [("NEW5", "FBA1", "x", "Error"),
+             ("NEW1", "FBA1", "1", "Created"), ("NEW1", "FBA2", "2", "Created"), ("NEW1", "FBA1", "3", "Created")],
+        )
+        # Repeated lines of an order add up
+        self.assertEqual(
+            dict(OrderItem.objects.filter(order__order_number="NEW1").values_list("item__number", "quantity")),
+            {"1": 4, "2": 2},
+        )
+
+    def test_items_match_prefix_and_number(self):
+        # CSB3 exists, FBA3 does not; the number alone must not match
+        results = process_excel_data(self.rows(
+            ("Ebay", "01.02.2024", "NEW6", "Anna", "FBA3", "1"),
+            ("Ebay", "01.02.2024", "NEW7", "Anna", "CSB3", "1"),
+        ))
+        self.assertEqual(results["new_orders"], ["NEW7"])
+        self.assertEqual(results["error_orders"], [("NEW6", "Row 2: Item FBA3 does not exist")])
+
+
+class StockUploadTests(TestCase):
+    """Setting and incrementing stock from an uploaded sheet."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Item.objects.create(model_prefix="FBA", number="1", quantity=5)
+        Item.objects.create(model_prefix="CSB", number="2", quantity=7)
+
+    def sheet(self, *rows):
+        buffer = io.BytesIO()
+        pd.DataFrame(rows, columns=["item", "quantity"]).to_excel(buffer, index=False)
+        buffer.seek(0)
+        return buffer
+
+    def quantities(self):
+        return {str(item): item.quantity for item in Item.objects.all()}
+
+    def test_set_quantities(self):
+        results = handle_uploaded_file(self.sheet(
+            ("FBA1 lamp", 3), ("FBA9", 4), ("XXX1", 1), ("CSB2", None), ("FBA1", 8),
+        ))
+        self.assertEqual([(result["row"], result["status"]) for result in results], [
+            (2, "Set new quantity"), (3, "Created"), (4, "Failed"), (5, "Failed"), (6, "Set new quantity"),
+        ])
+        self.assertEqual(results[2]["reason"], "Invalid model prefix: XXX")
+        self.assertEqual(results[3]["reason"], "Invalid quantity: nan")
+        # The last row for an item wins; the failed row leaves CSB2 alone
+        self.assertEqual(self.quantities(), {"FBA1": 8, "FBA9": 4, "CSB2": 7})
+
+    def test_increment_quantities(self):
+        results = handle_update_file(self.sheet(
+            ("FBA1", 2), ("CSB2", "lots"), ("FBA2", 1), ("CSB1", 1), ("FBA1", 3),
+        ))
+        self.assertEqual(
+            [(result["status"], result.get("quantity"), result.get("reason")) for result in results],
+            [
+                ("Updated", 7, None),
+                ("Failed", None, "Invalid quantity: lots"),
+                ("Failed", None, "Item does not exist"),
+                # CSB1 does not exist, even though items numbered 1 and 2 do
+                ("Failed", None, "Item does not exist"),
+                ("Updated", 10, None),
+            ],
+        )
+        self.assertEqual(self.quantities(), {"FBA1": 10, "CSB2": 7})
+
+    def test_numbers_in_text_cells(self):
+        results = handle_uploaded_file(self.sheet(("FBA1", "5.0"), ("CSB2", "2.5")))
+        self.assertEqual(results[0]["quantity"], 5)
+        self.assertEqual(results[1]["reason"], "Invalid quantity: 2.5")
+        results = handle_update_file(self.sheet(("FBA1", " 3 "), ("CSB2", "1.0")))
+        self.assertEqual([result["quantity"] for result in results], [8, 8])
+        self.assertEqual(self.quantities(), {"FBA1": 8, "CSB2": 8})
+
+    def test_progress_published(self):
+        handle_update_file(self.sheet(("FBA1", 2)), progress=ImportProgress("stock-ok"))
+        self.assertEqual(ImportProgress.lookup("stock-ok"), {"rows": 1, "total": 1, "done": True, "error": None})
+
+        buffer = io.BytesIO()
+        pd.DataFrame({"item": ["FBA1"]}).to_excel(buffer, index=False)
+        buffer.seek(0)
+        with self.assertRaises(KeyError):
+            handle_update_file(buffer, progress=ImportProgress("stock-failed"))
+        progress = ImportProgress.lookup("stock-failed")
+        self.assertTrue(progress["done"])
+        self.assertEqual(progress["error"], "'quantity'")
+
+    def test_upload_forms_send_a_progress_key(self):
+        for url in ("/upload/", "/upload-items/"):
+            self.assertContains(self.client.get(url), "progress_id")
+
+
+class JobLeaseTests(TestCase):
+    """A job's result only counts while its worker holds the claim."""
+
+    report_progress = True
+
+    def setUp(self):
+        patcher = mock.patch.dict(JOB_HANDLERS, {"test": self.handler})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def handler(self, job, files, progress):
+        if self.before_progress:
+            self.before_progress(job)
+        if self.report_progress:
+            progress.start(1)
+            progress.finish()
+        return {"ok": True}, None, None
+
+    def requeue_and_reclaim(self, job):
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(requeue_stale_jobs(), 1)
+        claimed = claim_job()
+        self.assertEqual(claimed.pk, job.pk)
+        return claimed
+
+    def test_claimed_job_finishes(self):
+        self.before_progress = None
+        Job.objects.create(kind="test")
+        job = claim_job()
+        run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result), ("DON", {"ok": True}))
+
+    def test_only_stale_leases_are_requeued(self):
+        Job.objects.create(kind="test")
+        job = claim_job()
+        self.assertEqual(requeue_stale_jobs(), 0)
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(requeue_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.claim), ("QUE", None))
+
+    def test_requeued_job_stops_at_its_next_progress(self):
+        self.before_progress = self.requeue_and_reclaim
+        Job.objects.create(kind="test")
+        job = claim_job()
+        run_job(job)
+        # The second worker's claim is untouched by the first one
+        fresh = Job.objects.get(pk=job.pk)
+        self.assertEqual(fresh.status, "RUN")
+        self.assertNotEqual(fresh.claim, job.claim)
+        self.assertEqual(fresh.progress, 0)
+
+    def test_result_of_requeued_job_is_discarded(self):
+        self.before_progress = self.requeue_and_reclaim
+        self.report_progress = False
+        Job.objects.create(kind="test")
+        job = claim_job()
+        run_job(job)
+        fresh = Job.objects.get(pk=job.pk)
+        self.assertEqual((fresh.status, fresh.result), ("RUN", None))
+
+    def test_requeued_update_import_skips_applied_rows(self):
+        Item.objects.create(model_prefix="FBA", number="1", quantity=5)
+        Item.objects.create(model_prefix="CSB", number="2", quantity=7)
+        buffer = io.BytesIO()
+        pd.DataFrame(
+            [("FBA1", 1), ("CSB2", 1), ("FBA1", 10), ("CSB2", 10)], columns=["item", "quantity"]
+        ).to_excel(buffer, index=False)
+        submit_job("import_items", [SimpleUploadedFile("stock.xlsx", buffer.getvalue())], mode="update")
+        first = claim_job()
+        claims = []
+        advance = JobProgress.advance
+
+        def lose_lease_after_first_batch(progress, rows):
+            advance(progress, rows)
+            if not claims:
+                claims.append(self.requeue_and_reclaim(first))
+
+        with mock.patch("locator.utils.EXCEL_BATCH_SIZE", 2), \
+                mock.patch.object(JobProgress, "advance", lose_lease_after_first_batch):
+            # The first worker commits one batch, then loses the job
+            run_job(first)
+            self.assertEqual(Job.objects.get(pk=first.pk).applied_rows, 2)
+            run_job(claims[0])
+
+        job = Job.objects.get(pk=first.pk)
+        self.assertEqual(job.status, "DON")
+        self.assertEqual([row["row"] for row in job.result["results"]], [4, 5])
+        quantities = {str(item): item.quantity for item in Item.objects.all()}
+        self.assertEqual(quantities, {"FBA1": 16, "CSB2": 18})
+
+
+class ParserTests(SimpleTestCase):
+    """Fields the marketplace parsers read from small delivery notes."""
+
+    AMAZON_PAGES = [
+        [
+            "Liefern an:", "Anna Müller", "Musterstraße 5", "10115 Berlin",
+            "Bestellnummer: 302-1234567-0000001", "Bestelldatum Käufer Versandart",
+            "Datum 05.03.2024 Anna Müller DHL", "Menge Produktdetails Stückpreis Zwischensumme",
+            "2 Tischleuchte 49,90 €", "SKU: AMPA12345", "ASIN: B012345678", "1 Wandspiegel 49,90 €",
+        ],
+        # The second item's SKU runs over onto the next page
+        [
+            "SKU: AMPB54321", "ASIN: B087654321", "EUR 149,70",
+            "Liefern an:", "Jonas Weber", "Bestellnummer: 302-7654321-0000002",
+            "Bestelldatum Käufer Versandart", "Datum 06.03.2024 Jonas Weber GLS",
+            "Menge Produktdetails Stückpreis Zwischensumme", "3 Couchtisch 49,90 €", "SKU: AMPC11111",
+            "EUR 99,00",
+        ],
+    ]
+    AMAZON_ROWS = [
+        ("302-1234567-0000001", "05.03.2024", "Anna Müller", "AMPA12345", "2", "DHL"),
+        ("302-1234567-0000001", "05.03.2024", "Anna Müller", "AMPB54321", "1", "DHL"),
+        ("302-7654321-0000002", "06.03.2024", "Jonas Weber", "AMPC11111", "3", "GLS"),
+    ]
+    HOME24_PAGES = [
+        [
+            "Lieferschein", "Bestellnummer: H-1001", "Bestelldatum: 05.03.2024",
+            "Name des Kunden: Anna Müller", "Versandmethode: DHL",
+            "Produktname: Tischleuchte", "Shop-Referenz: AMPA12345", "Anzahl: 2",
+        ],
+        [
+            "Produktname: Wandspiegel", "Shop-Referenz: AMPB54321",
+            "Bon de livraison", "Numéro de commande : H-1002", "Date de commande : 06/03/2024",
+            "Nom de l'acheteur : Léa Dubois", "Mode de livraison : GLS",
+            "Nom du produit: Couchtisch", "Référence vendeur : AMPC11111", "Qté : 3",
+        ],
+    ]
+    HOME24_ROWS = [
+        ("H-1001", "05.03.2024", "Anna Müller", "AMPA12345", "2", "DHL"),
+        # Without a quantity the product counts once
+        ("H-1001", "05.03.2024", "Anna Müller", "AMPB54321", "1", "DHL"),
+        ("H-1002", "06/03/2024", "Léa Dubois", "AMPC11111", "3", "GLS"),
+    ]
+
+    def row(self, order_number, date, buyer, sku, quantity, delivery, buyer_column="Buyer's name"):
+        return {
+            "Order number": order_number, "Order date": date, buyer_column: buyer,
+            "SKU": sku, "Quantity": quantity, "Delivery service": delivery,
+        }
+
+    def text_pages(self, pages, newline_after_page=False):
+        end = "\n" if newline_after_page else ""
+        return ["\n".join(lines) + end for lines in pages]
+
+    def test_amazon(self):
+        rows = get_parser("amazon").parse_document(self.text_pages(self.AMAZON_PAGES, newline_after_page=True))
+        self.assertEqual(rows, [self.row(*row, buyer_column="Buyer name") for row in self.AMAZON_ROWS])
+
+    def test_home24(self):
+        rows = get_parser("home24").parse_document(self.text_pages(self.HOME24_PAGES))
+        self.assertEqual(rows, [self.row(*row) for row in self.HOME24_ROWS])
+
+    def test_mano(self):
+        pages = self.text_pages([[
+            "Vielen Dank für Ihre Bestellung beim Verkäufer AM.PM Europe GmbH", "M0001",
+            "Bestelldatum Lieferzeit Träger", "05.03.24, 14:30 3 Tage DPD",
+            "Kunden-Details", "+491234567890 Anna Müller Anna Müller", "Lieferanschrift", "Musterstraße 5",
+            "Referenz SKU Menge", "AMPA12345 2", "AMPB54321 1", "VAT Excl VAT",
+        ]])
+        self.assertEqual(get_parser("mano").parse_document(pages), [
+            self.row("M0001", "05.03.24, 14:30", "Anna Müller", "AMPA12345", "2", "DPD"),
+            self.row("M0001", "05.03.24, 14:30", "Anna Müller", "AMPB54321", "1", "DPD"),
+        ])
+
+    def test_ampm(self):
+        pages = self.text_pages([
+            ["BESTELLNUMMER: #A-77", "BESTELLDATUM: 05.03.2024 14:30", "VERSANDDETAILS", "Anna Müller Anna Müller"],
+            ["TITEL ARTIKELNUMMER MENGE MWST PREIS", "Tischleuchte", "AMP-A12345.3", "2 19% 99,00"],
+        ])
+        self.assertEqual(get_parser("ampm").parse_document(pages), [
+            self.row("#A-77", "05.03.2024 14:30", "Anna Müller", "AMP-A12345.3", "2", "Unknown"),
+        ])
+
+    @override_settings(PDF_CACHE_DIR="", PDF_EXTRACTION_WORKERS=1)
+    def test_pdfs(self):
+        # Through the PDF engines: PyPDF2 for Amazon, pdfplumber for Home24
+        rows = parse_pdfs(
+            [write_pdf(self.AMAZON_PAGES), write_pdf(self.AMAZON_PAGES)], get_parser("amazon")
+        )
+        expected = [self.row(*row, buyer_column="Buyer name") for row in self.AMAZON_ROWS]
+        self.assertEqual(rows, [expected, expected])
+        rows = parse_pdfs([write_pdf(self.HOME24_PAGES)], get_parser("home24"))
+        self.assertEqual(rows, [[self.row(*row) for row in self.HOME24_ROWS]])
+
+
+class ExtractionTests(SimpleTestCase):
+    """The process pool yields the same pages as extracting in-process."""
+
+    def setUp(self):
+        # Five pages, so two pages per task splits the files into ranges
+        self.sources = [
+            write_pdf([[f"File {file} page {page}"] for page in range(1, 6)]) for file in range(1, 4)
+        ]
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "third.pdf")
+        with open(path, "wb") as f:
+            f.write(self.sources[2])
+        self.sources[2] = path
+
+    def extract(self, engine):
+        return [list(pages) for pages in iter_pdf_pages(self.sources, engine)]
+
+    def assert_pages(self, engine):
+        expected = [list(iter_pages(source, engine)) for source in self.sources]
+        self.assertEqual([len(pages) for pages in expected], [5, 5, 5])
+        self.assertEqual(self.extract(engine), expected)
+
+    @override_settings(PDF_EXTRACTION_WORKERS=2, PDF_PAGES_PER_TASK=2)
+    def test_pool(self):
+        self.addCleanup(_discard_executor)
+        self.assertIsNotNone(get_executor())
+        for engine in ("pypdf2", "pdfplumber"):
+            with self.subTest(engine=engine):
+                self.assert_pages(engine)
+        # Ranges of a file that is skipped are dropped, not handed to the next one
+        files = iter_pdf_pages(self.sources, "pypdf2")
+        next(files)
+        self.assertEqual(list(next(files)), list(iter_pages(self.sources[1], "pypdf2")))
+
+    @override_settings(PDF_EXTRACTION_WORKERS=1)
+    def test_in_process(self):
+        self.assertIsNone(get_executor())
+        for engine in ("pypdf2", "pdfplumber"):
+            with self.subTest(engine=engine):
+                self.assert_pages(engine)
+
+
+class PdfCacheTests(SimpleTestCase):
+    """Parsed PDFs are kept on disk and evicted least recently used first."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        # Every entry is 25 bytes of JSON, four of them fill the cache
+        self.cache = ParsedPdfCache(self.directory, max_bytes=100)
+
+    def entry(self, name):
+        return name * 23
+
+    def touch(self, key, mtime):
+        path = os.path.join(self.directory, f"{key}.json")
+        os.utime(path, (mtime, mtime))
+
+    def test_least_recently_used_are_evicted(self):
+        with mock.patch.object(self.cache, "evict", wraps=self.cache.evict) as evict:
+            for mtime, key in enumerate("abcd", start=1):
+                self.cache.set(key, self.entry(key))
+                self.touch(key, 1000 * mtime)
+            # Only the first write scans the directory, the others add to the running size
+            self.assertEqual(evict.call_count, 1)
+            self.assertEqual(self.cache.stats()["bytes"], 100)
+
+            self.assertEqual(self.cache.get("a"), self.entry("a"))
+            self.cache.set("e", self.entry("e"))
+            self.assertEqual(evict.call_count, 2)
+
+        # Trimmed to 90% of the limit: b and c go, a was read recently
+        self.assertEqual(sorted(os.listdir(self.directory)), ["a.json", "d.json", "e.json"])
+        self.assertEqual(self.cache.stats()["bytes"], 75)
+        self.cache.set("f", self.entry("f"))
+        self.assertEqual(self.cache.stats()["entries"], 4)
+
+    def test_rescan_interval(self):
+        self.cache.set("a", self.entry("a"))
+        self.cache.rescan_interval = 0
+        # Another process filled the directory behind this one's back
+        with open(os.path.join(self.directory, "b.json"), "w") as f:
+            f.write("0" * 200)
+        self.touch("b", 1000)
+        self.cache.set("c", self.entry("c"))
+        self.assertEqual(sorted(os.listdir(self.directory)), ["a.json", "c.json"])
+
+    def test_hits_and_misses(self):
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.set("a", self.entry("a"))
+        self.assertEqual(self.cache.get("a"), self.entry("a"))
+        self.assertEqual(self.cache.get("a"), self.entry("a"))
+        self.assertEqual(self.cache.stats(), {"hits": 2, "misses": 1, "entries": 1, "bytes": 25})
+        self.cache.clear()
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_repeat_parse_is_served_from_cache(self):
+        pdf_parser = get_parser("amazon")
+        pdf = write_pdf(ParserTests.AMAZON_PAGES)
+        with override_settings(PDF_CACHE_DIR=self.directory, PDF_EXTRACTION_WORKERS=1), \
+                mock.patch("locator.pdf_cache._cache", None):
+            rows = parse_pdfs([pdf], pdf_parser)
+            with mock.patch("locator.utils.iter_pdf_pages", return_value=iter([])) as extract:
+                self.assertEqual(parse_pdfs([pdf], pdf_parser), rows)
+            extract.assert_called_once_with([], pdf_parser.engine)
+            self.assertEqual(len(rows[0]), len(ParserTests.AMAZON_ROWS))
+            self.assertEqual(get_pdf_cache().stats()["hits"], 1)
+            self.assertEqual(get_pdf_cache().stats()["misses"], 1)
+
+
+class KeysetPaginationTests(TestCase):
+    """Walking the order list by cursors visits every order exactly once."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Several orders a day, so pages split between orders of the same date
+        for number in range(11):
+            Order.objects.create(
+                store_name="Ebay", date=datetime.date(2024, 1, 1 + number // 3),
+                order_number=f"P{number}", customer_name="Buyer",
+            )
+        cls.newest_first = list(Order.objects.order_by("-date", "-pk").values_list("pk", flat=True))
+
+    def paginator(self, page_size=4):
+        return KeysetPaginator(Order.objects.all(), page_size)
+
+    def ids(self, page):
+        return [order.pk for order in page.object_list]
+
+    def walk_forward(self, page_size):
+        paginator = self.paginator(page_size)
+        pages = [paginator.page()]
+        while pages[-1].has_next:
+            pages.append(paginator.page(after=pages[-1].next_cursor))
+        return pages
+
+    def test_forward_visits_every_order_once(self):
+        for page_size in (1, 3, 4, 11, 20):
+            with self.subTest(page_size=page_size):
+                pages = self.walk_forward(page_size)
+                self.assertEqual([pk for page in pages for pk in self.ids(page)], self.newest_first)
+                self.assertTrue(all(page.object_list for page in pages))
+                self.assertFalse(pages[0].has_previous)
+                self.assertFalse(pages[-1].has_next)
+                self.assertTrue(all(page.has_previous for page in pages[1:]))
+
+    def test_backward_returns_the_same_pages(self):
+        pages = self.walk_forward(4)
+        paginator = self.paginator(4)
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = paginator.page(before=page.previous_cursor)
+            self.assertEqual(self.ids(page), self.ids(expected))
+            self.assertTrue(page.has_next)
+        self.assertFalse(page.has_previous)
+
+    def test_page_size_dividing_the_orders_has_no_empty_last_page(self):
+        Order.objects.filter(order_number="P10").delete()
+        pages = self.walk_forward(5)
+        self.assertEqual([len(page.object_list) for page in pages], [5, 5])
+
+    def test_order_added_between_pages_is_not_repeated(self):
+        paginator = self.paginator(4)
+        first = paginator.page()
+        Order.objects.create(
+            store_name="Ebay", date=datetime.date(2024, 2, 1), order_number="NEW", customer_name="Buyer"
+        )
+        second = paginator.page(after=first.next_cursor)
+        self.assertEqual(self.ids(second), self.newest_first[4:8])
+
+    def test_malformed_cursor_starts_from_the_newest(self):
+        for cursor in ("garbage", "2024-13-01_5", "2024-01-01_x", "_"):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.ids(self.paginator().page(after=cursor)), self.newest_first[:4])
+
+    @override_settings(ORDER_LIST_PAGE_SIZE=4)
+    def test_order_list_links(self):
+        self.client.force_login(User.objects.create_user("packer", password="packer"))
+        response = self.client.get("/orders/")
+        page = response.context["page_obj"]
+        self.assertEqual(self.ids(page), self.newest_first[:4])
+        self.assertContains(response, f"after={page.next_cursor}")
+        response = self.client.get("/orders/", {"after": page.next_cursor})
+        self.assertEqual(self.ids(response.context["page_obj"]), self.newest_first[4:8])
+
+
+class OrderSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for number, customer in (("A100", "Anna Weber"), ("A1001", "Jonas Weber"), ("B200", "Weber A100")):
+            Order.objects.create(
+                store_name="Weber Shop", date=datetime.date(2024, 1, 1), order_number=number, customer_name=customer
+            )
+
+    def search(self, query):
+        with self.assertNumQueries(1):
+            return sorted(Order.objects.filter(order_search_filter(query)).values_list("order_number", flat=True))
+
+    def test_order_number_matches_only_that_order(self):
+        self.assertEqual(self.search(" A100 "), ["A100"])
+
+    def test_other_queries_match_number_and_customer(self):
+        self.assertEqual(self.search("a10"), ["A100", "A1001", "B200"])
+        self.assertEqual(self.search("weber"), ["A100", "A1001", "B200"])
+        self.assertEqual(self.search("shop"), [])
+
+
+class RoutingTests(SimpleTestCase):
+    """Pick routes visit every item once and never walk further than the plain order."""
+
+    layout = WarehouseLayout(aisle_length=30, line_distance=3.0, depot_line=1)
+
+    def items(self, count, seed):
+        generator = random.Random(seed)
+        items = []
+        for number in range(count):
+            if generator.random() < 0.1:
+                items.append({"id": number, "line": None, "place": None})
+            else:
+                items.append({"id": number, "line": generator.randint(1, 8), "place": generator.randint(0, 29)})
+        return items
+
+    def walk_length(self, items):
+        stops = [(self.layout.depot_line, 0)]
+        for item in items:
+            if item["line"] is not None and (item["line"], item["place"]) != stops[-1]:
+                stops.append((item["line"], item["place"]))
+        stops.append((self.layout.depot_line, 0))
+        distances = self.layout.distances([line for line, _ in stops], [place for _, place in stops])
+        return sum(distances[k, k + 1] for k in range(len(stops) - 1))
+
+    def test_routes(self):
+        for seed in range(20):
+            items = self.items(60, seed)
+            with self.subTest(seed=seed):
+                route = optimize_route(items, self.layout, refine=8)
+                located = [item for item in items if item["line"] is not None]
+                unlocated = [item for item in items if item["line"] is None]
+                self.assertEqual(sorted(item["id"] for item in route[:len(located)]),
+                                 sorted(item["id"] for item in located))
+                self.assertEqual(route[len(located):], unlocated)
+                sorted_walk = sorted(located, key=lambda item: (item["line"], item["place"]))
+                self.assertLessEqual(self.walk_length(route), self.walk_length(sorted_walk) + 1e-9)
+                self.assertEqual(optimize_route(items, self.layout, refine=8), route)
+
+    def test_two_opt_moves_the_last_stop(self):
+        # Stops around a circle, the depot among them; only swapping the
+        # last two stops shortens the tour
+        angles = np.linspace(0, 2 * np.pi, 7, endpoint=False)
+        points = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+        distances = np.linalg.norm(points[:, None] - points[None, :], axis=2)
+        self.assertEqual(two_opt([0, 1, 2, 3, 5, 4], distances, passes=4, window=20), [0, 1, 2, 3, 4, 5])
+
+class PickListAssertions:
+    def assertPickListIsLive(self):
+        live = {
+            (row["order__store_name"], row["order__status"], row["item_id"]): (row["quantity"], row["lines"])
+            for row in OrderItem.objects.values("order__store_name", "order__status", "item_id")
+            .annotate(quantity=Sum("quantity"), lines=Count("id"))
+            .order_by()
+        }
+        kept = {
+            (entry.store_name, entry.status, entry.item_id): (entry.quantity, entry.lines)
+            for entry in PickListEntry.objects.exclude(quantity=0, lines=0)
+        }
+        self.assertEqual(kept, live)
+
+
+class PickListTests(PickListAssertions, TestCase):
+    """The pick list follows every order and order item change."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.items = [
+            Item.objects.create(model_prefix="FBA", number=str(number), line=1, place=number)
+            for number in range(3)
+        ]
+
+    def order(self, number, store="Ebay", status="INP", **quantities):
+        order = Order.objects.create(
+            store_name=store, date=datetime.date(2024, 1, 1), order_number=number,
+            customer_name="Buyer", status=status,
+        )
+        for index, quantity in quantities.items():
+            OrderItem.objects.create(order=order, item=self.items[int(index[1:])], quantity=quantity)
+        return order
+
+    def setUp(self):
+        self.first = self.order("P1", i0=2, i1=1)
+        self.second = self.order("P2", i0=3)
+        self.assertPickListIsLive()
+
+    def test_order_item_created_and_changed(self):
+        OrderItem.objects.create(order=self.second, item=self.items[2], quantity=4)
+        self.assertPickListIsLive()
+        order_item = OrderItem.objects.get(order=self.first, item=self.items[0])
+        order_item.quantity = 7
+        order_item.save()
+        self.assertPickListIsLive()
+        order_item.item = self.items[1]
+        order_item.order = self.second
+        order_item.save()
+        self.assertPickListIsLive()
+
+    def test_order_item_deleted(self):
+        OrderItem.objects.get(order=self.first, item=self.items[1]).delete()
+        self.assertPickListIsLive()
+        OrderItem.objects.filter(item=self.items[0]).delete()
+        self.assertPickListIsLive()
+
+    def test_status_and_store_changes(self):
+        self.first.status = "COM"
+        self.first.save()
+        self.assertPickListIsLive()
+        self.first.store_name = "Amazon"
+        self.first.save(update_fields=["store_name"])
+        self.assertPickListIsLive()
+        # A stale instance still moves the lines from where they are now
+        stale = Order.objects.get(pk=self.second.pk)
+        transition_orders("ONH", {self.second.pk: None})
+        stale.status = "CAN"
+        stale.save()
+        self.assertPickListIsLive()
+
+    def test_transitions(self):
+        transition_orders("COM", {self.first.pk: None, self.second.pk: None})
+        self.assertPickListIsLive()
+        transition_orders("INP", {self.first.pk: None})
+        self.assertPickListIsLive()
+
+    def test_cascade_deletes(self):
+        self.first.delete()
+        self.assertPickListIsLive()
+        self.order("P3", store="Amazon", i0=1, i2=2)
+        Order.objects.filter(store_name="Amazon").delete()
+        self.assertPickListIsLive()
+        self.items[0].delete()
+        self.assertPickListIsLive()
+
+
+class PickListRaceTests(PickListAssertions, TransactionTestCase):
+    def test_save_waits_for_a_concurrent_transition(self):
+        item = Item.objects.create(model_prefix="FBA", number="1", line=1, place=1)
+        order = Order.objects.create(
+            store_name="Ebay", date=datetime.date(2024, 1, 1), order_number="R1", customer_name="Buyer"
+        )
+        OrderItem.objects.create(order=order, item=item, quantity=2)
+        # Loaded before the transition, saved while it is still open
+        stale = Order.objects.get(pk=order.pk)
+        saving = threading.Event()
+
+        def save():
+            try:
+                saving.set()
+                stale.status = "ONH"
+                stale.save()
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=save)
+        with transaction.atomic():
+            transition_orders("COM", {order.pk: None})
+            thread.start()
+            saving.wait(5)
+            time.sleep(0.2)
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(Order.objects.get(pk=order.pk).status, "ONH")
+        self.assertPickListIsLive()
+
+
+class ConditionalGetTests(TestCase):
+    """Polls get a 304 until the data behind them changes, then fresh data."""
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.item = Item.objects.create(model_prefix="FBA", number="00001", line=1, place=1)
+            cls.order = Order.objects.create(
+                store_name="Ebay", date=datetime.date(2024, 1, 1), order_number="C1", customer_name="Buyer"
+            )
+            cls.order_item = OrderItem.objects.create(order=cls.order, item=cls.item, quantity=2)
+
+    def poll(self, url, etag=None, **params):
+        headers = {"if-none-match": etag} if etag else {}
+        return self.client.get(url, params, headers=headers)
+
+    def assertUnchanged(self, url, etag, **params):
+        response = self.poll(url, etag, **params)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def assertChanged(self, url, etag, **params):
+        response = self.poll(url, etag, **params)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        return response
+
+    def change(self, func, *args, **kwargs):
+        # Versions are bumped when the change commits
+        with self.captureOnCommitCallbacks(execute=True):
+            func(*args, **kwargs)
+
+    def test_item_endpoints_follow_item_changes(self):
+        urls = [
+            ("/fetch-model-numbers/", {"model_prefix": "FBA"}),
+            ("/item-typeahead/", {"model_prefix": "FBA", "q": "0"}),
+            ("/item-manifest/", {}),
+        ]
+        etags = [self.poll(url, **params)["ETag"] for url, params in urls]
+        for (url, params), etag in zip(urls, etags):
+            self.assertUnchanged(url, etag, **params)
+
+        # Orders are not part of these responses
+        self.change(transition_orders, "COM", {self.order.pk: None})
+        for (url, params), etag in zip(urls, etags):
+            self.assertUnchanged(url, etag, **params)
+
+        self.change(Item.objects.create, model_prefix="FBA", number="00002", line=1, place=2)
+        for (url, params), etag in zip(urls, etags):
+            self.assertChanged(url, etag, **params)
+        response = self.poll("/fetch-model-numbers/", model_prefix="FBA")
+        self.assertEqual(json.loads(response.content)["numbers"], ["00001", "00002"])
+
+    def test_pick_list_follows_order_and_item_changes(self):
+        url, params = "/collect-items/", {"status": "INP"}
+        etag = self.poll(url, **params)["ETag"]
+        self.assertUnchanged(url, etag, **params)
+
+        def set_quantity():
+            self.order_item.quantity = 5
+            self.order_item.save()
+
+        def move_item():
+            self.item.line = 9
+            self.item.save()
+
+        for change in (
+            set_quantity,
+            lambda: transition_orders("COM", {self.order.pk: None}),
+            lambda: transition_orders("INP", {self.order.pk: None}),
+            move_item,
+        ):
+            self.change(change)
+            etag = self.assertChanged(url, etag, **params)["ETag"]
+            self.assertUnchanged(url, etag, **params)
+
+        items = json.loads(self.poll(url, **params).content)["items"]
+        self.assertEqual(
+            [(item["model"], item["quantity"], item["line"]) for item in items], [("FBA00001", 5, 9)]
+        )
+
+    def test_last_modified(self):
+        response = self.poll("/collect-items/", status="INP")
+        response = self.client.get(
+            "/collect-items/", {"status": "INP"}, headers={"if-modified-since": response["Last-Modified"]}
+        )
+        self.assertEqual(response.status_code, 304)
+
+
+class ItemTypeaheadTests(TestCase):
+    """Typeahead suggestions come from the in-memory item index."""
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            for number in ["100", "101", "102", "110", "200"]:
+                Item.objects.create(model_prefix="FBA", number=number)
+            Item.objects.create(model_prefix="CSB", number="103")
+
+    def setUp(self):
+        # Versions roll back with each test, so an index left by another test could look current
+        patcher = mock.patch("locator.item_index._index", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def suggest(self, **params):
+        response = self.client.get("/item-typeahead/", params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)["numbers"]
+
+    def test_prefix_matching(self):
+        self.assertEqual(self.suggest(model_prefix="FBA", q="10"), ["100", "101", "102"])
+        self.assertEqual(self.suggest(model_prefix="FBA", q=" 1 "), ["100", "101", "102", "110"])
+        self.assertEqual(self.suggest(model_prefix="FBA", q="3"), [])
+        self.assertEqual(self.suggest(model_prefix="CSB", q="1"), ["103"])
+        self.assertEqual(self.suggest(model_prefix="XXX", q="1"), [])
+        self.assertEqual(self.client.get("/item-typeahead/", {"q": "1"}).status_code, 400)
+
+    @override_settings(ITEM_TYPEAHEAD_LIMIT=3)
+    def test_limit(self):
+        self.assertEqual(self.suggest(model_prefix="FBA", q="1", limit=2), ["100", "101"])
+        # Capped at ITEM_TYPEAHEAD_LIMIT
+        self.assertEqual(self.suggest(model_prefix="FBA", q="", limit=10), ["100", "101", "102"])
+        self.assertEqual(self.suggest(model_prefix="FBA", q="1", limit=-1), [])
+        response = self.client.get("/item-typeahead/", {"model_prefix": "FBA", "limit": "many"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_reloads_after_items_change(self):
+        self.assertEqual(self.suggest(model_prefix="FBA", q="10"), ["100", "101", "102"])
+        with self.captureOnCommitCallbacks(execute=True):
+            Item.objects.create(model_prefix="FBA", number="1000")
+        self.assertEqual(self.suggest(model_prefix="FBA", q="10"), ["100", "1000", "101", "102"])
+        with self.captureOnCommitCallbacks(execute=True):
+            Item.objects.filter(model_prefix="FBA", number="100").get().delete()
+        self.assertEqual(self.suggest(model_prefix="FBA", q="10"), ["1000", "101", "102"])
+
+class ItemLocationsTests(TestCase):
+    """Scanned codes resolve to locations by exact prefix and number."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Item.objects.create(model_prefix="FBA", number="1", line=2, place=5)
+        Item.objects.create(model_prefix="FBA", number="12", line=2, place=1)
+        Item.objects.create(model_prefix="CSB", number="22", line=1, place=3)
+
+    def post(self, body):
+        return self.client.post("/item-locations/", body, content_type="application/json")
+
+    def test_known_and_unknown_codes(self):
+        response = self.post({"codes": ["FBA1", "XXX1", "CSB22", "FBA9", "CSB2", "FBA1", "", "FBA12"]})
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(response.content)
+        # In walking order, each code once
+        self.assertEqual(list(body["locations"].items()), [
+            ("CSB22", {"line": 1, "place": 3}),
+            ("FBA12", {"line": 2, "place": 1}),
+            ("FBA1", {"line": 2, "place": 5}),
+        ])
+        # CSB2 is not CSB22, nor is FBA1 a prefix match for FBA12
+        self.assertEqual(body["unknown"], ["XXX1", "FBA9", "CSB2"])
+        self.assertEqual(json.loads(self.post({"codes": []}).content), {"locations": {}, "unknown": []})
+
+    @override_settings(ITEM_LOCATIONS_MAX_CODES=3)
+    def test_invalid_requests(self):
+        self.assertEqual(self.post({"codes": ["FBA1", "FBA12", "CSB22"]}).status_code, 200)
+        response = self.post({"codes": ["FBA1", "FBA12", "CSB22", "FBA9"]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content), {"error": "Expected a list of at most 3 codes"})
+        self.assertEqual(self.post({"codes": "FBA1"}).status_code, 400)
+        self.assertEqual(self.post("not json").status_code, 400)
+        self.assertEqual(self.client.get("/item-locations/").status_code, 405)
+
+class TransitionTests(TestCase):
+    """Status changes report orders they could not move instead of overwriting them."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.orders = {
+            status: Order.objects.create(
+                store_name="Ebay", date=datetime.date(2024, 1, 1), order_number=f"T{status}",
+                customer_name="Buyer", status=status,
+            )
+            for status in ("INP", "DEL", "CAN")
+        }
+
+    def status(self, status):
+        return Order.objects.values_list("status", "version").get(pk=self.orders[status].pk)
+
+    def test_version_conflict(self):
+        order = self.orders["INP"]
+        result = transition_orders("COM", {order.pk: order.version})
+        self.assertEqual(result.updated, [{"id": order.pk, "status": "COM", "version": 2}])
+        # A second device still holding version 1
+        result = transition_orders("ONH", {order.pk: order.version}, note="Damaged")
+        self.assertEqual(result.updated, [])
+        self.assertEqual(
+            result.conflicts, [{"id": order.pk, "reason": "changed", "status": "COM", "version": 2}]
+        )
+        self.assertEqual(self.status("INP"), ("COM", 2))
+
+    def test_missing_order_and_unknown_status(self):
+        result = transition_orders("COM", {0: None, self.orders["INP"].pk: None})
+        self.assertEqual(result.conflicts, [{"id": 0, "reason": "not found"}])
+        self.assertEqual(len(result.updated), 1)
+        with self.assertRaises(ValueError):
+            transition_orders("XXX", {self.orders["INP"].pk: None})
+
+    def test_every_status_can_be_completed_held_and_reopened(self):
+        for status in ("DEL", "CAN"):
+            for target in ("COM", "ONH", "INP"):
+                with self.subTest(status=status, target=target):
+                    self.assertFalse(transition_orders(target, {self.orders[status].pk: None}).conflicts)
+
+    def test_complete_and_hold_views(self):
+        self.client.post(f"/complete-order/{self.orders['DEL'].pk}/", HTTP_REFERER="/orders/")
+        self.assertEqual(self.status("DEL")[0], "COM")
+        response = self.client.post(f"/hold-order/{self.orders['CAN'].pk}/", {"note": "Call the buyer"})
+        self.assertRedirects(response, "/", fetch_redirect_response=False)
+        self.assertEqual(Order.objects.get(pk=self.orders["CAN"].pk).notes, "Call the buyer")
+        self.assertEqual(self.client.post("/complete-order/0/").status_code, 404)
+        self.assertEqual(self.client.post("/hold-order/0/").status_code, 404)
+
+    def test_disallowed_move_is_a_conflict(self):
+        order = self.orders["INP"]
+        with mock.patch.dict("locator.transitions.STATUS_TRANSITIONS", {"COM": {"ONH"}}):
+            response = self.client.post(f"/complete-order/{order.pk}/")
+            self.assertEqual(response.status_code, 409)
+            self.assertIn(b"cannot move from INP to COM", response.content)
+        self.assertEqual(self.status("INP"), ("INP", 1))
+
+    def test_bulk_endpoint(self):
+        url = "/orders/status/"
+        inp, delivered = self.orders["INP"], self.orders["DEL"]
+        response = self.client.post(
+            url, {"status": "COM", "orders": [{"id": inp.pk, "version": 1}, 0]}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["conflicts"], [{"id": 0, "reason": "not found"}])
+        response = self.client.post(
+            url, {"status": "ONH", "orders": [{"id": inp.pk, "version": 1}]}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(json.loads(response.content)["conflicts"][0]["reason"], "changed")
+        response = self.client.post(url, {"status": "ONH", "orders": [delivered.pk]}, content_type="application/json")
+        self.assertEqual(
+            json.loads(response.content)["updated"], [{"id": delivered.pk, "status": "ONH", "version": 2}]
+        )
+
+
+class OrderFacetTests(TestCase):
+    """The cached store and status counts follow every way orders change."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Item.objects.create(model_prefix="FBA", number="1")
+
+    def setUp(self):
+        cache.delete(ORDER_FACETS_CACHE_KEY)
+
+    def order(self, number, store_name="Ebay"):
+        return Order.objects.create(
+            store_name=store_name, date=datetime.date(2024, 1, 1), order_number=number, customer_name="Anna"
+        )
+
+    def counts(self):
+        facets = get_order_facets()
+        return dict(facets["stores"]), {code: count for code, _, count in facets["statuses"]}
+
+    def test_facets_follow_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.order("A1")
+        self.assertEqual(self.counts(), ({"Ebay": 1}, {"INP": 1}))
+
+        # The cached facets stay until the change commits
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.order("A2", store_name="Otto")
+            self.assertEqual(self.counts(), ({"Ebay": 1}, {"INP": 1}))
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.counts(), ({"Ebay": 1, "Otto": 1}, {"INP": 2}))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.status = "COM"
+            first.save()
+        self.assertEqual(self.counts(), ({"Ebay": 1, "Otto": 1}, {"COM": 1, "INP": 1}))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self.counts(), ({"Otto": 1}, {"INP": 1}))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            results = process_excel_data(pd.DataFrame([{
+                "store_name": "Amazon", "date": "01.02.2024", "order_number": "B1",
+                "customer_name": "Jonas", "item": "FBA1", "quantity": "1",
+            }]))
+        self.assertEqual(results["new_orders"], ["B1"])
+        self.assertEqual(self.counts(), ({"Amazon": 1, "Otto": 1}, {"INP": 2}))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            transition_orders("ONH", {Order.objects.get(order_number="B1").pk: None})
+        self.assertEqual(self.counts(), ({"Amazon": 1, "Otto": 1}, {"INP": 1, "ONH": 1}))
+
+
+class MetricsTests(TestCase):
+    """/metrics sums the metrics of every worker process."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings = override_settings(METRICS_DIR=self.directory, METRICS_TOKEN="secret")
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def worker_file(self, pid, requests):
+        # What another gunicorn worker on this host wrote
+        key = [["method", "GET"], ["status", 200], ["view", "other"]]
+        state = {"host": socket.gethostname(), "pid": pid, "peak_rss": 1024, "metrics": {
+            REQUESTS.name: [[key, requests]],
+        }}
+        path = os.path.join(self.directory, f"{socket.gethostname()}_{pid}_test.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        return path
+
+    def requests(self, text):
+        prefix = f'{REQUESTS.name}_total{{method="GET",status="200",view="other"}} '
+        return next(float(line[len(prefix):]) for line in text.splitlines() if line.startswith(prefix))
+
+    def test_processes_are_summed(self):
+        # The parent of the test runner stands in for a running worker
+        self.worker_file(os.getppid(), 3)
+        exited = self.worker_file(2 ** 22 + 1, 4)
+        self.assertEqual(self.requests(render_metrics()), 7)
+        # The exited worker was folded into the archive, and still counts
+        self.assertFalse(os.path.exists(exited))
+        self.assertTrue(os.path.exists(os.path.join(self.directory, "exited.json")))
+        self.assertEqual(self.requests(render_metrics()), 7)
+        self.assertIn(f'process="{socket.gethostname()}:{os.getppid()}"', render_metrics())
+
+    def test_token_is_required(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        self.assertEqual(self.client.get("/metrics", headers={"authorization": "Bearer wrong"}).status_code, 403)
+        response = self.client.get("/metrics", headers={"authorization": "Bearer secret"})
+        self.assertEqual(response.status_code, 200)
+        with override_settings(METRICS_TOKEN=""):
+            self.assertEqual(self.client.get("/metrics", headers={"authorization": "Bearer "}).status_code, 403)
+
+
+class OrderResourceTests(TestCase):
+    def test_number_of_several_prefixes_is_a_row_error(self):
+        Item.objects.create(model_prefix="FBA", number="00001", line=1, place=1)
+        Item.objects.create(model_prefix="CSB", number="00001", line=1, place=2)
+        dataset = tablib.Dataset(headers=["store_name", "date", "order_number", "customer_name", "item", "quantity"])
+        dataset.append(["Ebay", "2024-01-01", "R1", "Buyer", "00001", 1])
+        dataset.append(["Ebay", "2024-01-01", "R2", "Buyer", "00002", 1])
+        result = OrderResource().import_data(dataset, dry_run=True)
+        self.assertEqual(
+            [(number, [str(error.error) for error in errors]) for number, errors in result.row_errors()],
+            [
+                (1, ["Item number '00001' is used by several prefixes: CSB, FBA"]),
+                (2, ["Item with number '00002' not found"]),
+            ],
+        )
@@ -0,0 +1,95 @@
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .facets import invalidate_order_facets
+from .models import Order
+from .picklist import move_orders
+from .versions import ORDERS, bump_data_version
+
+STATUSES = frozenset(code for code, _ in Order.STATUS_CHOICES)
+
+# Statuses an order may move to, with the statuses it may come from. Any
+# move is allowed, as the order list offers Complete and Hold on orders of
+# every status; narrow a set here to forbid a move.
+STATUS_TRANSITIONS = {status: STATUSES for status in STATUSES}
+
+
+@dataclass
+class TransitionResult:
+    updated: list = field(default_factory=list)
+    conflicts: list = field(default_factory=list)
+
+    def as_dict(self):
+        return {"updated": self.updated, "conflicts": self.conflicts}
+
+
+def transition_orders(status, versions, note=None):
+    """Move many orders to ``status`` in one UPDATE.
+
+    ``versions`` maps order ids to the version the caller last saw, or
+    None to skip that check. An order is left alone and reported as a
+    conflict when it does not exist, has been changed since that version
+    or cannot move to ``status`` from its current one. ``note``, when
+    given, replaces the notes of the updated orders.
+
+    ``QuerySet.update`` sends no signals, so the pick list, facets and
+    data version are kept up to date here.
+    """
+    if status not in STATUS_TRANSITIONS:
+        raise ValueError(f"Unknown status: {status}")
+    sources = STATUS_TRANSITIONS[status]
+    result = TransitionResult()
+
+    with transaction.atomic():
+        # Lock the rows first so the checks below still hold for the UPDATE,
+        # in id order so overlapping transitions cannot deadlock
+        current = {
+            row["id"]: row
+            for row in Order.objects.select_for_update()
+            .filter(pk__in=list(versions))
+            .order_by("pk")
+            .values("id", "store_name", "status", "version")
+        }
+        accepted = []
+        for order_id, expected in versions.items():
+            row = current.get(order_id)
+            if row is None:
+                result.conflicts.append({"id": order_id, "reason": "not found"})
+            elif expected is not None and row["version"] != expected:
+                result.conflicts.append({
+                    "id": order_id, "reason": "changed", "status": row["status"], "version": row["version"],
+                })
+            elif row["status"] not in sources:
+                result.conflicts.append({
+                    "id": order_id, "reason": f"cannot move from {row['status']} to {status}",
+                    "status": row["status"], "version": row["version"],
+                })
+            else:
+                accepted.append(order_id)
+        if not accepted:
+            return result
+
+        changes = {"status": status, "version": F("version") + 1, "updated_at": timezone.now()}
+        if note is not None:
+            changes["notes"] = note
+        Order.objects.filter(pk__in=accepted, status__in=sources).update(**changes)
+
+        moved = {
+            order_id: ((current[order_id]["store_name"], current[order_id]["status"]),
+                       (current[order_id]["store_name"], status))
+            for order_id in accepted
+            if current[order_id]["status"] != status
+        }
+        if moved:
+            move_orders(moved)
+            invalidate_order_facets()
+        bump_data_version(ORDERS)
+
+    result.updated = [
+        {"id": order_id, "status": status, "version": current[order_id]["version"] + 1}
+        for order_id in accepted
+    ]
+    return result
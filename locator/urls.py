@@ -1,22 +1,28 @@
 from django.urls import path
 
 from .convert_csv_to_excel import upload_and_download
-from .views import (CompleteOrderView, HoldOrderView, OrderListView,
+from .views import (CompleteOrderView, HoldOrderView, OrderListView, bulk_update_order_status,
                     collect_items, fetch_model_numbers, finalize_items,
+                    item_locations, item_manifest, item_typeahead,
                     select_model, set_item, update_order_status, upload_items,
                     upload_orders, upload_pdfs, aggregate_skus, upload_pdfs_home24, upload_pdfs_mano,
-                    upload_pdfs_new_functionality)
+                    upload_pdfs_new_functionality, import_progress,
+                    create_job, job_status, job_download, metrics)
 
 urlpatterns = [
     path("", set_item, name="set_item"),
     path("select-model/", select_model, name="select-model"),
     path("fetch-model-numbers/", fetch_model_numbers, name="fetch-model-numbers"),
+    path("item-typeahead/", item_typeahead, name="item-typeahead"),
+    path("item-manifest/", item_manifest, name="item-manifest"),
+    path("item-locations/", item_locations, name="item-locations"),
     path("finalize-items/", finalize_items, name="finalize-items"),
     ########
     path(
         "orders/", OrderListView.as_view(), name="order_list"
     ),  # URL for the orders list view
     path("update-order-status/", update_order_status, name="update_order_status"),
+    path("orders/status/", bulk_update_order_status, name="bulk_update_order_status"),
     # URL for updating order status via AJAX
     path(
         "collect-items/", collect_items, name="collect_items"
@@ -30,6 +36,7 @@ urlpatterns = [
     path("upload/", upload_orders, name="upload_orders"),
     #upload items
     path('upload-items/', upload_items, name='upload_items'),
+    path('import-progress/<slug:key>/', import_progress, name='import_progress'),
     #csv
     path('upload-and-download/', upload_and_download, name='upload_and_download'),
     path('upload_pdfs/', upload_pdfs, name='upload_pdfs'),
@@ -37,4 +44,10 @@ urlpatterns = [
     path('upload_pdfs_home24/', upload_pdfs_home24, name='upload_pdfs_home24'),
     path('upload_pdfs_mano/', upload_pdfs_mano, name='upload_pdfs_mano'),
     path('upload_pdfs_new_functionality/', upload_pdfs_new_functionality, name='upload_pdfs_new_functionality'),
+    #jobs
+    path('jobs/<int:pk>/', job_status, name='job_status'),
+    path('jobs/<int:pk>/download/', job_download, name='job_download'),
+    path('jobs/<slug:kind>/', create_job, name='create_job'),
+    # Prometheus scrapes /metrics without a trailing slash
+    path('metrics', metrics, name='metrics'),
 ]
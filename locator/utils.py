@@ -1,111 +1,432 @@
+import io
 import logging
-import PyPDF2
-import re
+from contextlib import contextmanager
+import openpyxl
 import pandas as pd
 from dateutil import parser
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models import Case, F, IntegerField, Value, When
 from django.utils import timezone
+from .extraction import iter_pdf_pages
+from .facets import invalidate_order_facets
+from .metrics import IMPORT_DURATION, timed, timed_import
 from .models import Item, Order, OrderItem
+from .parsers import get_parser
+from .picklist import add_order_items
+from .versions import ITEMS, ORDERS, bump_data_version
+from .pdf_cache import get_pdf_cache, source_digest
 
 logger = logging.getLogger(__name__)
 
 
-def handle_uploaded_file(file):
-    df = pd.read_excel(file, engine='openpyxl')
+EXCEL_BATCH_SIZE = 2000
+
+
+class ImportProgress:
+    """Rows-processed counter for a running import.
+
+    When created with a key the counter is published to the cache after every
+    batch, so another request can poll it while the import is running.
+    """
+
+    cache_timeout = 60 * 60
+
+    def __init__(self, key=None):
+        self.key = key
+        self.rows = 0
+        self.total = None
+        self.done = False
+        self.error = None
+        # Rows an earlier, interrupted run already committed
+        self.applied = 0
+
+    @staticmethod
+    def cache_key(key):
+        return f"import-progress:{key}"
+
+    @classmethod
+    def lookup(cls, key):
+        return cache.get(cls.cache_key(key))
+
+    def as_dict(self):
+        return {"rows": self.rows, "total": self.total, "done": self.done, "error": self.error}
+
+    def start(self, total):
+        self.total = total
+        self.publish()
+
+    def advance(self, rows):
+        self.rows += rows
+        self.publish()
+
+    def finish(self):
+        self.done = True
+        self.publish()
+
+    def fail(self, error):
+        self.done = True
+        self.error = str(error)
+        self.publish()
+
+    def checkpoint(self, rows):
+        """Called inside the transaction that commits the file up to row ``rows``."""
+
+    def publish(self):
+        if self.key:
+            cache.set(self.cache_key(self.key), self.as_dict(), self.cache_timeout)
+
+
+@contextmanager
+def import_outcome(progress):
+    """Publish ``progress`` as finished when the block succeeds, as failed when it raises."""
+    try:
+        yield
+    except Exception as e:
+        if progress is not None:
+            progress.fail(e)
+        raise
+    if progress is not None:
+        progress.finish()
+
+
+def iter_excel_batches(file, batch_size=None, dtype=None, progress=None):
+    """Stream the first sheet of an .xlsx file as DataFrames of batch_size rows.
+
+    The workbook is opened read-only so openpyxl parses rows lazily and never
+    builds the whole sheet in memory. The first row is the header; fully
+    empty rows are skipped like pd.read_excel does, and each batch keeps the
+    running row index so "row N" messages stay the same. ``progress`` is
+    advanced once the consumer is done with a batch; the caller marks it
+    finished or failed, see import_outcome().
+    """
+    batch_size = batch_size or EXCEL_BATCH_SIZE
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            if progress is not None:
+                progress.start(0)
+            return
+        columns = [
+            str(name) if name is not None else f"Unnamed: {position}"
+            for position, name in enumerate(header)
+        ]
+        width = len(columns)
+        if progress is not None:
+            progress.start(max((sheet.max_row or 1) - 1, 0))
+
+        start = 0
+        batch = []
+        for values in rows:
+            if all(value is None for value in values):
+                continue
+            batch.append((tuple(values) + (None,) * width)[:width])
+            if len(batch) == batch_size:
+                yield _excel_batch_frame(batch, columns, start, dtype)
+                start += len(batch)
+                if progress is not None:
+                    progress.advance(len(batch))
+                logger.info(f"Processed {start} rows from {getattr(file, 'name', file)}")
+                batch = []
+        if batch:
+            yield _excel_batch_frame(batch, columns, start, dtype)
+            if progress is not None:
+                progress.advance(len(batch))
+    finally:
+        workbook.close()
+
+
+def _excel_batch_frame(batch, columns, start, dtype):
+    df = pd.DataFrame(batch, columns=columns, index=range(start, start + len(batch)))
+    for column, type_ in (dtype or {}).items():
+        if column in df:
+            df[column] = df[column].map(lambda value: value if pd.isna(value) else type_(value))
+    return df
+
+
+MODEL_PREFIXES = frozenset(prefix for prefix, _ in Item.MODEL_CHOICES)
+ITEM_UPDATE_CHUNK_SIZE = 1000
+
+
+def _stock_frame(df):
+    # Split "FBA123 some description" into prefix/number column-wise instead
+    # of row by row.
+    codes = df["item"].astype("string").str.split().str[0]
+    frame = pd.DataFrame(
+        {
+            "row": df.index + 2,
+            "item": df["item"],
+            "code": codes,
+            "prefix": codes.str[:3],
+            "number": codes.str[3:],
+            "raw_quantity": df["quantity"],
+        }
+    )
+    frame["valid"] = frame["prefix"].isin(MODEL_PREFIXES)
+    # Empty or non-numeric cells fail their own row instead of the whole file;
+    # text cells such as "5.0" are written as the number they hold
+    frame["quantity"] = pd.to_numeric(df["quantity"], errors="coerce")
+    frame["quantity_valid"] = frame["quantity"].notna() & (frame["quantity"] % 1 == 0)
+    return frame
+
+
+def _stock_row_error(row):
+    if not row.valid:
+        return f"Invalid model prefix: {row.prefix}"
+    if not row.quantity_valid:
+        return f"Invalid quantity: {row.raw_quantity}"
+    return None
+
 
+def _resolve_items(frame):
+    codes = frame.loc[frame["valid"], "code"].unique().tolist()
+    if not codes:
+        return {}
+    return {(item.model_prefix, item.number): item for item in _resolve_items_query(codes)}
+
+
+@timed_import("items_set")
+def handle_uploaded_file(file, progress=None):
     results = []
-    for idx, row in df.iterrows():
-        item_str = row['item']
-        quantity = row['quantity']
+    with import_outcome(progress):
+        for df in iter_excel_batches(file, progress=progress):
+            results.extend(_set_quantities(df))
+    return results
+
 
-        # Extract the item code
-        item_code = item_str.split()[0]
-        model_prefix = item_code[:3]
-        number = item_code[3:]
+def _set_quantities(df):
+    frame = _stock_frame(df)
+    existing = _resolve_items(frame)
 
-        if model_prefix not in dict(Item.MODEL_CHOICES):
+    results = []
+    quantities = {}
+    for row in frame.itertuples(index=False):
+        error = _stock_row_error(row)
+        if error:
             results.append({
-                'row': idx + 2,
-                'item': item_str,
+                'row': row.row,
+                'item': row.item,
                 'status': 'Failed',
-                'reason': f"Invalid model prefix: {model_prefix}"
+                'reason': error
             })
             continue
 
-        item = Item.objects.filter(model_prefix=model_prefix, number=number).first()
-        if not item:
-            Item.objects.create(
-                model_prefix=model_prefix,
-                number=number,
-                line=None,
-                place=None,
-                quantity=quantity
+        key = (row.prefix, row.number)
+        results.append({
+            'row': row.row,
+            'item': row.code,
+            'status': 'Set new quantity' if key in existing or key in quantities else 'Created',
+            'quantity': int(row.quantity)
+        })
+        # The last row for an item wins, as it did when rows were saved one by one
+        quantities[key] = int(row.quantity)
+
+    now = timezone.now()
+    to_update = []
+    to_create = []
+    for key, quantity in quantities.items():
+        item = existing.get(key)
+        if item is None:
+            to_create.append(
+                Item(model_prefix=key[0], number=key[1], line=None, place=None,
+                     quantity=quantity, updated_at=now)
             )
-            results.append({
-                'row': idx + 2,
-                'item': item_code,
-                'status': 'Created',
-                'quantity': quantity
-            })
         else:
             item.quantity = quantity
-            item.save()
-            results.append({
-                'row': idx + 2,
-                'item': item_code,
-                'status': 'Set new quantity',
-                'quantity': quantity
-            })
+            item.updated_at = now
+            to_update.append(item)
+
+    with transaction.atomic():
+        bump_data_version(ITEMS)
+        # Upsert so an item created by a concurrent upload in the meantime
+        # gets its quantity set instead of failing the whole file.
+        Item.objects.bulk_create(
+            to_create,
+            batch_size=ITEM_UPDATE_CHUNK_SIZE,
+            update_conflicts=True,
+            unique_fields=['model_prefix', 'number'],
+            update_fields=['quantity', 'updated_at'],
+        )
+        Item.objects.bulk_update(
+            to_update, ['quantity', 'updated_at'], batch_size=ITEM_UPDATE_CHUNK_SIZE
+        )
 
     return results
 
 
-def handle_update_file(file):
-    df = pd.read_excel(file, engine='openpyxl')
+@timed_import("items_increment")
+def handle_update_file(file, progress=None):
+    """Add the sheet's quantities to the stock, one committed batch at a time.
 
+    Increments cannot be applied twice, so each batch records how far the
+    file got through ``progress.checkpoint`` in its own transaction, and
+    batches an earlier run already applied are skipped. Their rows are
+    missing from the results.
+    """
     results = []
-    for idx, row in df.iterrows():
-        item_str = row['item']
-        quantity = row['quantity']
+    applied = progress.applied if progress is not None else 0
+    with import_outcome(progress):
+        for df in iter_excel_batches(file, progress=progress):
+            if df.index[-1] < applied:
+                continue
+            results.extend(_increment_quantities(df, progress))
+    return results
+
 
-        # Extract the item code
-        item_code = item_str.split()[0]
-        model_prefix = item_code[:3]
-        number = item_code[3:]
+def _increment_quantities(df, progress=None):
+    frame = _stock_frame(df)
+    existing = _resolve_items(frame)
+
+    deltas = {}
+    for row in frame.itertuples(index=False):
+        item = existing.get((row.prefix, row.number)) if _stock_row_error(row) is None else None
+        if item is not None:
+            deltas[item.pk] = deltas.get(item.pk, 0) + int(row.quantity)
+
+    # Apply every increment as quantity = quantity + delta in the database so
+    # concurrent uploads cannot overwrite each other, then read back the
+    # totals while the updated rows are still locked by this transaction.
+    totals = {}
+    now = timezone.now()
+    pks = list(deltas)
+    with transaction.atomic():
+        bump_data_version(ITEMS)
+        if progress is not None:
+            progress.checkpoint(df.index[-1] + 1)
+        for start in range(0, len(pks), ITEM_UPDATE_CHUNK_SIZE):
+            chunk = pks[start:start + ITEM_UPDATE_CHUNK_SIZE]
+            Item.objects.filter(pk__in=chunk).update(
+                quantity=F('quantity') + Case(
+                    *[When(pk=pk, then=Value(deltas[pk])) for pk in chunk],
+                    output_field=IntegerField(),
+                ),
+                updated_at=now,
+            )
+            totals.update(
+                Item.objects.filter(pk__in=chunk).values_list('pk', 'quantity')
+            )
 
-        if model_prefix not in dict(Item.MODEL_CHOICES):
+    # Report the running total after each row, starting from the quantity
+    # the item had before this file was applied.
+    running = {pk: totals[pk] - delta for pk, delta in deltas.items()}
+    results = []
+    for row in frame.itertuples(index=False):
+        error = _stock_row_error(row)
+        if error:
             results.append({
-                'row': idx + 2,
-                'item': item_str,
+                'row': row.row,
+                'item': row.item,
                 'status': 'Failed',
-                'reason': f"Invalid model prefix: {model_prefix}"
+                'reason': error
             })
-            logger.debug(f"Row {idx + 2}: Invalid model prefix: {model_prefix}")
+            logger.debug(f"Row {row.row}: {error}")
             continue
 
-        item = Item.objects.filter(model_prefix=model_prefix, number=number).first()
-        if not item:
+        item = existing.get((row.prefix, row.number))
+        if item is None:
             results.append({
-                'row': idx + 2,
-                'item': item_str,
+                'row': row.row,
+                'item': row.item,
                 'status': 'Failed',
                 'reason': 'Item does not exist'
             })
-            logger.debug(f"Row {idx + 2}: Item {item_str} does not exist")
+            logger.debug(f"Row {row.row}: Item {row.item} does not exist")
         else:
-            item.quantity += quantity
-            item.save()
+            running[item.pk] += int(row.quantity)
             results.append({
-                'row': idx + 2,
-                'item': item_code,
+                'row': row.row,
+                'item': row.code,
                 'status': 'Updated',
-                'quantity': item.quantity
+                'quantity': running[item.pk]
             })
-            logger.debug(f"Row {idx + 2}: Incremented item {item_code} by {quantity}, new quantity {item.quantity}")
 
+    logger.debug(f"Incremented {len(deltas)} items from {len(frame)} rows")
     return results
 
 
-def process_excel_data(data):
+ORDER_IMPORT_CHUNK_SIZE = 500
+
+
+@timed_import("orders")
+def import_orders_file(file, progress=None):
+    results = {
+        "new_orders": [],
+        "duplicate_orders": [],
+        "error_orders": [],
+        "order_details": [],
+    }
+    # Every batch is committed before the next one is read, so orders
+    # repeated across batches are still reported as duplicates.
+    with import_outcome(progress):
+        for data in iter_excel_batches(file, dtype={"order_number": str}, progress=progress):
+            for key, value in process_excel_data(data).items():
+                results[key].extend(value)
+    return results
+
+
+@timed_import("aggregate_skus")
+def aggregate_sku_quantities(files):
+    partials = []
+    for file in files:
+        for df in iter_excel_batches(file):
+            df['Quantity'] = pd.to_numeric(df['Quantity'], errors='coerce')
+            partials.append(df.groupby('SKU')['Quantity'].sum())
+            if len(partials) > 50:
+                partials = [pd.concat(partials).groupby(level=0).sum()]
+
+    if not partials:
+        return pd.DataFrame(columns=['SKU', 'Quantity'])
+    result = pd.concat(partials).groupby(level=0).sum()
+    return result.rename_axis('SKU').reset_index().sort_values(by='SKU')
+
+
+def _split_item_code(item_code):
+    return (item_code[:3], item_code[3:]) if item_code else ("", "")
+
+
+RESOLVE_ITEMS_SQL = (
+    "SELECT item.* FROM {table} item "
+    "JOIN unnest(%s::varchar[], %s::varchar[]) AS code(model_prefix, number) "
+    "ON item.model_prefix = code.model_prefix AND item.number = code.number "
+    "ORDER BY item.line, item.place"
+)
+
+
+def resolve_item_locations(item_codes):
+    """Look up item codes such as ``FBA123`` by exact ``(prefix, number)``.
+
+    Returns ``(items, unknown)``: the matching items by code, in
+    ``(line, place)`` order, and the codes without an item, in the order
+    given. All codes are resolved in one query joining the items against
+    the code pairs passed as two arrays.
+    """
+    codes = list(dict.fromkeys(code for code in item_codes if code))
+    if not codes:
+        return {}, []
+    items = {f"{item.model_prefix}{item.number}": item for item in _resolve_items_query(codes)}
+    return items, [code for code in codes if code not in items]
+
+
+async def aresolve_item_locations(item_codes):
+    """Async resolve_item_locations(), for async views."""
+    codes = list(dict.fromkeys(code for code in item_codes if code))
+    if not codes:
+        return {}, []
+    items = {f"{item.model_prefix}{item.number}": item async for item in _resolve_items_query(codes)}
+    return items, [code for code in codes if code not in items]
+
+
+def _resolve_items_query(codes):
+    prefixes, numbers = zip(*map(_split_item_code, codes))
+    return Item.objects.raw(
+        RESOLVE_ITEMS_SQL.format(table=Item._meta.db_table), [list(prefixes), list(numbers)]
+    )
+
+
+def process_excel_data(data, chunk_size=ORDER_IMPORT_CHUNK_SIZE):
     results = {
         "new_orders": [],
         "duplicate_orders": [],
@@ -121,7 +442,8 @@ def process_excel_data(data):
         "quantity",
     ]
 
-    for index, row in data.iterrows():
+    rows = []
+    for index, row in zip(data.index, data.to_dict("records")):
         order_info = {
             col: str(row[col]).strip() if pd.notna(row[col]) else None
             for col in required_columns
@@ -145,15 +467,38 @@ def process_excel_data(data):
                 if order_info["date"]
                 else None
             )
-        except ValueError as e:
+        except ValueError:
             results["error_orders"].append(
                 (order_info["order_number"], f"Row {index + 2}: Invalid date format")
             )
             continue
 
+        rows.append((index, order_info, date))
+
+    # Preload everything the rows refer to: one query for the order numbers
+    # that already exist and one for the items.
+    known_orders = set(
+        Order.objects.filter(
+            order_number__in={order_info["order_number"] for _, order_info, _ in rows}
+        ).values_list("order_number", flat=True)
+    )
+    item_codes = list({
+        item_code
+        for _, order_info, _ in rows
+        if order_info["order_number"] not in known_orders
+        for item_code in order_info["item"].split(",")
+        if item_code
+    })
+    items_by_code = {
+        (item.model_prefix, item.number): item
+        for item in (_resolve_items_query(item_codes) if item_codes else [])
+    }
+
+    pending = []
+    for index, order_info, date in rows:
         order_number = order_info["order_number"]
 
-        if Order.objects.filter(order_number=order_number).exists():
+        if order_number in known_orders:
             results["duplicate_orders"].append(order_number)
             continue
 
@@ -167,163 +512,166 @@ def process_excel_data(data):
             continue
 
         # Validate all items before creating the order
-        all_items_exist = True
+        lines = []
         for item_code in items:
-            try:
-                Item.objects.get(
-                    model_prefix=item_code[:3] if item_code else "",
-                    number=item_code[3:] if item_code else "",
-                )
-            except Item.DoesNotExist:
+            item = items_by_code.get(_split_item_code(item_code))
+            if item is None:
                 results["error_orders"].append(
                     (order_number, f"Row {index + 2}: Item {item_code} does not exist")
                 )
-                all_items_exist = False
                 break
+            lines.append((item_code, item))
+        else:
+            try:
+                lines = [
+                    (item_code, item, qty, int(qty.strip()))
+                    for (item_code, item), qty in zip(lines, quantities)
+                ]
+            except ValueError as e:
+                _record_failed_order(results, index, order_info, e)
+                continue
+
+            known_orders.add(order_number)
+            pending.append((index, order_info, date, lines))
+
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        try:
+            with transaction.atomic():
+                _create_orders(chunk)
+        except DatabaseError:
+            # Something in the chunk was rejected by the database; retry the
+            # orders one by one so only the offending rows are reported.
+            for entry in chunk:
+                try:
+                    with transaction.atomic():
+                        _create_orders([entry])
+                except DatabaseError as e:
+                    _record_failed_order(results, entry[0], entry[1], e)
+                else:
+                    _record_created_order(results, entry)
+        else:
+            for entry in chunk:
+                _record_created_order(results, entry)
 
-        if not all_items_exist:
-            continue
+    return results
 
-        try:
-            order = Order.objects.create(
+
+def _create_orders(entries):
+    # bulk_create sends no post_save, so the facets, the pick list and the
+    # data version are kept up to date here
+    invalidate_order_facets()
+    bump_data_version(ORDERS)
+    orders = Order.objects.bulk_create(
+        [
+            Order(
                 store_name=order_info["store_name"],
                 date=date,
-                order_number=order_number,
+                order_number=order_info["order_number"],
                 customer_name=order_info["customer_name"],
                 status="INP",
-                created_at=timezone.now(),
-                updated_at=timezone.now()
             )
-
-            for item_code, qty in zip(items, quantities):
-                item = Item.objects.get(
-                    model_prefix=item_code[:3] if item_code else "",
-                    number=item_code[3:] if item_code else "",
-                )
-                OrderItem.objects.create(
-                    order=order, item=item, quantity=int(qty.strip())
-                )
-                results["order_details"].append(
-                    {
-                        "store_name": order_info["store_name"],
-                        "date": order_info["date"],
-                        "order_number": order_number,
-                        "customer_name": order_info["customer_name"],
-                        "item": item_code.strip(),
-                        "quantity": qty.strip(),
-                        "status": "Created",
-                    }
-                )
-
-            results["new_orders"].append(order_number)
-
-        except Exception as e:
-            results["error_orders"].append((order_number, f"Row {index + 2}: {str(e)}"))
-            results["order_details"].append(
-                {
-                    "store_name": order_info["store_name"],
-                    "date": order_info["date"],
-                    "order_number": order_number,
-                    "customer_name": order_info["customer_name"],
-                    "item": order_info["item"],
-                    "quantity": order_info["quantity"],
-                    "status": "Error",
-                }
-            )
-
-    return results
+            for _, order_info, date, _ in entries
+        ]
+    )
+    # An order lists each item once; repeated lines add up
+    quantities = {}
+    for order, (_, _, _, lines) in zip(orders, entries):
+        for _, item, _, quantity in lines:
+            key = (order, item)
+            quantities[key] = quantities.get(key, 0) + quantity
+    order_items = OrderItem.objects.bulk_create(
+        [OrderItem(order=order, item=item, quantity=quantity) for (order, item), quantity in quantities.items()]
+    )
+    add_order_items(order_items)
+
+
+def _record_created_order(results, entry):
+    _, order_info, _, lines = entry
+    for item_code, _, qty, _ in lines:
+        results["order_details"].append(
+            {
+                "store_name": order_info["store_name"],
+                "date": order_info["date"],
+                "order_number": order_info["order_number"],
+                "customer_name": order_info["customer_name"],
+                "item": item_code.strip(),
+                "quantity": qty.strip(),
+                "status": "Created",
+            }
+        )
+    results["new_orders"].append(order_info["order_number"])
+
+
+def _record_failed_order(results, index, order_info, error):
+    results["error_orders"].append(
+        (order_info["order_number"], f"Row {index + 2}: {str(error)}")
+    )
+    results["order_details"].append(
+        {
+            "store_name": order_info["store_name"],
+            "date": order_info["date"],
+            "order_number": order_info["order_number"],
+            "customer_name": order_info["customer_name"],
+            "item": order_info["item"],
+            "quantity": order_info["quantity"],
+            "status": "Error",
+        }
+    )
 
 
 #pdf all
-def extract_text_from_pdf(pdf_path):
-    text = ''
-    with open(pdf_path, 'rb') as f:
-        reader = PyPDF2.PdfReader(f)
-        for page in reader.pages:
-            text += page.extract_text()
-    return text
-
-def parse_orders(text):
-    # Your existing parsing logic
-    orders = text.split('Liefern an:')
-    orders = orders[1:]  # Skip the first empty split
-    data = []  # List of dicts to store data
-    for order_text in orders:
-        lines = order_text.strip().split('\n')
-        # Initialize variables
-        order_number = ''
-        order_date = ''
-        buyer_name = ''
-        delivery_service = ''
-        items = []
-        in_item_section = False
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            # Extract buyer name (first non-empty line)
-            if buyer_name == '' and line != '':
-                buyer_name = line
-            # Extract order number
-            if line.startswith('Bestellnummer:'):
-                order_number = line.replace('Bestellnummer:', '').strip()
-            elif 'Bestelldatum' in line and 'Käufer' in line and 'Versandart' in line:
-                # Next line contains the data
-                if i+1 < len(lines):
-                    data_line = lines[i+1].strip()
-                    parts = data_line.split()
-                    if len(parts) >= 4:
-                        order_date = parts[1]
-                        delivery_service = parts[-1]
-                        buyer_name_parts = parts[2:-1]
-                        buyer_name = ' '.join(buyer_name_parts)
-                    i += 1  # Skip data line
-            elif line.startswith('Menge Produktdetails'):
-                in_item_section = True
-            elif in_item_section:
-                if line.startswith('EUR '):
-                    in_item_section = False
-                elif line.strip() == '':
-                    pass
-                else:
-                    # Use regex to extract quantity and possible SKU
-                    match = re.match(r'^(\d+)\s*(\S*)\s*(.*)$', line)
-                    if match:
-                        item_quantity = match.group(1)
-                        possible_sku = match.group(2)
-                        # Look for 'SKU:' line after this line
-                        sku_found = False
-                        for j in range(i+1, len(lines)):
-                            sku_line = lines[j].strip()
-                            if sku_line.startswith('SKU:'):
-                                item_sku = sku_line.replace('SKU:', '').strip()
-                                sku_found = True
-                                i = j  # Move index to SKU line
-                                break
-                            elif sku_line.startswith('Artikelnr.:'):
-                                # If 'SKU:' line not found but 'Artikelnr.:' found, stop looking
-                                break
-                        if not sku_found:
-                            if possible_sku != '':
-                                item_sku = possible_sku
-                            else:
-                                # If no SKU found, set as empty or handle accordingly
-                                item_sku = ''
-                        items.append({
-                            'quantity': item_quantity,
-                            'sku': item_sku
-                        })
-                    else:
-                        # Line doesn't match expected format, skip or handle
-                        pass
-            i += 1
-        # Now, for each item, create a data row
-        for item in items:
-            data.append({
-                'Order number': order_number,
-                'Order date': order_date,
-                'Buyer name': buyer_name,
-                'SKU': item['sku'],
-                'Quantity': item['quantity'],
-                'Delivery service': delivery_service
-            })
-    return data
+def _pdf_name(pdf):
+    return getattr(pdf, 'name', pdf)
+
+
+def parse_pdfs(pdfs, pdf_parser, progress=None):
+    """Parsed rows of every PDF, in order, reusing cached rows for known files.
+
+    Only files missing from the parsed-PDF cache are extracted and parsed.
+    """
+    pdf_cache = get_pdf_cache()
+    if progress is not None:
+        progress.start(len(pdfs))
+
+    keys = [None] * len(pdfs)
+    rows = [None] * len(pdfs)
+    if pdf_cache is not None:
+        for i, pdf in enumerate(pdfs):
+            keys[i] = pdf_cache.key(source_digest(pdf), pdf_parser.name, pdf_parser.version)
+            rows[i] = pdf_cache.get(keys[i])
+            if rows[i] is not None and progress is not None:
+                progress.advance(1)
+
+    missing = [i for i, file_rows in enumerate(rows) if file_rows is None]
+    if pdf_cache is not None:
+        logger.info(
+            f"{len(pdfs) - len(missing)} of {len(pdfs)} {pdf_parser.name} PDFs served from cache "
+            f"(hits={pdf_cache.hits}, misses={pdf_cache.misses})"
+        )
+    for i, pages in zip(missing, iter_pdf_pages([pdfs[i] for i in missing], pdf_parser.engine)):
+        rows[i] = pdf_parser.parse_document(pages, _pdf_name(pdfs[i]))
+        if pdf_cache is not None:
+            pdf_cache.set(keys[i], rows[i])
+        if progress is not None:
+            progress.advance(1)
+    return rows
+
+
+def pdf_report(parser_name, pdfs, progress=None):
+    """Rows of all ``pdfs`` parsed with the registered parser, as a DataFrame.
+
+    Returns None when nothing was extracted, unless the parser allows an
+    empty sheet.
+    """
+    pdf_parser = get_parser(parser_name)
+    with timed(IMPORT_DURATION, importer=f"pdf_{parser_name}"):
+        rows = parse_pdfs(pdfs, pdf_parser, progress)
+        return pdf_parser.to_dataframe([row for file_rows in rows for row in file_rows])
+
+
+def dataframe_to_excel(df, **kwargs):
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        df.to_excel(writer, index=False, **kwargs)
+    return output.getvalue()
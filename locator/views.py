@@ -2,26 +2,38 @@ import json
 import logging
 import uuid
 import os
-import io
+from collections import defaultdict
+from asgiref.sync import sync_to_async
 from django.http import HttpResponse
-from .utils import extract_text_from_pdf, parse_orders
-from django.core.files.storage import FileSystemStorage
 from django.conf import settings
-import pandas as pd
-from django.db.models import Q, Sum
-from django.http import HttpResponseRedirect, JsonResponse
-from django.shortcuts import redirect, render
+from django.db.models import Sum
+from django.http import Http404, HttpResponseRedirect, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.crypto import constant_time_compare
 from django.views import View
+from django.views.decorators.cache import cache_control
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.gzip import gzip_page
 from django.views.decorators.http import require_POST
 from django.views.generic import ListView
-from django.core.files.storage import default_storage
-import pdfplumber
 from .forms import ItemForm, UpdateFileForm, UploadFileForm
-from .models import Item, Order, OrderItem
-from .utils import handle_update_file, handle_uploaded_file, process_excel_data
-import re
-from django.core.files.base import ContentFile
+from .item_index import aget_item_index, get_item_index
+from .facets import get_order_facets
+from .jobs import submit_job
+from .metrics import render_metrics
+from .models import Item, Job, Order, OrderItem
+from .pagination import KeysetPaginator
+from .picklist import pick_list
+from .routing import optimize_route
+from .search import order_search_filter
+from .transitions import transition_orders
+from .parsers import get_parser
+from .versions import ITEMS, ORDERS, get_data_versions, versioned
+from .utils import (ImportProgress, aggregate_sku_quantities, dataframe_to_excel,
+                    handle_update_file, handle_uploaded_file, import_orders_file,
+                    pdf_report, aresolve_item_locations, resolve_item_locations)
 from django.views.decorators.csrf import csrf_protect
 
 
@@ -40,7 +52,8 @@ def set_item(request):
             item = Item.objects.get(number=number, model_prefix=model_prefix)
             item.line = line
             item.place = place
-            item.save()
+            # Only write the location, so a restock committed since the read is kept
+            item.save(update_fields=["line", "place", "updated_at"])
             message = f"Item {model_prefix}{number} updated successfully!"
         except Item.DoesNotExist:
             item = Item(
@@ -61,30 +74,61 @@ def set_item(request):
         return render(request, "locator/set_item.html", context)
 
 
-def fetch_model_numbers(request):
+@gzip_page
+@cache_control(no_cache=True)
+@versioned(ITEMS)
+async def fetch_model_numbers(request):
     model_prefix = request.GET.get("model_prefix")
     if model_prefix:
-        numbers = list(
-            Item.objects.filter(model_prefix=model_prefix)
-            .values_list("number", flat=True)
-            .distinct()
-        )
-        return JsonResponse({"numbers": numbers})
+        index = await aget_item_index()
+        return JsonResponse({"numbers": index.prefix_numbers(model_prefix)})
     else:
         error_message = "Model prefix not specified"
         return JsonResponse({"error": error_message}, status=400)
 
 
+@cache_control(no_cache=True)
+@versioned(ITEMS)
+def item_typeahead(request):
+    model_prefix = request.GET.get("model_prefix")
+    if not model_prefix:
+        return JsonResponse({"error": "Model prefix not specified"}, status=400)
+    try:
+        limit = min(int(request.GET.get("limit", settings.ITEM_TYPEAHEAD_LIMIT)), settings.ITEM_TYPEAHEAD_LIMIT)
+    except ValueError:
+        return JsonResponse({"error": "Invalid limit"}, status=400)
+    index = get_item_index()
+    return JsonResponse({
+        "version": index.version,
+        "numbers": index.search(model_prefix, request.GET.get("q", "").strip(), max(limit, 0)),
+    })
+
+
+@gzip_page
+@versioned(ITEMS)
+def item_manifest(request):
+    index = get_item_index()
+    response = JsonResponse(index.manifest())
+    if request.GET.get("v") == str(index.version):
+        # A versioned URL never changes, a new version gets a new URL
+        patch_cache_control(response, public=True, max_age=settings.ITEM_MANIFEST_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
 ####################
 
 
 def select_model(request):
     item_choices = Item.MODEL_CHOICES
-    return render(request, "locator/select_model.html", {'item_choices': item_choices})
+    manifest_url = f"{reverse('item-manifest')}?v={get_data_versions([ITEMS])[ITEMS][0]}"
+    return render(request, "locator/select_model.html", {'item_choices': item_choices, 'manifest_url': manifest_url})
 
 
 @csrf_exempt
-def finalize_items(request):
+@gzip_page
+async def finalize_items(request):
     if request.method != "POST":
         return JsonResponse({"error": "Invalid request method"}, status=400)
 
@@ -94,26 +138,43 @@ def finalize_items(request):
         if not items_data:
             return JsonResponse({"error": "No items data received"}, status=400)
 
-        prefixes = [key[:3] for key in items_data.keys()]
-        numbers = [key[3:] for key in items_data.keys() if len(key) > 3]
-
-        items_query = Item.objects.filter(model_prefix__in=prefixes, number__in=numbers)
+        wanted = {code: quantity for code, quantity in items_data.items() if quantity > 0}
+        items, unknown = await aresolve_item_locations(wanted)
         results = [
             {
-                "model": f"{item.model_prefix}{item.number}",
-                "quantity": items_data.get(f"{item.model_prefix}{item.number}", 0),
+                "model": code,
+                "quantity": wanted[code],
                 "line": item.line,
                 "place": item.place,
             }
-            for item in items_query
-            if items_data.get(f"{item.model_prefix}{item.number}", 0) > 0
+            for code, item in items.items()
         ]
+        if request.GET.get("route") == "optimal":
+            results = await sync_to_async(optimize_route)(results)
 
-        return JsonResponse({"items": results})
+        return JsonResponse({"items": results, "unknown": unknown})
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=400)
 
 
+@csrf_exempt
+@require_POST
+def item_locations(request):
+    try:
+        codes = json.loads(request.body.decode("utf-8")).get("codes", [])
+    except (ValueError, AttributeError):
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+    if not isinstance(codes, list) or len(codes) > settings.ITEM_LOCATIONS_MAX_CODES:
+        return JsonResponse(
+            {"error": f"Expected a list of at most {settings.ITEM_LOCATIONS_MAX_CODES} codes"}, status=400
+        )
+    items, unknown = resolve_item_locations(str(code) for code in codes)
+    return JsonResponse({
+        "locations": {code: {"line": item.line, "place": item.place} for code, item in items.items()},
+        "unknown": unknown,
+    })
+
+
 ############################################
 class OrderListView(ListView):
     model = Order
@@ -131,77 +192,99 @@ class OrderListView(ListView):
         if status:
             queryset = queryset.filter(status=status)
         if search_query:
-            queryset = queryset.filter(
-                Q(customer_name__icontains=search_query)
-                | Q(order_number__icontains=search_query)
-            )
+            queryset = queryset.filter(order_search_filter(search_query))
         return queryset
 
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size)
+        page = paginator.page(
+            after=self.request.GET.get("after"),
+            before=self.request.GET.get("before"),
+        )
+        return paginator, page, page.object_list, page.has_next or page.has_previous
+
+    def get_paginate_by(self, queryset):
+        return settings.ORDER_LIST_PAGE_SIZE
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        status_choices = dict(Order.STATUS_CHOICES)
-        context["distinct_statuses"] = Order.objects.values_list(
-            "status", flat=True
-        ).distinct()
+        facets = get_order_facets()
+        context["distinct_statuses"] = [code for code, _, _ in facets["statuses"]]
         context["status_descriptions"] = {
-            status: status_choices.get(status, "")
-            for status in context["distinct_statuses"]
+            code: description for code, description, _ in facets["statuses"]
         }
-        context["distinct_stores"] = (
-            Order.objects.order_by("store_name")
-            .values_list("store_name", flat=True)
-            .distinct()
-        )
-        print("Distinct Stores: ", list(context["distinct_stores"]))
+        context["distinct_stores"] = [name for name, _ in facets["stores"]]
+        context["store_facets"] = facets["stores"]
+        context["status_facets"] = facets["statuses"]
+
+        # Item lines of the whole page in one query
+        items_by_order = defaultdict(list)
+        for line in (
+            OrderItem.objects.filter(order__in=[order.pk for order in context["orders"]])
+            .values("order_id", "item__model_prefix", "item__number")
+            .annotate(total_quantity=Sum("quantity"))
+            .order_by("order_id", "item__line", "item__place", "item__model_prefix", "item__number")
+        ):
+            items_by_order[line["order_id"]].append({
+                "model_prefix": line["item__model_prefix"],
+                "number": line["item__number"],
+                "total_quantity": line["total_quantity"],
+            })
         for order in context["orders"]:
-            order.items_with_quantities = order.items.annotate(
-                total_quantity=Sum("orderitem__quantity")
-            ).values("model_prefix", "number", "total_quantity")
+            order.items_with_quantities = items_by_order[order.pk]
+
+        # Page links keep the store/status/search filters
+        query = self.request.GET.copy()
+        query.pop("after", None)
+        query.pop("before", None)
+        context["filter_query"] = query.urlencode()
         return context
 
 
+def _transition_response(request, result):
+    if result.conflicts:
+        conflict = result.conflicts[0]
+        if conflict["reason"] == "not found":
+            raise Http404("Order not found")
+        return HttpResponse(f"Order not updated: {conflict['reason']}", status=409)
+    return HttpResponseRedirect(request.META.get("HTTP_REFERER", "/"))
+
+
 class CompleteOrderView(View):
     def post(self, request, pk):
-        order = Order.objects.get(pk=pk)
-        order.status = "COM"
-        order.save()
-        return HttpResponseRedirect(request.META.get("HTTP_REFERER", "/"))
+        return _transition_response(request, transition_orders("COM", {pk: None}))
 
 
 class HoldOrderView(View):
     def post(self, request, pk):
-        note = request.POST.get("note")
-        order = Order.objects.get(pk=pk)
-        order.status = "ONH"
-        order.notes = note
-        order.save()
-        return HttpResponseRedirect(request.META.get("HTTP_REFERER", "/"))
+        result = transition_orders("ONH", {pk: None}, note=request.POST.get("note"))
+        return _transition_response(request, result)
 
 
-def collect_items(request):
+@gzip_page
+@cache_control(no_cache=True)
+@versioned(ITEMS, ORDERS)
+async def collect_items(request):
     store_name = request.GET.get("store")
     status = request.GET.get("status")
     search_query = request.GET.get("search")
 
-    queryset = OrderItem.objects.select_related("item", "order")
-
-    if store_name:
-        queryset = queryset.filter(order__store_name=store_name)
-    if status:
-        queryset = queryset.filter(order__status=status)
     if search_query:
-        queryset = queryset.filter(
-            Q(order__customer_name__icontains=search_query)
-            | Q(order__order_number__icontains=search_query)
-        )
-
-    items = (
-        queryset.values(
-            "item__model_prefix", "item__number", "item__line", "item__place"
+        # The pick list has no order details, so searches aggregate live
+        queryset = OrderItem.objects.filter(order_search_filter(search_query, prefix="order__"))
+        if store_name:
+            queryset = queryset.filter(order__store_name=store_name)
+        if status:
+            queryset = queryset.filter(order__status=status)
+        items = (
+            queryset.values(
+                "item__model_prefix", "item__number", "item__line", "item__place"
+            )
+            .annotate(total_quantity=Sum("quantity"))
+            .order_by("item__line", "item__place")
         )
-        .annotate(total_quantity=Sum("quantity"))
-        .order_by("item__line", "item__place")
-    )
+    else:
+        items = pick_list(store_name, status)
 
     # Prepare the data for JSON response
     items_list = [
@@ -211,32 +294,70 @@ def collect_items(request):
             "line": item["item__line"],
             "place": item["item__place"],
         }
-        for item in items
+        async for item in items
     ]
+    if request.GET.get("route") == "optimal":
+        # Routing is CPU work, keep it off the event loop
+        items_list = await sync_to_async(optimize_route)(items_list)
 
     return JsonResponse({"items": items_list})
 
 
 @require_POST
 @csrf_exempt
-def update_order_status(request):
-    order_id = request.POST.get("order_id")
+async def update_order_status(request):
     new_status = request.POST.get("status")
     note = request.POST.get("note", "")
 
     try:
-        order = Order.objects.get(pk=order_id)
-        order.status = new_status
-        if new_status == "ONH":
-            order.notes = note
-        order.save()
-        return JsonResponse(
-            {"success": True, "message": "Order status updated successfully"}
+        order_id = int(request.POST.get("order_id"))
+        version = request.POST.get("version")
+        # The transition locks rows in a transaction, which the async ORM cannot do
+        result = await sync_to_async(transition_orders)(
+            new_status,
+            {order_id: int(version) if version else None},
+            note=note if new_status == "ONH" else None,
         )
-    except Order.DoesNotExist:
-        return JsonResponse({"success": False, "message": "Order not found"})
-    except Exception as e:
+    except (TypeError, ValueError) as e:
         return JsonResponse({"success": False, "message": str(e)})
+    if result.conflicts:
+        conflict = result.conflicts[0]
+        if conflict["reason"] == "not found":
+            return JsonResponse({"success": False, "message": "Order not found"})
+        return JsonResponse({"success": False, "message": f"Order not updated: {conflict['reason']}", **conflict})
+    return JsonResponse(
+        {"success": True, "message": "Order status updated successfully", **result.updated[0]}
+    )
+
+
+@csrf_exempt
+@require_POST
+def bulk_update_order_status(request):
+    try:
+        data = json.loads(request.body.decode("utf-8"))
+        status = data["status"]
+        orders = data["orders"]
+        note = data.get("note")
+        versions = {}
+        for order in orders:
+            if isinstance(order, dict):
+                versions[int(order["id"])] = None if order.get("version") is None else int(order["version"])
+            else:
+                versions[int(order)] = None
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return JsonResponse(
+            {"error": 'Expected {"status": ..., "orders": [id or {"id": ..., "version": ...}], "note": ...}'},
+            status=400,
+        )
+    if len(versions) > settings.ORDER_TRANSITION_MAX_ORDERS:
+        return JsonResponse(
+            {"error": f"At most {settings.ORDER_TRANSITION_MAX_ORDERS} orders per request"}, status=400
+        )
+    try:
+        result = transition_orders(status, versions, note=note)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(result.as_dict(), status=409 if result.conflicts and not result.updated else 200)
 
 
 def upload_orders(request):#upload orders
@@ -251,8 +372,8 @@ def upload_orders(request):#upload orders
         form = UploadFileForm(request.POST, request.FILES)
         if form.is_valid():
             excel_file = request.FILES["file"]
-            data = pd.read_excel(excel_file, dtype={"order_number": str})
-            results = process_excel_data(data)
+            progress = ImportProgress(request.POST.get("progress_id"))
+            results = import_orders_file(excel_file, progress=progress)
             context.update(results)
             return render(request, "locator/upload.html", context)
     else:
@@ -267,13 +388,15 @@ def upload_items(request): #upload items
             form = UploadFileForm(request.POST, request.FILES)
             update_form = UpdateFileForm()
             if form.is_valid():
-                results = handle_uploaded_file(request.FILES['file'])
+                progress = ImportProgress(request.POST.get('progress_id'))
+                results = handle_uploaded_file(request.FILES['file'], progress=progress)
                 return render(request, 'locator/upload_items.html', {'form': form, 'update_form': update_form, 'results': results})
         elif 'update' in request.POST:
             form = UploadFileForm()
             update_form = UpdateFileForm(request.POST, request.FILES)
             if update_form.is_valid():
-                results = handle_update_file(request.FILES['file'])
+                progress = ImportProgress(request.POST.get('progress_id'))
+                results = handle_update_file(request.FILES['file'], progress=progress)
                 return render(request, 'locator/upload_items.html', {'form': form, 'update_form': update_form, 'results': results})
     else:
         form = UploadFileForm()
@@ -281,48 +404,43 @@ def upload_items(request): #upload items
     return render(request, 'locator/upload_items.html', {'form': form, 'update_form': update_form})
 
 
+def metrics(request):
+    token = settings.METRICS_TOKEN
+    if not token or not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponse(status=403)
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def import_progress(request, key):
+    progress = ImportProgress.lookup(key)
+    if progress is None:
+        return JsonResponse({"error": "Unknown import"}, status=404)
+    return JsonResponse(progress)
+
+
 
 
 #pdf_all
+def _excel_response(df, filename_prefix):
+    response = HttpResponse(
+        dataframe_to_excel(df),
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = f'attachment; filename={filename_prefix}_{uuid.uuid4().hex}.xlsx'
+    return response
+
+
+def _pdf_report_response(parser_name, pdfs, empty_message=None):
+    df = pdf_report(parser_name, pdfs)
+    if df is None:
+        return HttpResponse(empty_message)
+    return _excel_response(df, get_parser(parser_name).filename_prefix)
+
+
 @csrf_exempt # Use this decorator if you decide not to handle CSRF tokens in the form
 def upload_pdfs(request):
     if request.method == 'POST' and request.FILES.getlist('pdf_files'):
-        pdf_files = request.FILES.getlist('pdf_files')
-        fs = FileSystemStorage(location=settings.MEDIA_ROOT)
-
-        all_data = []
-
-        for pdf_file in pdf_files:
-            # Generate a unique filename to prevent conflicts
-            unique_filename = f"{uuid.uuid4().hex}_{pdf_file.name}"
-            filename = fs.save(unique_filename, pdf_file)
-            uploaded_file_path = fs.path(filename)
-
-            # Process the PDF file
-            text = extract_text_from_pdf(uploaded_file_path)
-            data = parse_orders(text)
-            all_data.extend(data)
-
-            # Delete the uploaded PDF after processing
-            fs.delete(filename)
-
-        # Create a DataFrame from the combined data
-        df = pd.DataFrame(all_data, columns=['Order number', 'Order date', 'Buyer name', 'SKU', 'Quantity', 'Delivery service'])
-
-        # Save the Excel file to an in-memory stream
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df.to_excel(writer, index=False)
-        output.seek(0)
-
-        # Prepare response to download the file
-        response = HttpResponse(
-            output.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename=orders_{uuid.uuid4().hex}.xlsx'
-
-        return response
+        return _pdf_report_response('amazon', request.FILES.getlist('pdf_files'))
 
     # If GET request or no files uploaded, render the upload page
     html_form = '''
@@ -347,30 +465,7 @@ def aggregate_skus(request):
         if not excel_files:
             return HttpResponse("No files uploaded")
 
-        dfs = []
-        for uploaded_file in excel_files:
-            # Save uploaded file temporarily
-            temp_file_path = os.path.join(settings.MEDIA_ROOT, uploaded_file.name)
-            with default_storage.open(temp_file_path, 'wb+') as destination:
-                for chunk in uploaded_file.chunks():
-                    destination.write(chunk)
-            # Read Excel file into DataFrame
-            df = pd.read_excel(temp_file_path)
-            dfs.append(df)
-            # Remove temporary file
-            default_storage.delete(temp_file_path)
-
-        # Concatenate all dataframes
-        df_all = pd.concat(dfs, ignore_index=True)
-
-        # Ensure 'Quantity' is numeric
-        df_all['Quantity'] = pd.to_numeric(df_all['Quantity'], errors='coerce')
-
-        # Group by 'SKU' and sum 'Quantity'
-        result = df_all.groupby('SKU', as_index=False)['Quantity'].sum()
-
-        # Sort the result by 'SKU' in ascending order
-        result = result.sort_values(by='SKU')
+        result = aggregate_sku_quantities(excel_files)
 
         # Generate a unique filename
         output_filename = f'aggregated_quantities_{uuid.uuid4()}.xlsx'
@@ -393,179 +488,10 @@ def aggregate_skus(request):
 
 def upload_pdfs_home24(request):
     if request.method == 'POST' and request.FILES.getlist('pdf_files_home24'):
-        pdf_files = request.FILES.getlist('pdf_files_home24')
-        all_orders = []
-
-        for pdf_file in pdf_files:
-            # Save the uploaded file temporarily
-            temp_pdf_path = default_storage.save('temp/' + pdf_file.name, ContentFile(pdf_file.read()))
-            # Process the PDF file
-            text = ''
-            with pdfplumber.open(default_storage.path(temp_pdf_path)) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + '\n'
-            # Delete the temporary file
-            default_storage.delete(temp_pdf_path)
-
-            # Extract orders from text
-            def extract_orders_from_text(text):
-                orders = []
-                # Define order separators for different languages
-                order_separators = [
-                    'Lieferschein',        # German
-                    'Bon de livraison',    # French
-                    'Leveringsbon'         # Dutch
-                ]
-                # Create a regex pattern for order separators
-                order_separator_regex = r'(?i)(?:' + '|'.join(map(re.escape, order_separators)) + ')'
-                # Split text into individual orders
-                order_texts = re.split(order_separator_regex, text)
-                for order_text in order_texts[1:]:  # Skip text before the first order separator
-                    order = {}
-
-                    # Helper function to get field value based on patterns
-                    def get_field_value(text, patterns):
-                        for pattern in patterns:
-                            match = re.search(pattern, text, re.I)
-                            if match:
-                                return match.group(1).strip()
-                        return None
-
-                    # Define patterns for each field in different languages
-                    order_number_patterns = [
-                        r'Bestellnummer:\s*([A-Za-z0-9-]+)',          # German
-                        r'Numéro de commande\s*:\s*([A-Za-z0-9-]+)',  # French
-                        r'Bestelnummer:\s*([A-Za-z0-9-]+)',           # Dutch
-                    ]
-                    order_date_patterns = [
-                        r'Bestelldatum:\s*([\d./-]+)',           # German
-                        r'Date de commande\s*:\s*([\d./-]+)',    # French
-                        r'Besteldatum:\s*([\d./-]+)',            # Dutch
-                    ]
-                    buyer_name_patterns = [
-                        r'Name des Kunden:\s*(.*)',        # German
-                        r'Nom de l\'acheteur\s*:\s*(.*)',  # French
-                        r'Klantnaam:\s*(.*)',              # Dutch
-                    ]
-                    delivery_service_patterns = [
-                        r'Versandmethode:\s*(.*)',         # German
-                        r'Mode de livraison\s*:\s*(.*)',   # French
-                        r'Verzendmethode:\s*(.*)',         # Dutch
-                    ]
-                    sku_patterns = [
-                        r'Shop-Referenz:\s*(.*)',          # German
-                        r'Référence vendeur\s*:\s*(.*)',   # French
-                        r'Referentie shop:\s*(.*)',        # Dutch
-                    ]
-                    # Extract Order Number
-                    order_number = get_field_value(order_text, order_number_patterns)
-                    if order_number:
-                        order['Order number'] = order_number
-                    else:
-                        continue  # Skip if no order number found
-
-                    # Extract Order Date
-                    order_date = get_field_value(order_text, order_date_patterns)
-                    if order_date:
-                        order['Order date'] = order_date.strip()
-
-                    # Extract Buyer's Name
-                    buyer_name = get_field_value(order_text, buyer_name_patterns)
-                    if buyer_name:
-                        order["Buyer's name"] = buyer_name.strip()
-
-                    # Extract Delivery Service
-                    delivery_service = get_field_value(order_text, delivery_service_patterns)
-                    if delivery_service:
-                        order['Delivery service'] = delivery_service.strip()
-
-                    # Now extract products within the order
-                    lines = order_text.split('\n')
-
-                    # Define product name patterns
-                    product_name_patterns = [
-                        r'^Produktname:',      # German
-                        r'^Nom du produit:',   # French
-                        r'^Productnaam:',      # Dutch
-                    ]
-
-                    # Find indices where a product starts
-                    product_indices = []
-                    for i, line in enumerate(lines):
-                        for pattern in product_name_patterns:
-                            if re.match(pattern, line.strip()):
-                                product_indices.append(i)
-                                break
-
-                    if product_indices:
-                        # For each product, create a separate order dict
-                        for idx, start_idx in enumerate(product_indices):
-                            # The end index is the next product index or the end of lines
-                            end_idx = product_indices[idx + 1] if idx + 1 < len(product_indices) else len(lines)
-
-                            # Extract the product block
-                            product_block = '\n'.join(lines[start_idx:end_idx])
-
-                            # Extract SKU from the product_block
-                            product_sku = get_field_value(product_block, sku_patterns)
-
-                            # Extract Quantity
-                            quantity_patterns = [
-                                r'Anzahl\s*:\s*(\d+)',      # German
-                                r'Menge\s*:\s*(\d+)',       # German
-                                r'Qté\s*:\s*(\d+)',         # French
-                                r'Aant\.\s*:\s*(\d+)',      # Dutch
-                            ]
-                            quantity = get_field_value(product_block, quantity_patterns)
-                            if not quantity:
-                                quantity = '1'  # Default quantity to 1 if not found
-
-                            # Create a new order dict for this product
-                            product_order = order.copy()  # Copy common order fields
-                            product_order['SKU'] = product_sku.strip() if product_sku else ''
-                            product_order['Quantity'] = quantity
-                            # Append the product_order to orders list
-                            orders.append(product_order)
-                    else:
-                        # No products found, skip or handle accordingly
-                        print(f"No products found for order {order_number}")
-                        # Optionally, create a default order entry without SKU and quantity
-                        order['SKU'] = ''
-                        order['Quantity'] = ''
-                        orders.append(order)
-                return orders
-
-            orders = extract_orders_from_text(text)
-            if not orders:
-                print(f"No orders found in {pdf_file.name}")
-            all_orders.extend(orders)
-        if not all_orders:
-            return HttpResponse('No orders were extracted. Please check the PDF files and the extraction logic.')
-
-        # Create DataFrame and write to Excel
-        df = pd.DataFrame(all_orders)
-        # Reorder columns as specified
-        df = df[['Order number', 'Order date', "Buyer's name", 'SKU', 'Quantity', 'Delivery service']]
-
-        # Debugging: Print the DataFrame
-        print(df)
-
-        # Save the Excel file to an in-memory stream
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df.to_excel(writer, index=False)
-        output.seek(0)
-
-        # Prepare response to download the file
-        response = HttpResponse(
-            output.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        return _pdf_report_response(
+            'home24', request.FILES.getlist('pdf_files_home24'),
+            'No orders were extracted. Please check the PDF files and the extraction logic.',
         )
-        response['Content-Disposition'] = f'attachment; filename=home24_orders_{uuid.uuid4().hex}.xlsx'
-
-        return response
     else:
         # If GET request or no files uploaded, redirect back to the main upload page
         return redirect('upload_and_download')  # Ensure 'upload_and_download' is the correct URL name
@@ -577,169 +503,10 @@ def upload_pdfs_home24(request):
 ### mano
 def upload_pdfs_mano(request):
     if request.method == 'POST' and request.FILES.getlist('pdf_files_mano'):
-        pdf_files = request.FILES.getlist('pdf_files_mano')
-        all_orders = []
-
-        for pdf_file in pdf_files:
-            # Save the uploaded file temporarily
-            temp_pdf_path = default_storage.save('temp/' + pdf_file.name, ContentFile(pdf_file.read()))
-            pdf_full_path = default_storage.path(temp_pdf_path)
-            print(f"Processing file: {pdf_full_path}")
-
-            # Extract text from PDF
-            def extract_text_from_pdf(pdf_path):
-                text = ''
-                with pdfplumber.open(pdf_path) as pdf:
-                    for page_num, page in enumerate(pdf.pages, start=1):
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + '\n'
-                        else:
-                            print(f"No text found on page {page_num} of {pdf_path}")
-                return text
-
-            # Parse orders from text
-            def parse_orders(text):
-                # Use regex to split on the splitting phrase, ignoring extra whitespace
-                orders = re.split(r'Vielen Dank für Ihre Bestellung beim Verkäufer AM\.PM Europe GmbH\s*', text)
-                # Remove the first element if it's empty
-                if not orders[0].strip():
-                    orders = orders[1:]
-                parsed_orders = []
-                for order_text in orders:
-                    order_data = parse_order(order_text)
-                    if order_data:
-                        parsed_orders.extend(order_data)
-                return parsed_orders
-
-            # Parse individual order
-            def parse_order(order_text):
-                order_data = []
-                lines = [line.strip() for line in order_text.strip().split('\n')]
-                if not lines:
-                    return order_data
-                # Extract order number
-                order_number = lines[0]
-                print(f"Processing Order Number: {order_number}")
-                # Combine lines into a single string
-                order_text_combined = ' '.join(lines)
-                # Extract order date and delivery service
-                date_delivery_pattern = r'Bestelldatum Lieferzeit Träger\s*(\d{2}\.\d{2}\.\d{2}, \d{2}:\d{2})\s*(\d+\s*Tage)?\s*([\w\(\)]+)'
-                date_delivery_match = re.search(date_delivery_pattern, order_text_combined)
-                if date_delivery_match:
-                    order_date = date_delivery_match.group(1)
-                    delivery_time = date_delivery_match.group(2) or ''
-                    delivery_service = date_delivery_match.group(3) or ''
-                else:
-                    order_date = ''
-                    delivery_service = ''
-                print(f"Order Date: {order_date}, Delivery Service: {delivery_service}")
-                # Extract buyer's name
-                buyer_name = ''
-                # Find the line containing 'Kunden-Details'
-                idx = -1
-                for i, line in enumerate(lines):
-                    if 'Kunden-Details' in line:
-                        idx = i
-                        break
-                if idx == -1:
-                    buyer_name = ''
-                else:
-                    # Start from the line after 'Kunden-Details'
-                    i = idx + 1
-                    while i < len(lines):
-                        line = lines[i]
-                        # Skip lines that are labels or empty
-                        if line.strip() == '' or any(keyword in line for keyword in [
-                            'Unternehmen', 'Lieferanschrift', 'Mehrwertsteuersatz',
-                            'Haftung für Rechnungen', 'Ausstehende', 'Hausnr.', 'Straße +', 'nungsstellung', 'Hausnr.'
-                        ]):
-                            i += 1
-                            continue
-                        # If line contains phone number and name
-                        phone_name_match = re.match(r'\+[\d]+\s+(.+)', line)
-                        if phone_name_match:
-                            name_part = phone_name_match.group(1).strip()
-                            # Remove duplicate words
-                            name_words = name_part.split()
-                            seen = set()
-                            unique_name_words = []
-                            for word in name_words:
-                                if word not in seen:
-                                    seen.add(word)
-                                    unique_name_words.append(word)
-                            buyer_name = ' '.join(unique_name_words)
-                            break
-                        # If line starts with a name followed by a phone number
-                        name_phone_match = re.match(r'(.+?)\s+\+[\d]+', line)
-                        if name_phone_match:
-                            buyer_name = name_phone_match.group(1).strip()
-                            break
-                        # If line is just a phone number, skip it
-                        if re.match(r'\+[\d]+$', line):
-                            i += 1
-                            continue
-                        # Assume the line is the buyer's name
-                        buyer_name = line.strip()
-                        break
-                        i += 1
-                print(f"Buyer's Name: {buyer_name}")
-                # Extract items
-                item_pattern = r'Referenz SKU Menge\s*([\s\S]+?)VAT Excl VAT'
-                item_match = re.search(item_pattern, order_text)
-                if item_match:
-                    items_text = item_match.group(1)
-                    # Find all SKUs and Quantities
-                    sku_quantity_pattern = r'\b([A-Z0-9]+)\b\s+(\d+)\b'
-                    matches = re.findall(sku_quantity_pattern, items_text)
-                    for sku, quantity in matches:
-                        order_data.append({
-                            'Order number': order_number,
-                            'Order date': order_date,
-                            'Buyer\'s name': buyer_name,
-                            'SKU': sku,
-                            'Quantity': quantity,
-                            'Delivery service': delivery_service
-                        })
-                        print(f"Extracted Item: SKU={sku}, Quantity={quantity}")
-                else:
-                    print("No items found in this order.")
-                return order_data
-
-            # Begin processing the PDF file
-            text = extract_text_from_pdf(pdf_full_path)
-            # Delete the temporary file
-            default_storage.delete(temp_pdf_path)
-
-            if not text.strip():
-                print(f"No text extracted from {pdf_full_path}.")
-                continue
-            orders = parse_orders(text)
-            if not orders:
-                print(f"No orders found in {pdf_file.name}.")
-            else:
-                all_orders.extend(orders)
-
-        if not all_orders:
-            return HttpResponse('No orders extracted from the uploaded PDFs.')
-
-        # Create DataFrame and save to Excel
-        df = pd.DataFrame(all_orders)
-
-        # Save the Excel file to an in-memory stream
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df.to_excel(writer, index=False)
-        output.seek(0)
-
-        # Prepare response to download the file
-        response = HttpResponse(
-            output.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        return _pdf_report_response(
+            'mano', request.FILES.getlist('pdf_files_mano'),
+            'No orders extracted from the uploaded PDFs.',
         )
-        response['Content-Disposition'] = f'attachment; filename=mano_orders_{uuid.uuid4().hex}.xlsx'
-
-        return response
     else:
         # If GET request or no files uploaded, render the upload page
         html_form = '''
@@ -762,123 +529,10 @@ def upload_pdfs_mano(request):
 #ampm
 def upload_pdfs_new_functionality(request):
     if request.method == 'POST' and request.FILES.getlist('pdf_files_new'):
-        pdf_files = request.FILES.getlist('pdf_files_new')
-        data_list = []
-
-        for pdf_file in pdf_files:
-            # Save the uploaded file temporarily
-            temp_pdf_path = default_storage.save('temp/' + pdf_file.name, ContentFile(pdf_file.read()))
-            pdf_full_path = default_storage.path(temp_pdf_path)
-            print(f"Processing file: {pdf_full_path}")
-
-            # Extract text from PDF
-            with pdfplumber.open(pdf_full_path) as pdf:
-                text = ''
-                # Extract text from all pages
-                for page_num, page in enumerate(pdf.pages, start=1):
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + '\n'
-                    else:
-                        text += f'[Page {page_num} has no extractable text]\n'
-
-            # Extract data using the function
-            def extract_data_from_text(text):
-                lines = text.split('\n')
-                order_number = ''
-                order_date = ''
-                buyer_name = ''
-                sku = ''
-                quantity = ''
-                # Process lines
-                for i, line in enumerate(lines):
-                    line = line.strip()
-                    # Extract order number
-                    if 'BESTELLNUMMER' in line:
-                        match = re.search(r'BESTELLNUMMER\s*:\s*(#?\S+)', line)
-                        if match:
-                            order_number = match.group(1).strip()
-                        continue
-                    # Extract order date
-                    if 'BESTELLDATUM' in line:
-                        match = re.search(r'BESTELLDATUM\s*:\s*([\d\.]+\s*[\d:]+)', line)
-                        if match:
-                            order_date = match.group(1).strip()
-                        continue
-                    # Extract buyer's name
-                    if 'VERSANDDETAILS' in line:
-                        # The next line contains buyer's name repeated
-                        if i + 1 < len(lines):
-                            buyer_line = lines[i + 1].strip()
-                            buyer_name_parts = buyer_line.split()
-                            if len(buyer_name_parts) >= 2:
-                                buyer_name = ' '.join(buyer_name_parts[:2])
-                            else:
-                                buyer_name = buyer_line
-                        continue
-                    # Extract SKU and Quantity
-                    if 'TITEL' in line and 'ARTIKELNUMMER' in line:
-                        # Process the lines after this header
-                        for j in range(i + 1, len(lines)):
-                            data_line = lines[j].strip()
-                            if not data_line:
-                                continue
-                            # Check if line contains SKU
-                            if re.match(r'^[A-Z0-9.-]{5,}$', data_line):
-                                sku = data_line
-                                # Now look for quantity
-                                quantity_found = False
-                                for k in range(j, j + 5):
-                                    if k >= len(lines):
-                                        break
-                                    line_to_check = lines[k].strip()
-                                    if not line_to_check:
-                                        continue
-                                    # Look for pattern: number before percentage sign
-                                    qty_match = re.search(r'\b(\d+)\b\s*\d+%.*', line_to_check)
-                                    if qty_match:
-                                        quantity = qty_match.group(1)
-                                        quantity_found = True
-                                        break
-                                if not quantity_found:
-                                    quantity = ''
-                                break
-                        continue
-                return {
-                    'Order number': order_number,
-                    'Order date': order_date,
-                    'Buyer\'s name': buyer_name,
-                    'SKU': sku,
-                    'Quantity': quantity,
-                    'Delivery service': 'Unknown'
-                }
-
-            data = extract_data_from_text(text)
-            data_list.append(data)
-
-            # Delete the temporary file
-            default_storage.delete(temp_pdf_path)
-
-        if not data_list:
-            return HttpResponse('No data extracted from the uploaded PDFs.')
-
-        # Create DataFrame and save to Excel
-        df = pd.DataFrame(data_list)
-
-        # Save the Excel file to an in-memory stream
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df.to_excel(writer, index=False)
-        output.seek(0)
-
-        # Prepare response to download the file
-        response = HttpResponse(
-            output.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        return _pdf_report_response(
+            'ampm', request.FILES.getlist('pdf_files_new'),
+            'No data extracted from the uploaded PDFs.',
         )
-        response['Content-Disposition'] = f'attachment; filename=ampm_orders_{uuid.uuid4().hex}.xlsx'
-
-        return response
     else:
         # If GET request or no files uploaded, render the upload page
         html_form = '''
@@ -914,4 +568,58 @@ def upload_and_download(request):
         # ... handle other forms ...
     else:
         # Render your upload and download template
-        return render(request, 'locator/upload_and_download.html')
\ No newline at end of file
+        return render(request, 'locator/upload_and_download.html')
+
+
+#jobs
+def _job_payload(job):
+    payload = {
+        "id": job.pk,
+        "kind": job.kind,
+        "status": job.status,
+        "status_display": job.get_status_display(),
+        "progress": job.progress,
+        "total": job.total,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "status_url": reverse("job_status", args=[job.pk]),
+    }
+    if job.status == "DON" and job.artifact_name:
+        payload["download_url"] = reverse("job_download", args=[job.pk])
+    return payload
+
+
+@require_POST
+@csrf_exempt
+def create_job(request, kind):
+    files = [f for key in request.FILES for f in request.FILES.getlist(key)]
+    if not files:
+        return JsonResponse({"error": "No files uploaded"}, status=400)
+    params = {
+        key: value for key, value in request.POST.items() if key != "csrfmiddlewaretoken"
+    }
+    try:
+        job = submit_job(kind, files, **params)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(_job_payload(job), status=202)
+
+
+def job_status(request, pk):
+    job = get_object_or_404(Job.objects.defer("artifact"), pk=pk)
+    return JsonResponse(_job_payload(job))
+
+
+def job_download(request, pk):
+    job = get_object_or_404(Job, pk=pk, status="DON")
+    if job.artifact is None:
+        return JsonResponse({"error": "This job has no file to download"}, status=404)
+    response = HttpResponse(
+        bytes(job.artifact),
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = f'attachment; filename={job.artifact_name}'
+    return response